@@ -3,51 +3,31 @@
 Helpers S3 AWS Storage for Airflow 
 '''
 
-import datetime
-import re
-import shutil
-
 import airflow.hooks.S3_hook
 import ntpath
 import boto3
 
+from S3_transfer import upload_files, download_files
+from my_helpers.utils import clean_file
+
 # prepare helpers
 s3 = boto3.resource('s3')
 hook = airflow.hooks.S3_hook.S3Hook('my_S3_conn')
 
-# save file before update
-def clean_file(path_file_name):
-    '''
-    Clean file already traited : rename file with date
-    '''
-    try:
-        d = datetime.datetime.now()
-        str_date = '_' + d.strftime("%Y%m%d_%H_%M_%S")
-       
-        res_re = re.search('\.\w+$', path_file_name)
-        
-        path_file_name_saved = \
-            path_file_name[0:res_re.start()] + str_date + res_re.group(0)
-         
-        shutil.move(path_file_name, path_file_name_saved) 
-        print('File {} moved!'.format(path_file_name_saved))
-    except:
-        print('File {} does not exist!'.format(path_file_name))
-
-def upload_files_to_S3_with_hook(filenames, bucket_name):
+def upload_files_to_S3_with_hook(filenames, bucket_name,
+    filenames_optional=()):
     ''' 
     Upload list of files to S3 (replace if already exist)
+    in parallel, unchanged files are skipped
+    (filenames_optional : removed from S3 if not found)
     '''
-    for filename in filenames:
-        key = ntpath.basename(filename)
-        hook.load_file(filename, key, bucket_name, replace=True)
+    upload_files(hook.get_conn(), filenames, bucket_name,
+        filenames_optional=filenames_optional)
 
 def download_files_from_S3(filenames, bucket_name):
     ''' 
     Download list of files from S3 (replace if already exist)
-    but saved with date
+    but saved with date, in parallel, unchanged files are skipped
     '''
-    for filename in filenames:
-        clean_file(filename)
-        key = ntpath.basename(filename)
-        s3.Bucket(bucket_name).download_file(key, filename)
\ No newline at end of file
+    download_files(s3.meta.client, filenames, bucket_name, 
+        fun_backup=clean_file)
\ No newline at end of file
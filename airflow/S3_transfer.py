@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+'''
+Transfer manager S3 AWS Storage : concurrent upload / download of files
+(thread pool), skipped if content unchanged (MD5 vs ETag)
+
+Only boto3 client needed (from Airflow hook : hook.get_conn())
+'''
+
+# import built-in
+import os
+import hashlib
+import ntpath
+from concurrent.futures import ThreadPoolExecutor
+
+# import third party
+import botocore.exceptions
+from boto3.s3.transfer import TransferConfig
+
+# DEFINITIONS
+NB_WORKERS = 8 # files transferred in parallel
+MULTIPART_THRESHOLD = 8 * 1024 * 1024 # multipart transfer above [bytes]
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024 # size of parts [bytes]
+TRANSFER_CONFIG = TransferConfig(multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_CHUNKSIZE)
+# status of transfer by file
+STATUS_DONE = "done"
+STATUS_SKIPPED = "skipped"
+STATUS_DELETED = "deleted"
+
+def compute_etag(path_file, threshold=MULTIPART_THRESHOLD,
+    chunksize=MULTIPART_CHUNKSIZE):
+    '''
+    ETag of file as computed by S3 when uploaded with TRANSFER_CONFIG :
+    - MD5 of content if single part
+    - MD5 of MD5 of parts + "-<nb of parts>" if multipart
+    '''
+    size_file = os.path.getsize(path_file)
+    with open(path_file, 'rb') as f:
+        if size_file < threshold:
+            return hashlib.md5(f.read()).hexdigest()
+        list_md5 = []
+        for chunk in iter(lambda: f.read(chunksize), b''):
+            list_md5.append(hashlib.md5(chunk).digest())
+    return hashlib.md5(b''.join(list_md5)).hexdigest() + \
+        f"-{len(list_md5)}"
+
+def get_remote_etag(client, bucket_name, key):
+    '''
+    ETag of object in bucket (None if not found)
+    '''
+    try:
+        res = client.head_object(Bucket=bucket_name, Key=key)
+    except botocore.exceptions.ClientError:
+        return None
+    return res["ETag"].strip('"')
+
+def is_unchanged(client, path_file, bucket_name, key):
+    '''
+    True if local file and object in bucket have same content
+    '''
+    if not os.path.isfile(path_file):
+        return False
+    etag = get_remote_etag(client, bucket_name, key)
+    return (etag is not None) and (etag == compute_etag(path_file))
+
+def upload_file(client, path_file, bucket_name, flag_force=False,
+    flag_optional=False):
+    '''
+    Upload file to bucket (key = file name) if changed
+    flag_optional : if file not found, object removed from bucket
+    (no old version left to be used instead)
+    '''
+    key = ntpath.basename(path_file)
+    if flag_optional and (not os.path.isfile(path_file)):
+        client.delete_object(Bucket=bucket_name, Key=key)
+        return STATUS_DELETED
+    if (not flag_force) and is_unchanged(client, path_file, bucket_name, key):
+        return STATUS_SKIPPED
+    client.upload_file(path_file, bucket_name, key, Config=TRANSFER_CONFIG)
+    return STATUS_DONE
+
+def download_file(client, path_file, bucket_name, fun_backup=None):
+    '''
+    Download file from bucket (key = file name) if changed
+    fun_backup(path_file) is called before local file is replaced
+    '''
+    key = ntpath.basename(path_file)
+    if is_unchanged(client, path_file, bucket_name, key):
+        return STATUS_SKIPPED
+    if (fun_backup is not None) and os.path.isfile(path_file):
+        fun_backup(path_file)
+    client.download_file(bucket_name, key, path_file, Config=TRANSFER_CONFIG)
+    return STATUS_DONE
+
+def transfer_files(fun_transfer, filenames, nb_workers=NB_WORKERS):
+    '''
+    Call fun_transfer(filename) for all files with a pool of threads
+    return dict {filename: status} (errors are raised)
+    '''
+    with ThreadPoolExecutor(max_workers=nb_workers) as executor:
+        list_status = list(executor.map(fun_transfer, filenames))
+    dict_status = dict(zip(filenames, list_status))
+    for filename, status in dict_status.items():
+        print('File {} : {}'.format(filename, status))
+    return dict_status
+
+def upload_files(client, filenames, bucket_name, flag_force=False,
+    nb_workers=NB_WORKERS, filenames_optional=()):
+    '''
+    Upload list of files to S3 (replace if changed)
+    filenames_optional : uploaded if found, else removed from S3
+    '''
+    return transfer_files(lambda filename: upload_file(client, filename,
+        bucket_name, flag_force=flag_force,
+        flag_optional=filename in filenames_optional),
+        list(filenames) + list(filenames_optional), nb_workers)
+
+def download_files(client, filenames, bucket_name, fun_backup=None,
+    nb_workers=NB_WORKERS):
+    '''
+    Download list of files from S3 (replace if changed)
+    '''
+    return transfer_files(lambda filename: download_file(client, filename,
+        bucket_name, fun_backup=fun_backup), filenames, nb_workers)
@@ -7,6 +7,9 @@ On AWS S3 from SPF and Meteo France
 - treat data with local script (default method in app)
 - save results in tables (df_gouv_fr_raw / df_meteo_fr or df_feat_fr )
 - 
+
+Tasks fan-out after SPF raw data download : 
+SPF aggregation / meteo fetch & aggregation / Rt map run in parallel
 '''
 
 # built-in import
@@ -25,17 +28,20 @@ import settings
 from my_helpers.data_plots import get_data_gouv_fr
 from my_helpers.data_plots import precompute_data_pos_disk
 from my_helpers.data_plots import update_data_meteo_disk
-from my_helpers.data_plots import precompute_data_meteo_light
-from my_helpers.data_plots import prepare_features_disk
+from my_helpers.meteo import precompute_data_meteo_disk
+from my_helpers.data_plots import prepare_features_disk_emr
 from my_helpers.data_maps import prepare_plot_data_map
+from my_helpers.data_maps import prepare_data_rt_fr_disk
 from S3_helpers import upload_files_to_S3_with_hook
 
 # definitions
 from my_helpers.data_plots import PATH_DF_GOUV_FR_RAW, PATH_DF_POS_FR
 from my_helpers.data_plots import PATH_DF_TEST_FR, PATH_DF_FEAT_FR
 from my_helpers.data_maps import PATH_DF_DEP_R0, PATH_PT_FR_TEST_LAST
+from my_helpers.data_maps import PATH_DF_RT_FR, PATH_DF_DEP_SUM
 from my_helpers.meteo import PATH_DF_METEO_FR
 from my_helpers.meteo import PATH_JSON_METEO_TEMP_FR
+from my_helpers.meteo_engine import ENGINE_PANDAS
 
 default_args = {
     'owner': 'gregory',
@@ -67,12 +73,14 @@ with DAG('S3_dag_test', default_args=default_args,
 
     precompute_data_meteo_task = PythonOperator(
         task_id='precompute_data_meteo',
-        python_callable=precompute_data_meteo_light,
+        python_callable=precompute_data_meteo_disk,
+        op_kwargs={'engine': ENGINE_PANDAS},
         dag=my_dag)    
 
+    # features from df_meteo_fr updated (+ extrapolation) & SPF data
     prepare_features_task = PythonOperator(
         task_id='prepare_features',
-        python_callable=prepare_features_disk,
+        python_callable=prepare_features_disk_emr,
         dag=my_dag) 
 
     prepare_plot_data_map_task = PythonOperator(
@@ -81,18 +89,30 @@ with DAG('S3_dag_test', default_args=default_args,
         op_kwargs={'flag_update': True},
         dag=my_dag)
 
+    # Rt France & sums of positive cases for France curve
+    prepare_data_rt_fr_task = PythonOperator(
+        task_id='prepare_data_rt_fr',
+        python_callable=prepare_data_rt_fr_disk,
+        dag=my_dag)
+
     upload_to_S3_task = PythonOperator(
         task_id='upload_to_S3',
         python_callable=upload_files_to_S3_with_hook,
         op_kwargs={
             'filenames': [PATH_DF_GOUV_FR_RAW, PATH_DF_POS_FR, PATH_DF_TEST_FR,
                 PATH_DF_FEAT_FR, PATH_DF_DEP_R0, PATH_PT_FR_TEST_LAST, 
-                PATH_DF_METEO_FR, PATH_JSON_METEO_TEMP_FR],
+                PATH_DF_RT_FR, PATH_DF_DEP_SUM, PATH_DF_METEO_FR, 
+                PATH_JSON_METEO_TEMP_FR],
             'bucket_name': 'app-covid-visu-bucket',
         },
         dag=my_dag)
 
     # Use arrows to set dependencies between tasks
-    start_task >> get_data_gouv_fr_task >> precompute_data_pos_task >> \
-        update_data_meteo_task >> precompute_data_meteo_task >> \
-        prepare_features_task >> prepare_plot_data_map_task >> upload_to_S3_task
\ No newline at end of file
+    start_task >> get_data_gouv_fr_task >> [precompute_data_pos_task, 
+        update_data_meteo_task, prepare_plot_data_map_task]
+    update_data_meteo_task >> precompute_data_meteo_task
+    [precompute_data_pos_task, precompute_data_meteo_task] >> \
+        prepare_features_task
+    precompute_data_pos_task >> prepare_data_rt_fr_task
+    [prepare_features_task, prepare_plot_data_map_task, 
+        prepare_data_rt_fr_task] >> upload_to_S3_task
\ No newline at end of file
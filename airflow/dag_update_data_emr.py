@@ -40,6 +40,7 @@ from my_helpers.data_plots import update_data_meteo_disk
 from my_helpers.data_plots import precompute_data_meteo_light
 from my_helpers.data_plots import prepare_features_disk_emr
 from my_helpers.data_maps import prepare_plot_data_map
+from my_helpers.data_maps import prepare_data_rt_fr_disk
 from S3_helpers import upload_files_to_S3_with_hook
 from S3_helpers import download_files_from_S3
 
@@ -48,8 +49,10 @@ from S3_helpers import download_files_from_S3
 from my_helpers.data_plots import PATH_DF_GOUV_FR_RAW, PATH_DF_POS_FR
 from my_helpers.data_plots import PATH_DF_TEST_FR, PATH_DF_FEAT_FR
 from my_helpers.data_maps import PATH_DF_DEP_R0, PATH_PT_FR_TEST_LAST
+from my_helpers.data_maps import PATH_DF_RT_FR, PATH_DF_DEP_SUM
 from my_helpers.meteo import PATH_DF_METEO_FR
 from my_helpers.meteo import PATH_JSON_METEO_TEMP_FR
+from my_helpers.meteo import PATH_PARQUET_METEO_TEMP_FR
 from my_helpers.meteo import PATH_METEO_SPARK
 BUCKET_NAME = settings.BUCKET_NAME
 
@@ -174,6 +177,8 @@ with DAG('app_visu_covid_upd_emr', default_args=default_args,
         op_kwargs={
             'filenames': [PATH_DF_METEO_FR, PATH_JSON_METEO_TEMP_FR, 
             PATH_METEO_SPARK],
+            # not written if no Parquet engine : old one removed from S3
+            'filenames_optional': [PATH_PARQUET_METEO_TEMP_FR],
             'bucket_name': BUCKET_NAME,
         },
         dag=my_dag)
@@ -214,13 +219,19 @@ with DAG('app_visu_covid_upd_emr', default_args=default_args,
         op_kwargs={'flag_update': True},
         dag=my_dag)
 
+    # Rt France & sums of positive cases for France curve
+    prepare_data_rt_fr_task = PythonOperator(
+        task_id='prepare_data_rt_fr',
+        python_callable=prepare_data_rt_fr_disk,
+        dag=my_dag)
+
     upload_to_S3_task = PythonOperator(
         task_id='upload_to_S3',
         python_callable=upload_files_to_S3_with_hook,
         op_kwargs={
             'filenames': [PATH_DF_GOUV_FR_RAW, PATH_DF_POS_FR, PATH_DF_TEST_FR,
                 PATH_DF_FEAT_FR, PATH_DF_DEP_R0, PATH_PT_FR_TEST_LAST, 
-                PATH_DF_METEO_FR],
+                PATH_DF_RT_FR, PATH_DF_DEP_SUM, PATH_DF_METEO_FR],
             'bucket_name': BUCKET_NAME,
         },
         dag=my_dag)
@@ -230,4 +241,5 @@ with DAG('app_visu_covid_upd_emr', default_args=default_args,
         update_data_meteo_task >> upload_to_S3_meteo_task >> \
         precompute_data_meteo_emr_task >> emr_job_sensor >> \
         download_files_from_S3_task >> prepare_features_task >> \
-        prepare_plot_data_map_task >> upload_to_S3_task
\ No newline at end of file
+        prepare_plot_data_map_task >> upload_to_S3_task
+    precompute_data_pos_task >> prepare_data_rt_fr_task >> upload_to_S3_task
\ No newline at end of file
@@ -4,7 +4,7 @@
 On AWS S3 from SPF and Meteo France
 - check if update is available
 - download raw data on S3
-- treat data with  local Spark  
+- treat data with local Spark (or pandas if few records to treat) 
 - save results in tables (df_gouv_fr_raw / df_meteo_fr or df_feat_fr )
 - 
 '''
@@ -16,6 +16,7 @@ import datetime
 # third party import
 from airflow import DAG
 from airflow.operators.python_operator import PythonOperator 
+from airflow.operators.python_operator import BranchPythonOperator
 from airflow.operators.dummy_operator import DummyOperator 
 from airflow.operators.bash_operator import BashOperator 
 
@@ -26,20 +27,32 @@ import settings
 from my_helpers.data_plots import get_data_gouv_fr
 from my_helpers.data_plots import precompute_data_pos_disk
 from my_helpers.data_plots import update_data_meteo_disk
-from my_helpers.data_plots import precompute_data_meteo_light
+from my_helpers.meteo import precompute_data_meteo_disk
+from my_helpers.meteo import choose_meteo_engine_disk
 from my_helpers.data_plots import prepare_features_disk
 from my_helpers.data_maps import prepare_plot_data_map
+from my_helpers.data_maps import prepare_data_rt_fr_disk
 from S3_helpers import upload_files_to_S3_with_hook
 
 # definitions
 from my_helpers.data_plots import PATH_DF_GOUV_FR_RAW, PATH_DF_POS_FR
 from my_helpers.data_plots import PATH_DF_TEST_FR, PATH_DF_FEAT_FR
 from my_helpers.data_maps import PATH_DF_DEP_R0, PATH_PT_FR_TEST_LAST
+from my_helpers.data_maps import PATH_DF_RT_FR, PATH_DF_DEP_SUM
 from my_helpers.meteo import PATH_DF_METEO_FR
 from my_helpers.meteo import PATH_JSON_METEO_TEMP_FR
+from my_helpers.meteo_engine import ENGINE_PANDAS, ENGINE_SPARK
 
 PATH_METEO_SPARK = os.path.join(PATH_PROJECT, 'meteo_spark.py')
 
+def choose_precompute_meteo_task():
+    '''
+    Spark for big updates (reload from start), pandas for few days
+    '''
+    if choose_meteo_engine_disk() == ENGINE_SPARK:
+        return 'precompute_data_meteo_spark'
+    return 'precompute_data_meteo'
+
 default_args = {
     'owner': 'gregory',
     'start_date': datetime.datetime(2020, 9, 25),
@@ -68,15 +81,28 @@ with DAG('app_visu_covid_update', default_args=default_args,
         python_callable=update_data_meteo_disk,
         dag=my_dag)
     
+    choose_meteo_engine_task = BranchPythonOperator(
+        task_id='choose_meteo_engine',
+        python_callable=choose_precompute_meteo_task,
+        dag=my_dag)
+
+    precompute_data_meteo_task = PythonOperator(
+        task_id='precompute_data_meteo',
+        python_callable=precompute_data_meteo_disk,
+        op_kwargs={'engine': ENGINE_PANDAS},
+        dag=my_dag)
+
     precompute_data_meteo_spark_task = BashOperator(
         task_id='precompute_data_meteo_spark',
         bash_command='/usr/local/opt/apache-spark/bin/spark-submit ' + \
             PATH_METEO_SPARK,
         dag=my_dag)
 
+    # after one of the meteo engines (the other one is skipped)
     prepare_features_task = PythonOperator(
         task_id='prepare_features',
         python_callable=prepare_features_disk,
+        trigger_rule='none_failed',
         dag=my_dag) 
 
     prepare_plot_data_map_task = PythonOperator(
@@ -85,18 +111,26 @@ with DAG('app_visu_covid_update', default_args=default_args,
         op_kwargs={'flag_update': True},
         dag=my_dag)
 
+    # Rt France & sums of positive cases for France curve
+    prepare_data_rt_fr_task = PythonOperator(
+        task_id='prepare_data_rt_fr',
+        python_callable=prepare_data_rt_fr_disk,
+        dag=my_dag)
+
     upload_to_S3_task = PythonOperator(
         task_id='upload_to_S3',
         python_callable=upload_files_to_S3_with_hook,
         op_kwargs={
             'filenames': [PATH_DF_GOUV_FR_RAW, PATH_DF_POS_FR, PATH_DF_TEST_FR,
                 PATH_DF_FEAT_FR, PATH_DF_DEP_R0, PATH_PT_FR_TEST_LAST, 
-                PATH_DF_METEO_FR],
+                PATH_DF_RT_FR, PATH_DF_DEP_SUM, PATH_DF_METEO_FR],
             'bucket_name': 'app-covid-visu-bucket',
         },
         dag=my_dag)
 
     # Use arrows to set dependencies between tasks
     start_task >> get_data_gouv_fr_task >> precompute_data_pos_task >> \
-        update_data_meteo_task >> precompute_data_meteo_spark_task >> \
-        prepare_features_task >> prepare_plot_data_map_task >> upload_to_S3_task
\ No newline at end of file
+        update_data_meteo_task >> choose_meteo_engine_task >> \
+        [precompute_data_meteo_task, precompute_data_meteo_spark_task] >> \
+        prepare_features_task >> prepare_plot_data_map_task >> upload_to_S3_task
+    precompute_data_pos_task >> prepare_data_rt_fr_task >> upload_to_S3_task
\ No newline at end of file
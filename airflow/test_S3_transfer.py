@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import os
+import sys
+# third party libs
+import pytest
+moto = pytest.importorskip("moto")
+import boto3
+from boto3.s3.transfer import TransferConfig
+
+# projects libs
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+import S3_transfer
+from S3_transfer import compute_etag, get_remote_etag
+from S3_transfer import upload_files, download_files
+from S3_transfer import STATUS_DONE, STATUS_SKIPPED, STATUS_DELETED
+
+# definitions
+BUCKET_NAME = "test-bucket"
+# moto >= 5 : mock_aws / before : mock_s3
+mock_aws = getattr(moto, "mock_aws", None) or getattr(moto, "mock_s3")
+# small multipart size (S3 minimum part size : 5 MB)
+SIZE_PART = 5 * 1024 * 1024
+
+@pytest.fixture
+def client():
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET_NAME)
+        yield client
+
+def write_files(tmp_path, nb_files=3):
+    list_path = []
+    for num_file in range(nb_files):
+        path_file = str(tmp_path / f"df_{num_file}.csv")
+        with open(path_file, "w") as f:
+            f.write(f"date,val\n2020-11-01,{num_file}\n")
+        list_path.append(path_file)
+    return list_path
+
+# TESTS
+class TestS3Transfer:
+
+    def test_upload_skip_unchanged(self, client, tmp_path):
+        list_path = write_files(tmp_path)
+        dict_status = upload_files(client, list_path, BUCKET_NAME)
+        assert set(dict_status.values()) == {STATUS_DONE}
+        # only changed file is uploaded
+        with open(list_path[0], "a") as f:
+            f.write("2020-11-02,3\n")
+        dict_status = upload_files(client, list_path, BUCKET_NAME)
+        assert dict_status == {list_path[0]: STATUS_DONE,
+            list_path[1]: STATUS_SKIPPED, list_path[2]: STATUS_SKIPPED}
+
+    def test_download(self, client, tmp_path):
+        list_path = write_files(tmp_path)
+        upload_files(client, list_path, BUCKET_NAME)
+        list_backup = []
+        # unchanged : no download, no backup
+        dict_status = download_files(client, list_path, BUCKET_NAME,
+            fun_backup=list_backup.append)
+        assert set(dict_status.values()) == {STATUS_SKIPPED}
+        assert list_backup == []
+        # local file modified or missing : downloaded
+        with open(list_path[0], "w") as f:
+            f.write("modified\n")
+        os.remove(list_path[1])
+        dict_status = download_files(client, list_path, BUCKET_NAME,
+            fun_backup=list_backup.append)
+        assert dict_status[list_path[0]] == STATUS_DONE
+        assert dict_status[list_path[1]] == STATUS_DONE
+        assert list_backup == [list_path[0]]
+        with open(list_path[0]) as f:
+            assert f.read() == "date,val\n2020-11-01,0\n"
+
+    def test_upload_optional(self, client, tmp_path):
+        # optional file (ex: Parquet) not written : old one removed from S3
+        list_path = write_files(tmp_path, nb_files=2)
+        dict_status = upload_files(client, list_path[:1], BUCKET_NAME,
+            filenames_optional=list_path[1:])
+        assert set(dict_status.values()) == {STATUS_DONE}
+        os.remove(list_path[1])
+        dict_status = upload_files(client, list_path[:1], BUCKET_NAME,
+            filenames_optional=list_path[1:])
+        assert dict_status == {list_path[0]: STATUS_SKIPPED,
+            list_path[1]: STATUS_DELETED}
+        assert get_remote_etag(client, BUCKET_NAME, "df_1.csv") is None
+
+    def test_etag_multipart(self, client, tmp_path, monkeypatch):
+        monkeypatch.setattr(S3_transfer, "TRANSFER_CONFIG",
+            TransferConfig(multipart_threshold=SIZE_PART,
+            multipart_chunksize=SIZE_PART))
+        path_file = str(tmp_path / "big.bin")
+        with open(path_file, "wb") as f:
+            f.write(os.urandom(2 * SIZE_PART + 1000))
+        upload_files(client, [path_file], BUCKET_NAME)
+        etag_local = compute_etag(path_file, threshold=SIZE_PART,
+            chunksize=SIZE_PART)
+        assert etag_local.endswith("-3")
+        assert get_remote_etag(client, BUCKET_NAME, "big.bin") == etag_local
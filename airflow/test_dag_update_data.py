@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import os
+import sys
+import importlib.util
+# third party libs
+import pytest
+pytest.importorskip("airflow.operators.python_operator")
+
+# definitions
+PATH_DAGS = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(PATH_DAGS)
+# critical path (nb of tasks) : start / SPF download / meteo fetch /
+# meteo aggregation / features / upload
+NB_TASKS_CRITICAL_PATH = 6
+
+def load_dag(filename):
+    '''
+    Load DAG defined in DAG file of this folder
+    '''
+    spec = importlib.util.spec_from_file_location(filename[:-3],
+        os.path.join(PATH_DAGS, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.my_dag
+
+def get_critical_path(dag):
+    '''
+    Longest chain of tasks (list of task ids) in dag
+    '''
+    dict_path = dict()
+    def get_path(task):
+        if task.task_id not in dict_path:
+            list_path = [get_path(task_down) for task_down in \
+                task.downstream_list]
+            dict_path[task.task_id] = [task.task_id] + \
+                max(list_path, key=len, default=[])
+        return dict_path[task.task_id]
+    return max([get_path(task) for task in dag.roots], key=len)
+
+# TESTS
+class TestDagUpdateData:
+
+    @classmethod
+    def setup_class(cls):
+        cls.dag = load_dag("dag_update_data.py")
+
+    def test_critical_path(self):
+        list_path = get_critical_path(self.dag)
+        assert len(list_path) == NB_TASKS_CRITICAL_PATH
+        assert list_path[-1] == "upload_to_S3"
+
+    def test_fan_out(self):
+        # run concurrently after SPF raw data download
+        for task_id in ["precompute_data_pos", "update_data_meteo",
+            "prepare_plot_data_map"]:
+            assert self.dag.get_task(task_id).upstream_task_ids == \
+                {"get_data_gouv_fr"}
+        # Rt France only needs positive cases
+        assert self.dag.get_task("prepare_data_rt_fr").upstream_task_ids == \
+            {"precompute_data_pos"}
+
+    def test_fan_in(self):
+        assert self.dag.get_task("prepare_features").upstream_task_ids == \
+            {"precompute_data_pos", "precompute_data_meteo"}
+        assert self.dag.get_task("upload_to_S3").upstream_task_ids == \
+            {"prepare_features", "prepare_plot_data_map", "prepare_data_rt_fr"}
@@ -8,43 +8,85 @@ France with last 14 days data available.
 
 Run this app with `python app.py` and
 visit http://0.0.0.0/ in your web browser.
+In production, run it with WSGI server (see wsgi.py) :
+`gunicorn -c gunicorn.conf.py wsgi:application`
 '''
 # IMPORT 
 
 # import bluit-in 
+import time
+TIME_START = time.perf_counter() # to measure time-to-ready
 import math
 import datetime
 import re
 import os
 import sys
+import json
+import hashlib
+import threading
 # import third party 
 import flask
+from flask_compress import Compress
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from dash.exceptions import PreventUpdate
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+# plotly.subplots : lazy import (slow) in figure functions
 # import project modules 
 import settings
 from my_helpers.dates import *
-from my_helpers.data_plots import prepare_data_input
-from my_helpers.data_plots import prepare_plot_data_pos
 from my_helpers.data_plots import check_update
-from my_helpers.data_plots import PATH_DF_POS_FR
-from my_helpers.data_plots import load_data_pos
+from my_helpers.data_plots import PATH_DF_FEAT_FR
 from my_helpers.model import FUTURE_TARGET, PAST_HISTORY
-from my_helpers.data_maps import prepare_plot_data_map
-from my_helpers.data_maps import calc_rt
-from my_helpers.data_maps import sum_mobile
 from my_helpers.data_maps import NB_DAYS_CV
+from my_helpers.data_maps import get_geo_fr_lod, get_zoom_lod, DICT_GEO_FR
+from my_helpers.data_maps import ZOOM_GEO_MAP, LIST_ZOOM_GEO
+from my_helpers.data_maps import dep_code_to_name, dep_name_to_code
+from my_helpers.data_maps import filter_dep_codes, get_dict_dep_val
+from my_helpers.fig_cache import fig_cache
+from my_helpers.downsample import get_index_plot
+from my_helpers.refresh import refresh_runner, STATE_ERROR
+from my_helpers.data_snapshot import get_snapshot, refresh_snapshot
+from my_helpers.instrument import is_enabled, format_metrics
+from my_helpers.tracing import traced, span, start_trace, end_trace
+from my_helpers.tracing import is_tracing_enabled, get_traces
+from my_helpers.tracing import summarize_traces
 
 # DEFINITIONS
 
 PATH_TO_SAVE_DATA = settings.PATH_TO_SAVE_DATA
+# figure types in cache (by version of snapshot used to build them)
+FIG_RT_DEP = "rt_dep"
+FIG_POS_DEP = "pos_dep"
+FIG_RT_FR = "rt_fr"
+FIG_POS_RATE_FR = "pos_rate_fr"
+LIST_FIG_DEP = [FIG_RT_DEP, FIG_POS_DEP, FIG_RT_FR, FIG_POS_RATE_FR]
+NAME_FR = "France"
+# geometry of map served once as JSON (cached by browser)
+# (level of detail by zoom : URL with zoom changed by browser on zoom)
+URL_GEO_DEP_FR = "/geo/dep_fr.json"
+DICT_GEO_JSON = dict() # (geo mtime, zoom level) : (geojson serialized, etag)
+ZOOM_MAP_FR = 4.25 # zoom of map at start (France)
+# HTTP cache : layout served again if same data (ETag), static files
+# revalidated by browsers & proxies after max age
+URL_LAYOUT = "/_dash-layout"
+URL_ASSETS = "/assets/"
+HTTP_CACHE_MAX_AGE = settings.HTTP_CACHE_MAX_AGE
+DICT_LAYOUT_CACHE = {"etag": None, "data": None}
+# data refresh in background : status polled by page
+URL_REFRESH_STATUS = "/refresh/status"
+INTERVAL_REFRESH = 2000 # [ms]
+# metrics of pipeline stages (Prometheus text) if instrumentation enabled
+URL_METRICS = "/metrics"
+# latency traces of requests (Dash layout & callbacks) if tracing enabled
+URL_DEBUG_TRACES = "/debug/traces"
+URL_UPDATE_COMPONENT = "/_dash-update-component"
+LIST_URL_TRACED = [URL_LAYOUT, URL_UPDATE_COMPONENT]
+NB_TRACES_DEBUG = 20 # last traces served with summary
 
 meta_tags=[{
       'name': 'viewport',
@@ -58,50 +100,76 @@ def display_msg(my_message):
     print("{} : {}".format(\
         datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), my_message))
 
-def jsonifed_pred(df_plot_pred):
-    '''Tranform DataFrame into json with date '''
-    return df_plot_pred.to_json(date_format='iso', orient='split')
+@traced()
+def compact_pred(df_plot_pred):
+    '''
+    Tranform DataFrame into compact columnar dict (lists by column, 
+    no index) for dcc.Store
+    '''
+    return {col: df_plot_pred[col].tolist() for col in df_plot_pred.columns \
+        if col != COL_DATE_DT}
+
+def get_compress_algorithm():
+    '''
+    Compression algorithms of responses in settings 
+    (brotli only if installed)
+    '''
+    try:
+        import brotli
+    except ImportError:
+        return [algo for algo in settings.COMPRESS_ALGORITHM if algo != "br"]
+    return settings.COMPRESS_ALGORITHM
+
+def calc_etag(str_data):
+    '''Strong ETag from data (string)'''
+    return hashlib.md5(str_data.encode()).hexdigest()
 
 # FIGURE FUNC
 
+@traced()
 def create_fig_pos(df_plot, df_plot_pred, df_plot_pred_all, str_date_mdl):
     display_msg("create_fig_pos...")
+    from plotly.subplots import make_subplots
+    # dates : parsed once, sent as numbers (ms) for date axis
+    arr_date = get_dates_ms(df_plot)
+    arr_date_pred = get_dates_ms(df_plot_pred)
+    arr_date_pred_all = get_dates_ms(df_plot_pred_all)
     # Create figure with secondary y-axis
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     # Create and style traces
     # total
-    fig.add_trace(go.Scatter(x=df_plot["date"].astype(np.datetime64), 
-                            y=df_plot["nb_cases"],
+    fig.add_trace(go.Scatter(x=arr_date, 
+                            y=df_plot["nb_cases"].values,
                         mode='lines+markers',
                         line_shape='linear',
                         line_color="blue",
                         connectgaps=True, name="Total"),
                 secondary_y=False)
-    fig.add_trace(go.Scatter(x=df_plot_pred_all["date"].astype(np.datetime64), 
-                            y=df_plot_pred_all["nb_cases"],
+    fig.add_trace(go.Scatter(x=arr_date_pred_all, 
+                            y=df_plot_pred_all["nb_cases"].values,
                         mode='lines+markers',
                         line_shape='hv',
                         line_color="red",
                         connectgaps=True, name="Total (estim.)"),
                 secondary_y=False)
-    fig.add_trace(go.Scatter(x=df_plot_pred["date"].astype(np.datetime64), 
-                            y=df_plot_pred["nb_cases"],
+    fig.add_trace(go.Scatter(x=arr_date_pred, 
+                            y=df_plot_pred["nb_cases"].values,
                         mode='lines+markers',
                         line_shape='hv',
                         line_color="orange",
                         connectgaps=True, name="Total (future estim.)"),
                 secondary_y=False)
     # new cases
-    fig.add_trace(go.Bar(x=df_plot["date"].astype(np.datetime64), 
-                        y=df_plot["pos"], 
+    fig.add_trace(go.Bar(x=arr_date, 
+                        y=df_plot["pos"].values, 
                         name="Daily", opacity=0.33, marker_color="blue"), 
                 secondary_y=True)
-    fig.add_trace(go.Bar(x=df_plot_pred["date"].astype(np.datetime64), 
-            y=df_plot_pred["pos"], 
+    fig.add_trace(go.Bar(x=arr_date_pred, 
+            y=df_plot_pred["pos"].values, 
             name="Daily (future estim.)", opacity=0.33, marker_color="orange"), 
                 secondary_y=True)
-    fig.add_trace(go.Scatter(x=df_plot_pred_all["date"].astype(np.datetime64), 
-                            y=df_plot_pred_all["pos"],
+    fig.add_trace(go.Scatter(x=arr_date_pred_all, 
+                            y=df_plot_pred_all["pos"].values,
                         mode='lines+markers',
                         marker_symbol="cross",
                         line_color="red", opacity=0.33,    
@@ -119,23 +187,22 @@ def create_fig_pos(df_plot, df_plot_pred, df_plot_pred_all, str_date_mdl):
     fig.update_layout(height=600)
 
     fig.update_yaxes(title_text="nb <b>Daily</b> cases", secondary_y=True)
+    fig.update_xaxes(type="date")
     display_msg("create_fig_pos END")
     return fig
 
-def create_fig_rt(df_dep_r0, df_code_dep, pt_fr_test_last):
+@traced()
+def create_fig_rt(df_dep_r0, pt_fr_test_last):
     display_msg("create_fig_rt...")
-    list_num_dep = df_dep_r0.columns[1:].tolist()
-    # path 975 & 977 & 978 doesn't exist in dep name data
-    list_num_dep.remove('975')
-    list_num_dep.remove('977')
-    list_num_dep.remove('978')
+    from plotly.subplots import make_subplots
+    # only dep. of map (975 & 977 & 978 doesn't exist in dep name data)
+    list_num_dep = filter_dep_codes(df_dep_r0.columns[1:])
+    dict_dep_p = get_dict_dep_val(pt_fr_test_last, "p")
 
     list_name_dep = [f'{dep_num_curr} - ' + \
-                df_code_dep.loc[df_code_dep["code"] == dep_num_curr,
-                                    "name"].values[0] + \
+                dep_code_to_name(dep_num_curr) + \
                 "<br>Rt=<b>{:.2f}</b>".format(df_dep_r0[dep_num_curr][-1]) + \
-                " cases={}".format(pt_fr_test_last.loc[ \
-                pt_fr_test_last.dep == dep_num_curr, "p"].values[0]) \
+                " cases={}".format(dict_dep_p[dep_num_curr]) \
                 for dep_num_curr in list_num_dep]
 
     nb_dep = len(list_num_dep)
@@ -149,12 +216,10 @@ def create_fig_rt(df_dep_r0, df_code_dep, pt_fr_test_last):
     for row in range(nb_row):
         for col in range(nb_col):   
             dep_num_curr = list_num_dep[I_dep]
-            dep_curr = df_code_dep.loc[df_code_dep["code"] == dep_num_curr, 
-                                    "name"].values[0]
+            dep_curr = dep_code_to_name(dep_num_curr)
         
             if (df_dep_r0[dep_num_curr][-1] > 1) & \
-                (pt_fr_test_last.loc[ \
-                    pt_fr_test_last.dep == dep_num_curr, "p"].values[0] > 400):
+                (dict_dep_p[dep_num_curr] > 400):
                 color_curr = "red"
             elif (df_dep_r0[dep_num_curr][-1] > 1):
                 color_curr = "orange"
@@ -201,16 +266,17 @@ def create_fig_rt(df_dep_r0, df_code_dep, pt_fr_test_last):
     display_msg("create_fig_rt END.")
     return fig
 
+@traced()
 def create_fig_map(pt_fr_test_last, dep_fr, str_date_last):
     '''Graph Rt map France
     figure map of confirmed / testers and reproduction number by "départements"
      data : 
-     - dep_fr (geo json )
+     - dep_fr (geo json or its URL)
      - pt_fr_test_last : pivot table : sum up last 14 days of confirmed cases
     '''
     display_msg("create_fig_map...")
     lat_lon_fr =  {'lat':  47, 'lon': 2}
-    zoom_fr = 4.25
+    zoom_fr = ZOOM_MAP_FR
     mapbox_args_fr = {'center': lat_lon_fr, 
                     'style': 'carto-positron', 'zoom': zoom_fr}
 
@@ -223,7 +289,14 @@ def create_fig_map(pt_fr_test_last, dep_fr, str_date_last):
 
     fig = go.Figure()
 
-    # Add Traces
+    # Add only one trace (geometry sent once) : 
+    # data z switched by buttons
+    dict_z_p = dict(z=[pt_fr_test_last["p"].tolist()], zauto=[True], 
+        name=["positive"])
+    dict_z_t = dict(z=[pt_fr_test_last["t"].tolist()], zauto=[True], 
+        name=["tested"])
+    dict_z_r0 = dict(z=[pt_fr_test_last["R0"].tolist()], zauto=[False], 
+        zmin=[.5], zmax=[1.5], name=["Rt"])
 
     fig.add_trace(
         go.Choroplethmapbox(geojson=dep_fr, name="positive",
@@ -232,22 +305,6 @@ def create_fig_map(pt_fr_test_last, dep_fr, str_date_last):
                                     z=pt_fr_test_last["p"],
                                     marker_opacity=0.7, marker_line_width=0))
 
-    fig.add_trace(
-        go.Choroplethmapbox(geojson=dep_fr, name="tested",
-                                    locations=pt_fr_test_last["name"], 
-                                    featureidkey="properties.nom",
-                                    z=pt_fr_test_last["t"],
-                                    marker_opacity=0.7, marker_line_width=0,
-                                    visible=False))
-
-    fig.add_trace(
-        go.Choroplethmapbox(geojson=dep_fr, name="Rt",
-                                    locations=pt_fr_test_last["name"], 
-                                    featureidkey="properties.nom",
-                                    z=pt_fr_test_last["R0"], zmin=.5, zmax=1.5,
-                                    marker_opacity=0.7, marker_line_width=0,
-                                    visible=False))
-
     annot_conf=[dict( \
         text="France : <b>Confirmed</b> cases (Total for 14 days before " + \
         f"{str_date_last})", 
@@ -280,17 +337,17 @@ def create_fig_map(pt_fr_test_last, dep_fr, str_date_last):
                 buttons=list([
                     dict(label="Confirmed",
                         method="update",
-                        args=[{"visible": [True, False, False]},
+                        args=[dict_z_p,
                             {"annotations": annot_conf}]),
                     
                     dict(label="Tested",
                         method="update",
-                        args=[{"visible": [False, True, False]},
+                        args=[dict_z_t,
                             {"annotations": annot_test}]),
                     
                     dict(label="Rt",
                         method="update",
-                        args=[{"visible": [False, False, True]},
+                        args=[dict_z_r0,
                             {"annotations": annot_r0}]), 
                     
                     dict(label="Zoom : IdF",
@@ -324,31 +381,34 @@ def create_fig_map(pt_fr_test_last, dep_fr, str_date_last):
     display_msg("create_fig_map END.")
     return fig
 
-def create_fig_rt_dep(dep_curr, df_code_dep, pt_fr_test_last, df_dep_r0):
+@traced()
+def create_fig_rt_dep(dep_curr, pt_fr_test_last, df_dep_r0, x_range=None):
     
     '''Rt evolution plots for one departement
     
      data : 
      - df_dep_r0 (date,  date / dep. Rt)
-     - df_code_dep (-, dep. code / dep name )
      - pt_fr_test_last (-, p / t / dep / code / name / p_0 / R0)
+     - x_range : [date min, date max] zoom (all points inside)
     '''
     display_msg("create_fig_rt_dep ...")
-    dep_num_curr = df_code_dep.loc[df_code_dep["name"] == dep_curr, 
-                            "code"].values[0]
+    dep_num_curr = dep_name_to_code(dep_curr)
+    sum_last = get_dict_dep_val(pt_fr_test_last, "p")[dep_num_curr]
 
-    if (df_dep_r0[dep_num_curr][-1] > 1) & \
-        (pt_fr_test_last.loc[ \
-            pt_fr_test_last.dep == dep_num_curr, "p"].values[0] > 400):
+    if (df_dep_r0[dep_num_curr][-1] > 1) & (sum_last > 400):
         color_curr = "red"
     elif (df_dep_r0[dep_num_curr][-1] > 1):
         color_curr = "orange"
     else:
         color_curr = "blue"
         
+    # points to plot : downsampled
+    arr_index = get_index_plot(df_dep_r0[dep_num_curr].values, 
+        df_dep_r0["date"].values, x_range)
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(x=df_dep_r0["date"], y=df_dep_r0[dep_num_curr],
+    fig.add_trace(go.Scatter(x=df_dep_r0["date"].values[arr_index], 
+                y=df_dep_r0[dep_num_curr].values[arr_index],
                 mode='lines', name=dep_curr, line=dict(color=color_curr),
                 fill='tozeroy'))
 
@@ -373,8 +433,7 @@ def create_fig_rt_dep(dep_curr, df_code_dep, pt_fr_test_last, df_dep_r0):
     subtitle_curr = "Rt: " + \
                     "<b>{:.2f}</b> ".format(df_dep_r0[dep_num_curr][-1]) + \
                     'on {}<br>'.format(df_dep_r0['date'].max())  + \
-                    "sum cases: <b>{}</b>".format(pt_fr_test_last.loc[ \
-                    pt_fr_test_last.dep == dep_num_curr, "p"].values[0]) + \
+                    "sum cases: <b>{:.0f}</b>".format(sum_last) + \
                         " (last 14 days)"
 
     fig.update_layout(
@@ -393,26 +452,31 @@ def create_fig_rt_dep(dep_curr, df_code_dep, pt_fr_test_last, df_dep_r0):
     display_msg("create_fig_rt_dep END.")
     return fig
 
-def create_fig_rt_fr(df_feat_fr):
+@traced()
+def create_fig_rt_fr(df_rt_fr, x_range=None):
     
     '''Rt evolution plots for france
     
      data : 
-     - df_feat_fr (date,  [date, pos] )
+     - df_rt_fr (date,  [date, sum_pos, rt] ) pre-computed
+     - x_range : [date min, date max] zoom (all points inside)
     '''
     display_msg("create_fig_rt_fr ...")
 
-    ser_rt = calc_rt(df_feat_fr["date"], df_feat_fr["pos"], NB_DAYS_CV)
-    sum_last = df_feat_fr["pos"][-NB_DAYS_CV:].sum()
+    ser_rt = df_rt_fr["rt"].dropna()
+    sum_last = df_rt_fr["sum_pos"].values[-1]
 
     if (ser_rt[-1] > 1):
         color_curr = "red"
     else:
         color_curr = "blue"
         
+    # points to plot : downsampled
+    arr_index = get_index_plot(ser_rt.values, ser_rt.index.values, x_range)
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(x=ser_rt.index, y=ser_rt.values,
+    fig.add_trace(go.Scatter(x=ser_rt.index.values[arr_index], 
+                y=ser_rt.values[arr_index],
                 mode='lines', name="France", line=dict(color=color_curr),
                 fill='tozeroy'))
 
@@ -426,7 +490,7 @@ def create_fig_rt_fr(df_feat_fr):
     subtitle_curr = "Rt: " + \
                     "<b>{:.2f}</b> ".format(ser_rt.values[-1]) + \
                     'on {}<br>'.format(ser_rt.index.max())  + \
-                    "sum cases: <b>{}</b>".format(sum_last) + \
+                    "sum cases: <b>{:.0f}</b>".format(sum_last) + \
                         " (last 14 days)"
 
     fig.update_layout(
@@ -455,34 +519,43 @@ def create_fig_rt_fr(df_feat_fr):
     display_msg("create_fig_rt_fr END.")
     return fig
 
-def create_fig_pos_dep(dep_curr, df_code_dep, pt_fr_test_last, df_dep_r0, 
-        df_pos_fr):
+@traced()
+def create_fig_pos_dep(dep_curr, pt_fr_test_last, df_dep_r0, df_pos_fr,
+    df_dep_sum, x_range=None):
     
     '''Confirmed evolution plots for one departement
     
      data : 
      - dep_curr : dept.name current (dept that you display)
      - df_dep_r0 (date, [ date  [Rt by dep.] ])
-     - df_code_dep (-, [ dept.code, dept.name ])
      - pt_fr_test_last (-, 
         [ p, t,  dept.code,  dept.name,  cases,  R0 ]) for last 14 days
      - df_pos_fr (date, [ date, [daily cases by dep.] ])
+     - df_dep_sum (date, [ date, [sums of last 14 days by dep.] ]) 
+     - x_range : [date min, date max] zoom (all points inside)
     '''
     display_msg("create_fig_pos_dep ...")
+    from plotly.subplots import make_subplots
     # choice dept.
-    dep_num_curr = df_code_dep.loc[df_code_dep["name"] == dep_curr, 
-                            "code"].values[0]
-    # calculation
-    ser_start , ser_end = create_date_ranges(df_pos_fr["date"], 14)
-    pos_mean = sum_mobile(df_pos_fr[dep_num_curr], ser_start, ser_end)
+    dep_num_curr = dep_name_to_code(dep_curr)
+    # pre-computed sums
+    pos_mean = df_dep_sum[dep_num_curr]
+
+    # points to plot : downsampled
+    arr_index = get_index_plot(df_pos_fr[dep_num_curr].values, 
+        df_pos_fr["date"].values, x_range)
+    arr_index_mean = get_index_plot(pos_mean.values, pos_mean.index.values,
+        x_range)
 
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
-    fig.add_trace(go.Scatter(x=df_pos_fr["date"], y=df_pos_fr[dep_num_curr],
+    fig.add_trace(go.Scatter(x=df_pos_fr["date"].values[arr_index], 
+                y=df_pos_fr[dep_num_curr].values[arr_index],
                 mode='lines', name="daily", line=dict(color="red"),
                 fill='tozeroy'), secondary_y=False)
 
-    fig.add_trace(go.Scatter(x=pos_mean.index, y=pos_mean,
+    fig.add_trace(go.Scatter(x=pos_mean.index.values[arr_index_mean], 
+                y=pos_mean.values[arr_index_mean],
                 mode='lines', name='14-days-sum', 
                 line=dict(color="blue")), secondary_y=True)
 
@@ -525,26 +598,35 @@ def create_fig_pos_dep(dep_curr, df_code_dep, pt_fr_test_last, df_dep_r0,
     display_msg("create_fig_rt_dep END.")
     return fig
 
-def create_fig_pos_rate_fr(df_feat_fr):
+@traced()
+def create_fig_pos_rate_fr(df_feat_fr, x_range=None):
     '''
     data : 
      - df_feat_fr (date,  [date, pos , test, age_pos] )
+     - x_range : [date min, date max] zoom (all points inside)
 
     pos_rate =  100*df_feat_fr["pos"] / df_feat_fr["test"]
 
     '''
     display_msg("create_fig_pos_dep ...")
+    from plotly.subplots import make_subplots
     rate_pos = 100*df_feat_fr["pos"] / df_feat_fr["test"]
 
+    # points to plot : downsampled
+    arr_date = df_feat_fr["date"].values
+    arr_index = get_index_plot(rate_pos.values, arr_date, x_range)
+    arr_index_age = get_index_plot(df_feat_fr["age_pos"].values, arr_date, 
+        x_range)
+
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
-    fig.add_trace(go.Scatter(x=df_feat_fr["date"], 
-        y=rate_pos.values,
+    fig.add_trace(go.Scatter(x=arr_date[arr_index], 
+        y=rate_pos.values[arr_index],
         mode='lines', name="pos. rate", line=dict(color="red"),
         fill='tozeroy'), secondary_y=False)
 
-    fig.add_trace(go.Scatter(x=df_feat_fr["date"], 
-            y=df_feat_fr["age_pos"],
+    fig.add_trace(go.Scatter(x=arr_date[arr_index_age], 
+            y=df_feat_fr["age_pos"].values[arr_index_age],
             mode='lines', name='pos. age', 
             line=dict(color="blue")), secondary_y=True)
 
@@ -579,16 +661,231 @@ def create_fig_pos_rate_fr(df_feat_fr):
 
     return fig
 
+# FIGURE CACHE
+
+@traced()
+def build_fig_dep(fig_type, dep_curr, x_range=None, snapshot=None):
+    '''
+    Build figure of type fig_type for departement dep_curr (or France)
+    from data of snapshot (default current one)
+    (x_range : zoom [date min, date max])
+    '''
+    if snapshot is None:
+        snapshot = get_snapshot()
+    if fig_type == FIG_RT_FR:
+        return create_fig_rt_fr(snapshot["df_rt_fr"], x_range)
+    if fig_type == FIG_POS_RATE_FR:
+        return create_fig_pos_rate_fr(snapshot["df_feat_fr"], x_range)
+    if fig_type == FIG_RT_DEP:
+        return create_fig_rt_dep(dep_curr, snapshot["pt_fr_test_last"], 
+            snapshot["df_dep_r0"], x_range)
+    return create_fig_pos_dep(dep_curr, snapshot["pt_fr_test_last"], 
+        snapshot["df_dep_r0"], snapshot["df_pos_fr"], snapshot["df_dep_sum"],
+        x_range)
+
+@traced()
+def get_fig_dep(fig_type, dep_curr=NAME_FR, x_range=None):
+    '''
+    Get figure of type fig_type for departement dep_curr (or France)
+    from figures cache (built if needed)
+    With zoom x_range, figure with all points in range (not cached)
+    Cached with version of snapshot used to build it (not of files on disk :
+    new during refresh while old snapshot is still used)
+    '''
+    snapshot = get_snapshot()
+    if x_range is not None:
+        fig = build_fig_dep(fig_type, dep_curr, x_range, snapshot)
+        with span("to_json"):
+            return json.loads(fig.to_json())
+    return fig_cache.get_fig(fig_type, dep_curr, snapshot["version"], 
+        lambda: build_fig_dep(fig_type, dep_curr, snapshot=snapshot))
+
+def get_x_range(relayout_data):
+    '''
+    Zoom on x axis from relayoutData of graph : [x min, x max], 
+    None if zoom reset, False if no change of x axis
+    '''
+    if relayout_data is None:
+        return False
+    if "xaxis.range[0]" in relayout_data:
+        return [relayout_data["xaxis.range[0]"], 
+            relayout_data["xaxis.range[1]"]]
+    if "xaxis.range" in relayout_data:
+        return relayout_data["xaxis.range"]
+    if relayout_data.get("xaxis.autorange"):
+        return None
+    return False
+
+def prewarm_fig_cache():
+    '''
+    Pre-render figures of all departements and France into figures cache
+    (data loaded only once)
+    '''
+    display_msg("prewarm_fig_cache ...")
+    snapshot = get_snapshot()
+    for fig_type in [FIG_RT_FR, FIG_POS_RATE_FR]:
+        fig_cache.get_fig(fig_type, NAME_FR, snapshot["version"], 
+            lambda: build_fig_dep(fig_type, NAME_FR, snapshot=snapshot))
+    for dep_curr in snapshot["pt_fr_test_last"]["name"]:
+        for fig_type in [FIG_RT_DEP, FIG_POS_DEP]:
+            fig_cache.get_fig(fig_type, dep_curr, snapshot["version"], 
+                lambda: build_fig_dep(fig_type, dep_curr, snapshot=snapshot))
+    fig_cache.log_stats()
+    display_msg("prewarm_fig_cache END.")
+
+def prewarm_fig_cache_async():
+    '''Pre-render figures in background if activated in settings'''
+    if settings.FIG_CACHE_PREWARM:
+        threading.Thread(target=prewarm_fig_cache, daemon=True).start()
+
+# DATA REFRESH
+
+def refresh_data(fun_progress):
+    '''
+    Refresh job : download & compute new data, swap snapshot, 
+    then pre-render figures
+    '''
+    refresh_snapshot(fun_progress)
+    prewarm_fig_cache_async()
+
+def start_refresh():
+    '''
+    Start data refresh in background (return False if already running)
+    '''
+    return refresh_runner.start(refresh_data)
+
+def get_str_refresh(dict_status):
+    '''Message of refresh status for page'''
+    if dict_status["state"] == STATE_ERROR:
+        return "Update failed : {}".format(dict_status["error"])
+    return "Updating data : {} ({:.0f}%)...".format(dict_status["step"], 
+        100 * dict_status["progress"])
+
 # APP DASH
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 server = flask.Flask(__name__)
-app = dash.Dash(__name__, external_stylesheets=external_stylesheets, 
-    meta_tags=meta_tags)
+# compression (gzip / brotli) of responses : not by Dash (gzip only)
+server.config["COMPRESS_ALGORITHM"] = get_compress_algorithm()
+Compress(server)
+app = dash.Dash(__name__, server=server, compress=False,
+    external_stylesheets=external_stylesheets, meta_tags=meta_tags)
 app.title = "App Covid Visu"
 
+@app.server.route(URL_GEO_DEP_FR)
+def serve_geo_dep_fr():
+    '''
+    Serve geojson dep. France simplified for zoom level (arg: zoom)
+    (cached by browser : revalidated with ETag after max age)
+    Cached by level of detail (LIST_ZOOM_GEO), 400 if zoom not a number
+    '''
+    try:
+        zoom = float(flask.request.args.get("zoom", ZOOM_GEO_MAP))
+    except ValueError:
+        flask.abort(400)
+    if not math.isfinite(zoom):
+        flask.abort(400)
+    zoom_lod = get_zoom_lod(zoom)
+    geo_lod = get_geo_fr_lod(zoom_lod)
+    key_geo = (DICT_GEO_FR["mtime"], zoom_lod)
+    if key_geo not in DICT_GEO_JSON:
+        # geojson file modified : old versions dropped
+        for key_old in [key for key in DICT_GEO_JSON \
+            if key[0] != key_geo[0]]:
+            del DICT_GEO_JSON[key_old]
+        str_geo = json.dumps(geo_lod)
+        DICT_GEO_JSON[key_geo] = (str_geo, calc_etag(str_geo))
+    str_geo, etag = DICT_GEO_JSON[key_geo]
+    response = flask.Response(str_geo, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = HTTP_CACHE_MAX_AGE
+    return response.make_conditional(flask.request)
+
+def get_url_geo(zoom=ZOOM_MAP_FR):
+    '''
+    URL of geojson dep. France for map zoom level (level of detail)
+    '''
+    return "{}?zoom={}".format(URL_GEO_DEP_FR, get_zoom_lod(zoom))
+
+def get_etag_layout():
+    '''
+    ETag of page layout from version of data snapshot (same key as figures
+    cached). None if no data yet or data refresh running : layout not cached
+    '''
+    if refresh_runner.is_running() or (not os.path.isfile(PATH_DF_FEAT_FR)):
+        return None
+    return calc_etag(get_snapshot()["version"])
+
+@server.before_request
+def start_request_trace():
+    '''
+    Trace of Dash request (layout or callback), named by callback
+    (registered first : cached layout traced too)
+    '''
+    if is_tracing_enabled() and (flask.request.path in LIST_URL_TRACED):
+        start_trace(flask.request.path)
+
+@server.teardown_request
+def end_request_trace(error=None):
+    '''
+    End trace of request : time after callback is serialization of result
+    '''
+    end_trace(name_tail="response", error=error)
+
+@server.before_request
+def serve_layout_cached():
+    '''
+    Layout not computed again if same data : 
+    304 if browser has it (If-None-Match) or layout from cache
+    (check of update done before : new layout starts data refresh)
+    '''
+    if (flask.request.path != URL_LAYOUT) or \
+        (flask.request.method != "GET"):
+        return None
+    etag = get_etag_layout()
+    if (etag is None) or settings.MODE_FORCE_UPDATE or check_update():
+        return None
+    # ETag of compressed response : etag:gzip, etag:br...
+    if etag in [tag.split(":")[0] for tag in flask.request.if_none_match]:
+        response = flask.Response(status=304)
+        response.set_etag(etag)
+        return response
+    if DICT_LAYOUT_CACHE["etag"] == etag:
+        response = flask.Response(DICT_LAYOUT_CACHE["data"], 
+            mimetype="application/json")
+        response.set_etag(etag)
+        return response
+    flask.g.etag_layout = etag # layout computed for this data version
+    return None
+
+@server.after_request
+def set_cache_headers(response):
+    '''
+    Layout : ETag, saved in cache & always revalidated by browsers. 
+    Assets : cached by browsers & proxies
+    '''
+    if flask.request.path == URL_LAYOUT:
+        response.cache_control.no_cache = True
+        etag = flask.g.get("etag_layout")
+        if (etag is not None) and (response.status_code == 200) and \
+            (get_etag_layout() == etag):
+            DICT_LAYOUT_CACHE.update(etag=etag, 
+                data=response.get_data(as_text=True))
+            response.set_etag(etag)
+    elif flask.request.path.startswith(URL_ASSETS):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = HTTP_CACHE_MAX_AGE
+        if response.get_etag()[0] is None:
+            response.direct_passthrough = False
+            response.add_etag()
+            response = response.make_conditional(flask.request)
+    return response
+
+@traced(flag_root=True)
 def startup_layout():
     '''
-    startup web page
+    startup web page (data refresh started in background if needed)
     '''
     display_msg("STARTUP...")
     
@@ -596,22 +893,34 @@ def startup_layout():
     #dtime_now  = datetime.datetime.now() - time_file_df_feat_date
 
     # update 
-    if settings.MODE_FORCE_UPDATE:
-        flag_update = True
-    else:
-        flag_update = check_update()
-    
-    # prepare input data
-    df_feat_fr, str_date_mdl, str_data_date = prepare_data_input(flag_update)
+    if not os.path.isfile(PATH_DF_FEAT_FR):
+        # first start : nothing to display before data downloaded
+        start_refresh()
+        refresh_runner.wait()
+    elif settings.MODE_FORCE_UPDATE or check_update():
+        start_refresh()
     
-    # prepare plot data for positive cases
-    df_plot, df_plot_pred, df_plot_pred_all, str_date_last = \
-        prepare_plot_data_pos(df_feat_fr, flag_update)
+    # data of last refresh done
+    snapshot = get_snapshot()
 
-    # prepare plot data for MAPS
-    df_dep_r0, pt_fr_test_last, dep_fr, df_code_dep = \
-        prepare_plot_data_map(flag_update)
-    
+    display_msg("STARTUP END.")
+    return create_layout(snapshot["str_data_date"], 
+        create_fig_pos(snapshot["df_plot"], snapshot["df_plot_pred"], 
+            snapshot["df_plot_pred_all"], snapshot["str_date_mdl"]),
+        create_fig_map(snapshot["pt_fr_test_last"], get_url_geo(), 
+            snapshot["str_date_last"]),
+        get_fig_dep(FIG_RT_DEP, "Paris"),
+        compact_pred(snapshot["df_plot_pred"]), 
+        compact_pred(snapshot["df_plot_pred_all"]),
+        snapshot["version"], refresh_runner.is_running())
+
+@traced()
+def create_layout(str_data_date, fig_pos, fig_map, fig_rt_dep, data_pred,
+        data_pred_all, snapshot_version="", flag_refresh=False):
+    '''
+    web page layout with its figures and data
+    (flag_refresh : data refresh running, status polled)
+    '''
     # informations
     markdown_info = '''
     ***Legend***    
@@ -656,7 +965,6 @@ def startup_layout():
     - Météo France : https://public.opendatasoft.com/explore/dataset/donnees-synop-essentielles-omm
 
     '''
-    display_msg("STARTUP END.")
     return html.Div(children=[
         html.H1(children='COVID-19 in France Dashboard: ' + \
             'Datavisualization & Model'),
@@ -667,6 +975,8 @@ def startup_layout():
             type="default",
             children=html.Div(id="loading-output-1", children=str_data_date)), 
             style={'display': 'inline-block', 'margin-right': 10}),
+        dcc.Interval(id='interval-refresh', interval=INTERVAL_REFRESH, 
+            disabled=not flag_refresh),
             
         html.Div(children=html.A(
             children="By Gregory LANG, Data Scientist Freelance",
@@ -676,171 +986,184 @@ def startup_layout():
         dcc.Tabs(id='tabs-example', value='tab-1', children=[
             dcc.Tab(label='Evolution & Model', value='tab-1', children=[
             dcc.Graph(id='covid-pos-graph',
-            figure=create_fig_pos(df_plot, df_plot_pred, df_plot_pred_all, 
-                str_date_mdl), style={'margin-top': 10})
+            figure=fig_pos, style={'margin-top': 10})
             ]),
             dcc.Tab(label='Maps', 
                 value='tab-2', children=[
                 html.Div(id="div-rt-map", children=dcc.Graph(id='covid-rt-map',
-            figure=create_fig_map(pt_fr_test_last, dep_fr, str_date_last), 
-                ), style={'display': 'inline-block', 
+            figure=fig_map), style={'display': 'inline-block', 
                     'margin-right': 1}, n_clicks=0, className="app-map"),
                 html.Div(dcc.Graph(id='covid-rt-dep-graph',
-            figure=create_fig_rt_dep("Paris", df_code_dep,pt_fr_test_last, 
-                df_dep_r0)), style={'display': 'inline-block', 
+            figure=fig_rt_dep), style={'display': 'inline-block', 
                 'margin-top': 0}, className="app-graph-map")
             ])
         ], style={'margin-top': 10}),
-        # Hidden div inside the app that stores the intermediate value
-        html.Div(id='predicted-value', style={'display': 'none'},
-            children=jsonifed_pred(df_plot_pred)),
-        html.Div(id='predicted-value-all', style={'display': 'none'},
-            children=jsonifed_pred(df_plot_pred_all)),
-        html.Div(id='graph_type', style={'display': 'none'},
-            children=0),
-        html.Div(id='id_button', style={'display': 'none'},
-            children=0), 
-        html.Div(id='mode_country', style={'display': 'none'},
-            children=0),
-        html.Div(id='dep', style={'display': 'none'},
-            children=""),    
+        # stores of page data in browser memory (only posted to server
+        # if needed by callbacks)
+        dcc.Store(id='predicted-value', storage_type='memory',
+            data=data_pred),
+        dcc.Store(id='predicted-value-all', storage_type='memory',
+            data=data_pred_all),
+        dcc.Store(id='graph_type', storage_type='memory', data=0),
+        dcc.Store(id='id_button', storage_type='memory', data=0), 
+        dcc.Store(id='mode_country', storage_type='memory', data=0),
+        dcc.Store(id='dep', storage_type='memory', data=""),    
+        # figure of dep. graph requested to server (type & dep.)
+        dcc.Store(id='fig-dep-request', storage_type='memory'),
+        dcc.Store(id='snapshot-version', storage_type='memory',
+            data=snapshot_version),
+        # levels of detail of map geometry (URL changed on zoom)
+        dcc.Store(id='geo-zoom', storage_type='memory',
+            data={"url": URL_GEO_DEP_FR, "list_zoom": LIST_ZOOM_GEO,
+            "zoom": get_zoom_lod(ZOOM_MAP_FR)}),
         html.Div(id='info', children=dcc.Markdown(children=markdown_info))
         ])
 
+# fast start : layout (data & figures) computed at first page load only
+# (else Dash computes it once at startup to validate callbacks)
+MODE_FAST_START = settings.MODE_FAST_START | \
+    (os.getenv("APP_FAST_START") == "1")
+if MODE_FAST_START:
+    app.validation_layout = create_layout("", {}, {}, {}, None, None)
 app.layout = startup_layout
 
 
-# button update data
+@app.server.route(URL_REFRESH_STATUS)
+def serve_refresh_status():
+    '''
+    Status of data refresh : state, step, progress...
+    '''
+    return flask.jsonify(refresh_runner.get_status())
+
+@app.server.route(URL_METRICS)
+def serve_metrics():
+    '''
+    Metrics of pipeline stages of this process in Prometheus text format
+    (404 if instrumentation disabled)
+    '''
+    if not is_enabled():
+        flask.abort(404)
+    return flask.Response(format_metrics(), 
+        mimetype="text/plain; version=0.0.4")
+
+@app.server.route(URL_DEBUG_TRACES)
+def serve_debug_traces():
+    '''
+    Latency of requests : p50 / p95 / p99 by callback and by nested span,
+    and last traces (arg: nb, default if not integer, max buffer size)
+    (404 if tracing disabled)
+    '''
+    if not is_tracing_enabled():
+        flask.abort(404)
+    nb_last = flask.request.args.get("nb", NB_TRACES_DEBUG, type=int)
+    nb_last = max(1, min(nb_last, settings.TRACING_BUFFER_SIZE))
+    return flask.jsonify({"summary": summarize_traces(), 
+        "traces": get_traces(nb_last)})
+
+# button update data : refresh started in background, page polls status
 @app.callback(
     [dash.dependencies.Output('loading-output-1', 'children'), 
     dash.dependencies.Output('covid-pos-graph', 'figure'),
-    dash.dependencies.Output('covid-rt-map', 'figure')],
-    [dash.dependencies.Input('update-data', 'n_clicks')],
-    [dash.dependencies.State('predicted-value', 'children'),
-    dash.dependencies.State('predicted-value-all', 'children')])
-def load_figure(n_clicks, jsonified_pred, jsonified_pred_all):
+    dash.dependencies.Output('covid-rt-map', 'figure'),
+    dash.dependencies.Output('interval-refresh', 'disabled'),
+    dash.dependencies.Output('snapshot-version', 'data')],
+    [dash.dependencies.Input('update-data', 'n_clicks'),
+    dash.dependencies.Input('interval-refresh', 'n_intervals')],
+    [dash.dependencies.State('snapshot-version', 'data')])
+@traced(flag_root=True)
+def load_figure(n_clicks, n_intervals, snapshot_version):
     display_msg("UPDATE DATA BUTTON ...")
     
-    if n_clicks < 1: # no update at loading
-        display_msg("Nothing to do")
+    list_prop_id = [trig["prop_id"] for trig in \
+        dash.callback_context.triggered]
+    if "update-data.n_clicks" in list_prop_id:
+        if n_clicks < 1: # no update at loading
+            display_msg("Nothing to do")
+            display_msg("UPDATE DATA BUTTON END.")
+            raise PreventUpdate
+        if (not refresh_runner.is_running()) and check_update():
+            start_refresh()
+
+    dict_status = refresh_runner.get_status()
+    if refresh_runner.is_running() or (dict_status["state"] == STATE_ERROR):
         display_msg("UPDATE DATA BUTTON END.")
-        return dash.no_update
+        return get_str_refresh(dict_status), dash.no_update, \
+            dash.no_update, dict_status["state"] == STATE_ERROR, \
+            dash.no_update
 
-    flag_update = check_update()
-
-    # prepare data input
-    df_feat_fr, str_date_mdl, str_data_date = prepare_data_input(flag_update)
-    
-    # plot data for positive cases
-    df_plot, df_plot_pred, df_plot_pred_all, str_date_last = \
-        prepare_plot_data_pos(df_feat_fr, flag_update)
-
-    # prepare plot data for MAPS
-    df_dep_r0, pt_fr_test_last, dep_fr, df_code_dep = \
-        prepare_plot_data_map(flag_update)
+    # refresh done : display new data only if changed
+    snapshot = get_snapshot()
+    if snapshot["version"] == snapshot_version:
+        display_msg("UPDATE DATA BUTTON END.")
+        return snapshot["str_data_date"], dash.no_update, dash.no_update, \
+            True, dash.no_update
 
     display_msg("UPDATE DATA BUTTON END.")
-    return str_data_date, \
-        create_fig_pos(df_plot, df_plot_pred, df_plot_pred_all, str_date_mdl), \
-        create_fig_map(pt_fr_test_last, dep_fr, str_date_last)
+    return snapshot["str_data_date"], \
+        create_fig_pos(snapshot["df_plot"], snapshot["df_plot_pred"], 
+            snapshot["df_plot_pred_all"], snapshot["str_date_mdl"]), \
+        create_fig_map(snapshot["pt_fr_test_last"], get_url_geo(), 
+            snapshot["str_date_last"]), \
+        True, snapshot["version"]
+
+# click on map : graph type & dept. computed by browser from map figure
+# (assets/app_clientside.js), only request of figure sent to server
+app.clientside_callback(
+    ClientsideFunction(namespace='map', function_name='click_map'),
+    [Output('graph_type', 'data'), 
+    Output('id_button', 'data'),
+    Output('mode_country', 'data'),
+    Output('dep', 'data'),
+    Output('fig-dep-request', 'data')],
+    [Input('covid-rt-map', 'clickData'), 
+    Input('div-rt-map', 'n_clicks')], 
+    [State('covid-rt-map', 'figure'),
+    State('graph_type', 'data'),
+    State('id_button', 'data'),
+    State('mode_country', 'data'),
+    State('dep', 'data'),
+    State('fig-dep-request', 'data')])
+
+# zoom of map : geometry with level of detail of zoom loaded by browser
+# (assets/app_clientside.js), map figure not sent again by server
+app.clientside_callback(
+    ClientsideFunction(namespace='map', function_name='zoom_geo'),
+    Output('geo-zoom', 'data'),
+    [Input('covid-rt-map', 'relayoutData')],
+    [State('geo-zoom', 'data')])
 
-# click on map
-"""
 @app.callback(
     Output('covid-rt-dep-graph', 'figure'),
-    [Input('covid-rt-map', 'clickData')], 
-    dash.dependencies.State('div-rt-map', 'n_clicks')])
-def display_click_data(clickData, n_clicks):"""
-
-@app.callback(
-    [Output('covid-rt-dep-graph', 'figure'),
-    Output('graph_type', 'children'), 
-    Output('id_button', 'children'),
-    Output('mode_country', 'children'),
-    Output('dep', 'children')],
-    [Input('covid-rt-map', 'clickData'), 
-    Input('div-rt-map', 'n_clicks')], 
-    [dash.dependencies.State('covid-rt-map', 'figure'),
-    dash.dependencies.State('graph_type', 'children'),
-    dash.dependencies.State('id_button', 'children'),
-    dash.dependencies.State('mode_country', 'children'),
-    dash.dependencies.State('dep', 'children'),
-    dash.dependencies.State('covid-rt-map', 'hoverData')])
-def display_click_data(clickData, n_clicks, fig, graph_type_old, id_button_old,
-    mode_country_old, dep_old, hoverData):
-    display_msg(" ")
-    display_msg("display_click_data ...")
-    print("clickData: ", clickData)
-    print("hoverData: ", hoverData)
-    # check current dept.:
-    try:
-        dep_curr = clickData["points"][0]["location"]
-    except:
-        dep_curr = "Paris"
-    print(dep_curr)
-
-    # treat graph type :
-    (a,) = fig["layout"]["updatemenus"]
-    id_button = a["active"]
-    if id_button < 3:
-        graph_type = id_button
-    else:
-        graph_type = graph_type_old
-
-    print('id_button (old): ', id_button_old)
-    print('id_button (new): ', id_button)
-    print("graph_type (old):", graph_type_old)
-    print("graph_type (new):", graph_type)
-
-    # if click change to France button, display Country not dept.
-    if (id_button_old !=4) & (id_button==4):
-        mode_country = 1
-    # if no change for buttons or graph type but change dept
-    # then displays dept.
-    elif (id_button_old == id_button) & (graph_type_old == graph_type):
-        if (dep_curr != dep_old):
-            mode_country = 0
-        else:
-            mode_country = 1
-    else:
-        mode_country = mode_country_old
-    print("mode_country: ", mode_country)
-    # si type graph Rt
-    if (graph_type == 2):
-        if (mode_country == 1): #(id_button == 4) | (clickData is None):
-            # load from disk
-            df_feat_fr = load_data_pos()
-            fig_out = create_fig_rt_fr(df_feat_fr)
-        else:
-            # prepare plot data for MAPS
-            df_dep_r0, pt_fr_test_last, dep_fr, df_code_dep = \
-                prepare_plot_data_map(False)
-            fig_out = create_fig_rt_dep(dep_curr, df_code_dep, 
-                    pt_fr_test_last, df_dep_r0)
-    # user had just click on  "Test" button, only country graph available
-    #elif (graph_type_old != 1) &  (id_button == 1):
-    elif (graph_type == 1):
-        df_feat_fr = load_data_pos()
-        fig_out = create_fig_pos_rate_fr(df_feat_fr)
-    # user in mode Confirmed, only dept. available 
-    #elif (id_button == 0):
+    [Input('fig-dep-request', 'data'),
+    Input('covid-rt-dep-graph', 'relayoutData')])
+@traced(flag_root=True)
+def display_fig_dep(fig_request, relayout_data):
+    '''
+    Figure of dep. graph requested : {"fig_type": FIG_..., "dep": dep. name}
+    Downsampled, with all points in zoom range after zoom on x axis
+    '''
+    display_msg("display_fig_dep ...")
+    if (fig_request is None) or \
+        (fig_request.get("fig_type") not in LIST_FIG_DEP):
+        raise PreventUpdate
+    list_prop_id = [trig["prop_id"] for trig in \
+        dash.callback_context.triggered]
+    x_range = None
+    if "covid-rt-dep-graph.relayoutData" in list_prop_id:
+        x_range = get_x_range(relayout_data)
+        if x_range is False: # no zoom change (ex: legend, hover mode)
+            raise PreventUpdate
+    fig_type = fig_request["fig_type"]
+    if fig_type in [FIG_RT_FR, FIG_POS_RATE_FR]:
+        fig_out = get_fig_dep(fig_type, x_range=x_range)
     else:
-        # if user in mode "Confirmed"
-        # prepare plot data for MAPS
-        df_dep_r0, pt_fr_test_last, dep_fr, df_code_dep = \
-            prepare_plot_data_map(False)
-        df_pos_fr = pd.read_csv(PATH_DF_POS_FR)
-        df_pos_fr.index = df_pos_fr["date"]
-        fig_out = create_fig_pos_dep(dep_curr, df_code_dep, 
-                    pt_fr_test_last, df_dep_r0, df_pos_fr)
-    '''else:
-        print("PreventUpdate.")
-        raise PreventUpdate  ''' 
-
-    display_msg("display_click_data END.")
-    if dep_curr is None:
-        dep_curr =""
-    return fig_out, graph_type, id_button, mode_country, dep_curr
+        fig_out = get_fig_dep(fig_type, fig_request.get("dep", "Paris"), 
+            x_range)
+    # zoom of user kept while same figure
+    fig_out["layout"]["uirevision"] = "{}_{}".format(fig_type, 
+        fig_request.get("dep"))
+    display_msg("display_fig_dep END.")
+    return fig_out
     
 
 if __name__ == '__main__':
@@ -851,6 +1174,13 @@ if __name__ == '__main__':
 
     if os.getenv("APP_MODE_ENV") is not None:
         if os.getenv("APP_MODE_ENV") == "TEST":
+            print("time-to-ready: {:.2f} s".format(
+                time.perf_counter() - TIME_START))
+            if MODE_FAST_START:
+                # check also data & figures preparation
+                startup_layout()
+                print("time-to-first-page: {:.2f} s".format(
+                    time.perf_counter() - TIME_START))
             print("Test App Preparation OK.")
             sys.exit()
 
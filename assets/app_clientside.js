@@ -0,0 +1,83 @@
+/* Clientside callbacks of App Covid Visu (run in browser)
+ *
+ * Click on map or on its buttons : graph type & departement computed here
+ * from map figure (never sent to server). Only the request of figure
+ * (type & departement) is sent to server when it changes.
+ * Zoom of map : geometry of level of detail needed loaded from server.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    map: {
+        // figure types : same as FIG_* in app.py
+        click_map: function(clickData, n_clicks, fig, graph_type_old,
+                id_button_old, mode_country_old, dep_old, fig_request_old) {
+            // check current dept.
+            var dep_curr = "Paris";
+            if (clickData && clickData.points && clickData.points.length &&
+                    clickData.points[0].location) {
+                dep_curr = clickData.points[0].location;
+            }
+            // treat graph type : active button of map
+            var id_button = fig.layout.updatemenus[0].active;
+            var graph_type = (id_button < 3) ? id_button : graph_type_old;
+            var mode_country;
+            // if click change to France button, display Country not dept.
+            if ((id_button_old != 4) && (id_button == 4)) {
+                mode_country = 1;
+            // if no change for buttons or graph type but change dept
+            // then displays dept.
+            } else if ((id_button_old == id_button) &&
+                    (graph_type_old == graph_type)) {
+                mode_country = (dep_curr != dep_old) ? 0 : 1;
+            } else {
+                mode_country = mode_country_old;
+            }
+            // figure for Rt (dept. or country), Tested (country only)
+            // or Confirmed (dept. only)
+            var fig_request;
+            if (graph_type == 2) {
+                fig_request = (mode_country == 1) ?
+                    {fig_type: "rt_fr", dep: "France"} :
+                    {fig_type: "rt_dep", dep: dep_curr};
+            } else if (graph_type == 1) {
+                fig_request = {fig_type: "pos_rate_fr", dep: "France"};
+            } else {
+                fig_request = {fig_type: "pos_dep", dep: dep_curr};
+            }
+            // no server call if same figure
+            if (fig_request_old && 
+                    (fig_request_old.fig_type == fig_request.fig_type) &&
+                    (fig_request_old.dep == fig_request.dep)) {
+                fig_request = window.dash_clientside.no_update;
+            }
+            return [graph_type, id_button, mode_country, dep_curr,
+                fig_request];
+        },
+        // zoom of map : geometry URL with level of detail of zoom
+        // (finest level needed, same as get_zoom_lod in data_maps.py)
+        zoom_geo: function(relayoutData, geo_zoom) {
+            var zoom;
+            if (relayoutData && (relayoutData["mapbox.zoom"] !== undefined)) {
+                zoom = relayoutData["mapbox.zoom"];
+            } else if (relayoutData && relayoutData.mapbox &&
+                    (relayoutData.mapbox.zoom !== undefined)) {
+                zoom = relayoutData.mapbox.zoom;
+            } else {
+                return window.dash_clientside.no_update;
+            }
+            var list_zoom_ok = geo_zoom.list_zoom.filter(function(zoom_curr) {
+                return zoom_curr >= zoom;
+            });
+            var zoom_lod = list_zoom_ok.length ? Math.min.apply(null,
+                list_zoom_ok) : Math.max.apply(null, geo_zoom.list_zoom);
+            var url_geo = geo_zoom.url + "?zoom=" + zoom_lod;
+            // geometry already loaded (figure can be replaced by server)
+            var graph = document.querySelector("#covid-rt-map .js-plotly-plot");
+            if (!graph || !graph.data || (graph.data[0].geojson == url_geo)) {
+                return window.dash_clientside.no_update;
+            }
+            Plotly.restyle(graph, {geojson: [url_geo]}, [0]);
+            return {url: geo_zoom.url, list_zoom: geo_zoom.list_zoom,
+                zoom: zoom_lod};
+        }
+    }
+});
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+''' Benchmark build of figure of positive cases (create_fig_pos) as 
+history grows : dates parsed once (datetime64) or parsed by each trace
+
+python -m benchmarks.bench_fig_pos
+'''
+
+# import built-in
+import os
+import time
+os.environ["APP_FAST_START"] = "1" # no data preparation at import
+
+# import third party
+import numpy as np
+import pandas as pd
+
+# import project modules
+import app
+from my_helpers.dates import add_date_dt
+from benchmarks.helpers import time_func, save_results
+
+# DEFINITIONS
+LIST_NB_DAYS = [63, 365, 3650] # nb of days of history in figure
+NB_DAYS_PRED = 7
+
+def create_data_plot(nb_days, seed=0):
+    '''
+    Data of positive cases (df_plot, df_plot_pred, df_plot_pred_all)
+    for nb_days of history
+    '''
+    rng = np.random.RandomState(seed)
+    list_dates = pd.date_range("2020-05-13", periods=nb_days + NB_DAYS_PRED) \
+        .strftime("%Y-%m-%d").tolist()
+    arr_pos = rng.randint(1000, 20000, nb_days + NB_DAYS_PRED)
+    df_all = pd.DataFrame({"date": list_dates, "pos": arr_pos,
+        "nb_cases": arr_pos.cumsum()}, index=list_dates)
+    return df_all.iloc[:nb_days].copy(), df_all.iloc[nb_days:].copy(), \
+        df_all.iloc[:nb_days].copy()
+
+def bench_fig_pos(nb_repeat=5):
+    dict_results = dict()
+    for nb_days in LIST_NB_DAYS:
+        list_df = create_data_plot(nb_days)
+        # string dates : parsed by each trace
+        dict_results[f"build_str_{nb_days}"] = time_func(
+            lambda: app.create_fig_pos(*list_df, "2020-05-13"), nb_repeat)
+        # datetime64 : parsed once
+        list_df_dt = [add_date_dt(df.copy()) for df in list_df]
+        dict_results[f"build_dt_{nb_days}"] = time_func(
+            lambda: app.create_fig_pos(*list_df_dt, "2020-05-13"), nb_repeat)
+        fig = app.create_fig_pos(*list_df_dt, "2020-05-13")
+        dict_results[f"to_json_dt_{nb_days}"] = time_func(fig.to_json, 
+            nb_repeat)
+    return dict_results
+
+if __name__ == '__main__':
+    save_results("fig_pos", bench_fig_pos())
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+''' Benchmark HTTP : bytes transferred by page view (index, layout with
+figures, geojson map, assets) without compression, with gzip / brotli,
+and for a repeat visit (revalidation with ETags)
+
+python -m benchmarks.bench_http
+'''
+
+# import built-in
+import os
+import time
+os.environ["APP_FAST_START"] = "1" # layout computed at first page load
+
+# import project modules
+import app
+from benchmarks.helpers import save_results
+
+# DEFINITIONS
+LIST_URL_PAGE = ["/", app.URL_LAYOUT, app.URL_GEO_DEP_FR, 
+    app.URL_ASSETS + "app_custom.css"]
+LIST_ENCODING = ["identity", "gzip", "br"]
+
+def view_page(client, encoding, dict_etag=None):
+    '''
+    Bytes & time by URL of page view (conditional requests if dict_etag)
+    return dict of results, dict of ETags
+    '''
+    dict_results = {"bytes_total": 0}
+    dict_etag_new = dict()
+    for url in LIST_URL_PAGE:
+        dict_headers = {"Accept-Encoding": encoding}
+        if (dict_etag is not None) and (dict_etag.get(url) is not None):
+            dict_headers["If-None-Match"] = dict_etag[url]
+        time_start = time.perf_counter()
+        res = client.get(url, headers=dict_headers)
+        dict_results[url] = {"status": res.status_code, 
+            "bytes": len(res.data),
+            "time_ms": 1000 * (time.perf_counter() - time_start)}
+        dict_results["bytes_total"] += len(res.data)
+        dict_etag_new[url] = res.headers.get("ETag")
+    return dict_results, dict_etag_new
+
+def bench_http():
+    client = app.server.test_client()
+    # first load (data & figures cache)
+    view_page(client, "identity")
+    dict_results = dict()
+    for encoding in LIST_ENCODING:
+        dict_results[encoding], dict_etag = view_page(client, encoding)
+    # repeat visit : browser has page in cache
+    dict_results["revisit_br"], _ = view_page(client, "br", dict_etag)
+    bytes_before = dict_results["identity"]["bytes_total"]
+    for name_results in LIST_ENCODING[1:] + ["revisit_br"]:
+        dict_results[name_results]["ratio_vs_identity"] = \
+            dict_results[name_results]["bytes_total"] / bytes_before
+    return dict_results
+
+if __name__ == '__main__':
+    save_results("http", bench_http())
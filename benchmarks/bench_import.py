@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+''' Benchmark import time of app (python -X importtime) in fast start mode
+reports total time and direct imports of app sorted by cumulative time
+
+python -m benchmarks.bench_import
+'''
+
+# import built-in
+import os
+import re
+import sys
+import time
+import subprocess
+
+# import project modules
+from benchmarks.helpers import PATH_PROJECT, save_results
+
+# DEFINITIONS
+NB_TOP = 15
+
+def parse_importtime(str_err):
+    '''
+    Parse output of python -X importtime
+    return list of (module, cumulative time [us], level)
+    '''
+    list_imp = []
+    for line in str_err.splitlines():
+        res_re = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)', line)
+        if res_re:
+            list_imp.append((res_re.group(4), int(res_re.group(2)), 
+                len(res_re.group(3)) // 2))
+    return list_imp
+
+def bench_import(module_name="app"):
+    env = dict(os.environ, APP_FAST_START="1")
+    time_start = time.perf_counter()
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", 
+        f"import {module_name}"], cwd=PATH_PROJECT, env=env, 
+        capture_output=True, text=True)
+    time_wall = time.perf_counter() - time_start
+    list_imp = parse_importtime(res.stderr)
+    # direct imports of module (level 1 under it)
+    list_top = sorted([(name, time_us) for name, time_us, level in list_imp \
+        if level == 1], key=lambda imp: -imp[1])[:NB_TOP]
+    time_module_us = [time_us for name, time_us, level in list_imp \
+        if (name == module_name) & (level == 0)]
+    return {"wall_s": time_wall, 
+        "import_s": time_module_us[0] / 1e6 if time_module_us else None,
+        "top_imports_s": {name: time_us / 1e6 for name, time_us in list_top}}
+
+if __name__ == '__main__':
+    save_results("import", bench_import())
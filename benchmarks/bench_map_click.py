@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+''' Benchmark click on map : request payload size & latency of callback
+
+Before : map figure posted back to server as State at each click.
+Now : graph type computed by browser, only request of figure is posted.
+
+python -m benchmarks.bench_map_click
+'''
+
+# import built-in
+import os
+import json
+import time
+import statistics
+os.environ["APP_FAST_START"] = "1" # layout computed at first page load
+
+# import project modules
+import app
+from benchmarks.helpers import save_results
+from benchmarks.load_test import create_body_click, LIST_DEP
+
+# DEFINITIONS
+URL_CALLBACK = "/_dash-update-component"
+
+def create_body_click_old(fig_map, dep_curr):
+    '''
+    Body of callback request before (map figure & hidden divs as State)
+    '''
+    list_id_output = [("covid-rt-dep-graph", "figure"),
+        ("graph_type", "children"), ("id_button", "children"),
+        ("mode_country", "children"), ("dep", "children")]
+    return {
+        "output": ".." + "...".join([f"{id_curr}.{prop}" \
+            for id_curr, prop in list_id_output]) + "..",
+        "outputs": [{"id": id_curr, "property": prop} \
+            for id_curr, prop in list_id_output],
+        "inputs": [{"id": "covid-rt-map", "property": "clickData",
+            "value": {"points": [{"location": dep_curr}]}},
+            {"id": "div-rt-map", "property": "n_clicks", "value": 1}],
+        "changedPropIds": ["covid-rt-map.clickData"],
+        "state": [{"id": "covid-rt-map", "property": "figure",
+            "value": fig_map},
+            {"id": "graph_type", "property": "children", "value": 0},
+            {"id": "id_button", "property": "children", "value": 0},
+            {"id": "mode_country", "property": "children", "value": 0},
+            {"id": "dep", "property": "children", "value": ""},
+            {"id": "covid-rt-map", "property": "hoverData", "value": None}]}
+
+def time_clicks(client, list_dep, fig_type):
+    '''
+    Latency [ms] of callback requests for list of dep.
+    '''
+    list_time = []
+    for dep_curr in list_dep:
+        time_start = time.perf_counter()
+        res = client.post(URL_CALLBACK, 
+            json=create_body_click(dep_curr, fig_type))
+        assert res.status_code == 200
+        list_time.append(1000 * (time.perf_counter() - time_start))
+    return {"median_ms": statistics.median(list_time), 
+        "max_ms": max(list_time), "nb_clicks": len(list_time)}
+
+def bench_map_click():
+    client = app.server.test_client()
+    # figure map as in page
+    snapshot = app.get_snapshot()
+    str_fig_map = app.create_fig_map(snapshot["pt_fr_test_last"], 
+        app.URL_GEO_DEP_FR, snapshot["str_date_last"]).to_json()
+    dict_results = {
+        "payload_bytes_old": len(json.dumps(create_body_click_old(
+            json.loads(str_fig_map), "Paris"))),
+        "payload_bytes": len(json.dumps(create_body_click("Paris")))}
+    # cold : figures built, warm : figures from cache
+    app.fig_cache.clear()
+    dict_results["click_cold"] = time_clicks(client, LIST_DEP, 
+        app.FIG_POS_DEP)
+    dict_results["click_warm"] = time_clicks(client, LIST_DEP, 
+        app.FIG_POS_DEP)
+    return dict_results
+
+if __name__ == '__main__':
+    save_results("map_click", bench_map_click())
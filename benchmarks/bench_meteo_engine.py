@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+''' Benchmark meteo engines on identical records :
+previous implementation by lists, pandas and Spark (if available)
+Results of all engines are checked against pandas engine.
+
+python -m benchmarks.bench_meteo_engine
+'''
+
+# import third party
+import numpy as np
+import pandas as pd
+
+# import project modules
+from my_helpers.meteo import calc_list_mean_field
+from my_helpers.meteo_engine import records_to_df
+from my_helpers.meteo_engine import aggregate_meteo_pandas
+from my_helpers.meteo_engine import aggregate_meteo_spark
+from my_helpers.meteo_engine import LIST_COL_METEO
+from my_helpers.synthetic import create_data_meteo
+from benchmarks.helpers import time_func, save_results
+
+# DEFINITIONS
+# (nb days, nb stations) : 62 stations synop in France
+LIST_SIZES = [(5, 62), (60, 62), (365, 62)]
+
+def aggregate_meteo_lists(data_meteo):
+    '''
+    Previous implementation (by lists of records)
+    '''
+    dict_meteo = {"date": sorted(records_to_df(data_meteo)["date"].unique())}
+    for col_curr, field_name, fun in [("T_min", "t", min),
+        ("T_max", "t", max), ("H_min", "u", min), ("H_max", "u", max)]:
+        dict_meteo[col_curr] = calc_list_mean_field(data_meteo, field_name,
+            fun)
+    return pd.DataFrame(dict_meteo)[LIST_COL_METEO]
+
+def check_parity(df_ref, df_test):
+    assert df_ref["date"].tolist() == df_test["date"].tolist()
+    for col_curr in LIST_COL_METEO[1:]:
+        np.testing.assert_allclose(df_ref[col_curr].values,
+            df_test[col_curr].values)
+
+def bench_meteo_engine(nb_repeat=3):
+    dict_results = dict()
+    for nb_days, nb_sta in LIST_SIZES:
+        data_meteo = create_data_meteo(nb_days, nb_sta)
+        df_rec = records_to_df(data_meteo)
+        name_size = f"{len(df_rec)}_records"
+        df_ref = aggregate_meteo_pandas(df_rec)
+        dict_results[name_size] = dict()
+        dict_results[name_size]["records_to_df"] = time_func(
+            lambda: records_to_df(data_meteo), nb_repeat)
+        dict_results[name_size]["pandas"] = time_func(
+            lambda: aggregate_meteo_pandas(df_rec), nb_repeat)
+        # previous implementation : too slow for big sizes
+        if nb_days <= 60:
+            check_parity(df_ref, aggregate_meteo_lists(data_meteo))
+            dict_results[name_size]["lists"] = time_func(
+                lambda: aggregate_meteo_lists(data_meteo), 1)
+        try:
+            check_parity(df_ref, aggregate_meteo_spark(df_rec))
+            dict_results[name_size]["spark"] = time_func(
+                lambda: aggregate_meteo_spark(df_rec), nb_repeat)
+        except Exception as e:
+            print(f"Spark engine not available : {type(e).__name__}")
+    return dict_results
+
+if __name__ == '__main__':
+    save_results("meteo_engine", bench_meteo_engine())
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+''' Benchmark startup : load of geojson dep. France and map data
+cold (from JSON or pre-parsed binary form) and warm (cached in process)
+
+python -m benchmarks.bench_startup
+'''
+
+# import project modules
+import settings
+import my_helpers.data_maps as data_maps
+from benchmarks.helpers import time_func, save_results
+
+def clear_cache():
+    data_maps.DICT_GEO_FR.clear()
+
+def bench_startup(nb_repeat=10):
+    dict_results = dict()
+    # cold : parse JSON
+    settings.GEO_FR_BIN = False
+    dict_results["get_geo_fr_cold_json"] = time_func(data_maps.get_geo_fr, 
+        nb_repeat, clear_cache)
+    # cold : pre-parsed binary form (created first time)
+    settings.GEO_FR_BIN = True
+    data_maps.read_geo_fr()
+    dict_results["get_geo_fr_cold_bin"] = time_func(data_maps.get_geo_fr, 
+        nb_repeat, clear_cache)
+    # warm : cached in process
+    dict_results["get_geo_fr_warm"] = time_func(data_maps.get_geo_fr, 
+        nb_repeat)
+    dict_results["load_data_rt_cold"] = time_func(data_maps.load_data_rt, 
+        nb_repeat, clear_cache)
+    dict_results["load_data_rt_warm"] = time_func(data_maps.load_data_rt, 
+        nb_repeat)
+    return dict_results
+
+if __name__ == '__main__':
+    save_results("startup", bench_startup())
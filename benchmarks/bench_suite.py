@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+''' Benchmark suite of pipeline & dashboard hot paths on synthetic data
+scaled by nb of days x nb of departements x nb of meteo stations
+
+Data are generated by my_helpers.synthetic.
+Each benchmark is registered with @register : its function receives data
+prepared for a size and returns the function to time.
+Results are saved in JSON (results/suite_<commit>.json) to be compared
+between commits with benchmarks.compare.
+
+python -m benchmarks.bench_suite --sizes small medium
+python -m benchmarks.bench_suite --sizes large --bench get_data_rt calc_rt
+'''
+
+# import built-in
+import io
+import os
+import json
+import argparse
+import warnings
+import tempfile
+import importlib.util
+import contextlib
+os.environ["APP_FAST_START"] = "1" # no data preparation at import
+
+# import third party
+import pandas as pd
+
+# import project modules
+import app
+import my_helpers.data_maps as data_maps
+from my_helpers.dates import create_date_ranges, add_date_dt
+from my_helpers.data_plots import precompute_data_pos, prepare_features
+from my_helpers.data_plots import load_data_pos
+from my_helpers.data_maps import sum_mobile, calc_rt, get_data_rt
+from my_helpers.data_maps import get_data_rt_fr, load_df_dep_sum
+from my_helpers.data_maps import NB_DAYS_CV
+from my_helpers.meteo import calc_list_mean_field, extrapolate_df_meteo
+from my_helpers.model import multivariate_data, prepare_to_lambda
+from my_helpers.model import prepare_dataset
+from my_helpers.model import PAST_HISTORY, FUTURE_TARGET, STEP
+from benchmarks.helpers import time_func, save_results, PATH_PROJECT
+from my_helpers.synthetic import create_data_gouv, create_data_meteo
+from my_helpers.synthetic import create_df_meteo, create_list_dates
+
+# DEFINITIONS
+# size : (nb days, nb departements, nb meteo stations)
+DICT_SIZES = {"small": (120, 20, 20), "medium": (365, 101, 62),
+    "large": (730, 101, 62)}
+LIST_SIZES_DEFAULT = ["small", "medium"]
+PERIOD_GAP_METEO = 5 # 1 day of meteo missing every 5 days (extrapolated)
+NB_REPEAT = 5
+PATH_HANDLER = os.path.join(PATH_PROJECT, 'serverless',
+    'tensorflow_lite_on_aws_lambda', 'handler.py')
+# data_maps paths written by get_data_rt
+LIST_PATH_DATA_RT = ["PATH_DF_DEP_R0", "PATH_PT_FR_TEST_LAST",
+    "PATH_DF_DEP_SUM"]
+DICT_BENCH = dict() # name : (function, nb repeat)
+# DataFrames built column by column in pipeline : known, not measured here
+warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+
+# HELPERS FUNCTIONS
+
+def register(name, nb_repeat=NB_REPEAT):
+    '''
+    Register benchmark name : fun(data) returns function to time
+    '''
+    def decorator(fun):
+        DICT_BENCH[name] = (fun, nb_repeat)
+        return fun
+    return decorator
+
+@contextlib.contextmanager
+def patch_paths(module, list_name_path, path_dir):
+    '''
+    Paths of module (global variables) moved to folder path_dir
+    '''
+    dict_old = {name: getattr(module, name) for name in list_name_path}
+    try:
+        for name, path_old in dict_old.items():
+            setattr(module, name, os.path.join(path_dir,
+                os.path.basename(path_old)))
+        yield
+    finally:
+        for name, path_old in dict_old.items():
+            setattr(module, name, path_old)
+
+def quiet(fun):
+    '''
+    fun without printing (prints of functions in benchmarks)
+    '''
+    def fun_quiet(*args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fun(*args)
+    return fun_quiet
+
+def prepare_data(nb_days, nb_dep, nb_sta, path_dir):
+    '''
+    Synthetic data of size for all benchmarks (files written in path_dir)
+    '''
+    data = {"path_dir": path_dir}
+    data["df_gouv_fr_raw"] = create_data_gouv(nb_days, nb_dep)
+    data["df_pos_fr"], data["df_test_fr"] = precompute_data_pos(
+        data["df_gouv_fr_raw"], nb_pos_start=0,
+        path_df_pos_fr=os.path.join(path_dir, 'df_pos_fr.csv'),
+        path_df_test_fr=os.path.join(path_dir, 'df_test_fr.csv'))
+    data["data_meteo"] = create_data_meteo(nb_days, nb_sta)
+    data["df_meteo_fr"] = create_df_meteo(nb_days, nb_sta,
+        list_days_gap=list(range(1, nb_days, PERIOD_GAP_METEO)))
+    data["list_dates"] = create_list_dates(nb_days)
+    path_df_feat_fr = os.path.join(path_dir, 'df_feat_fr.csv')
+    df_feat_fr = extrapolate_df_meteo(data["df_meteo_fr"],
+        data["list_dates"], path_df_meteo_fr=path_df_feat_fr)
+    prepare_features(df_feat_fr, data["df_pos_fr"], data["df_test_fr"],
+        path_df_feat_fr=path_df_feat_fr)
+    data["df_feat_fr"] = load_data_pos(path_df_feat_fr)
+    with patch_paths(data_maps, LIST_PATH_DATA_RT, path_dir):
+        data["df_dep_r0"], data["pt_fr_test_last"], data["dep_fr"], _ = \
+            get_data_rt(data["df_gouv_fr_raw"])
+        data["df_dep_sum"] = load_df_dep_sum(data_maps.PATH_DF_DEP_SUM)
+    data["df_rt_fr"] = get_data_rt_fr(data["df_feat_fr"]["date"],
+        data["df_feat_fr"]["pos"], os.path.join(path_dir, 'df_rt_fr.csv'))
+    data["dataset"], _, _ = prepare_dataset(data["df_feat_fr"])
+    data["dep_curr"] = data["pt_fr_test_last"]["name"].iloc[0]
+    return data
+
+# BENCHMARKS : PIPELINE
+
+@register("sum_mobile")
+def bench_sum_mobile(data):
+    df_pos_fr = data["df_pos_fr"]
+    ser_start, ser_end = create_date_ranges(df_pos_fr["date"], NB_DAYS_CV)
+    return lambda: sum_mobile(df_pos_fr["daily"], ser_start, ser_end)
+
+@register("calc_rt")
+def bench_calc_rt(data):
+    df_feat_fr = data["df_feat_fr"]
+    return lambda: calc_rt(df_feat_fr["date"], df_feat_fr["pos"])
+
+@register("get_data_rt", nb_repeat=1)
+def bench_get_data_rt(data):
+    def fun():
+        with patch_paths(data_maps, LIST_PATH_DATA_RT, data["path_dir"]):
+            get_data_rt(data["df_gouv_fr_raw"])
+    return fun
+
+@register("precompute_data_pos")
+def bench_precompute_data_pos(data):
+    return lambda: precompute_data_pos(data["df_gouv_fr_raw"],
+        nb_pos_start=0,
+        path_df_pos_fr=os.path.join(data["path_dir"], 'df_pos_fr.csv'),
+        path_df_test_fr=os.path.join(data["path_dir"], 'df_test_fr.csv'))
+
+@register("calc_list_mean_field", nb_repeat=1)
+def bench_calc_list_mean_field(data):
+    return lambda: calc_list_mean_field(data["data_meteo"], "t", min)
+
+@register("extrapolate_df_meteo")
+def bench_extrapolate_df_meteo(data):
+    return lambda: extrapolate_df_meteo(data["df_meteo_fr"],
+        data["list_dates"],
+        path_df_meteo_fr=os.path.join(data["path_dir"], 'df_meteo_fr.csv'))
+
+@register("multivariate_data")
+def bench_multivariate_data(data):
+    dataset = data["dataset"]
+    return lambda: multivariate_data(dataset, dataset[:, 4], 0, None,
+        PAST_HISTORY, FUTURE_TARGET, STEP)
+
+@register("prepare_to_lambda")
+def bench_prepare_to_lambda(data):
+    return lambda: prepare_to_lambda(data["dataset"])
+
+@register("handler_predict", nb_repeat=3)
+def bench_handler_predict(data):
+    '''
+    Prediction by AWS Lambda handler run locally
+    (needs tflite_runtime or tensorflow)
+    '''
+    spec = importlib.util.spec_from_file_location("handler", PATH_HANDLER)
+    handler = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(handler)
+    event = {"body": json.dumps(prepare_to_lambda(data["dataset"]))}
+    return lambda: handler.predict(event, None)
+
+# BENCHMARKS : DASHBOARD FIGURES
+
+@register("create_fig_pos")
+def bench_create_fig_pos(data):
+    df_plot = add_date_dt(data["df_feat_fr"][["date", "pos", "nb_cases"]] \
+        .copy())
+    df_plot_pred = df_plot.iloc[-FUTURE_TARGET:].copy()
+    df_plot_pred["date"] = create_list_dates(FUTURE_TARGET,
+        df_plot["date"].max())
+    df_plot_pred = add_date_dt(df_plot_pred)
+    return lambda: app.create_fig_pos(df_plot, df_plot_pred, df_plot,
+        df_plot["date"].max())
+
+@register("create_fig_rt", nb_repeat=1)
+def bench_create_fig_rt(data):
+    return lambda: app.create_fig_rt(data["df_dep_r0"],
+        data["pt_fr_test_last"])
+
+@register("create_fig_map")
+def bench_create_fig_map(data):
+    return lambda: app.create_fig_map(data["pt_fr_test_last"],
+        data["dep_fr"], data["df_feat_fr"]["date"].max())
+
+@register("create_fig_rt_dep")
+def bench_create_fig_rt_dep(data):
+    return lambda: app.create_fig_rt_dep(data["dep_curr"],
+        data["pt_fr_test_last"], data["df_dep_r0"])
+
+@register("create_fig_rt_fr")
+def bench_create_fig_rt_fr(data):
+    return lambda: app.create_fig_rt_fr(data["df_rt_fr"])
+
+@register("create_fig_pos_dep")
+def bench_create_fig_pos_dep(data):
+    return lambda: app.create_fig_pos_dep(data["dep_curr"],
+        data["pt_fr_test_last"], data["df_dep_r0"], data["df_pos_fr"],
+        data["df_dep_sum"])
+
+@register("create_fig_pos_rate_fr")
+def bench_create_fig_pos_rate_fr(data):
+    return lambda: app.create_fig_pos_rate_fr(data["df_feat_fr"])
+
+# RUN
+
+def bench_suite(list_sizes=LIST_SIZES_DEFAULT, list_bench=None,
+        nb_repeat=None):
+    '''
+    Run benchmarks list_bench (default all) for sizes in list_sizes
+    (nb_repeat : force nb of repeats of all benchmarks)
+    '''
+    if list_bench is None:
+        list_bench = list(DICT_BENCH.keys())
+    dict_results = dict()
+    for name_size in list_sizes:
+        nb_days, nb_dep, nb_sta = DICT_SIZES[name_size]
+        print(f"{name_size} : {nb_days} days x {nb_dep} dep. x " + \
+            f"{nb_sta} stations ...")
+        dict_size = {"nb_days": nb_days, "nb_dep": nb_dep, "nb_sta": nb_sta}
+        with tempfile.TemporaryDirectory() as path_dir:
+            data = quiet(prepare_data)(nb_days, nb_dep, nb_sta, path_dir)
+            for name_bench in list_bench:
+                fun_bench, nb_repeat_bench = DICT_BENCH[name_bench]
+                try:
+                    fun = quiet(quiet(fun_bench)(data))
+                except ImportError as e:
+                    print(f"  {name_bench} skipped : {e}")
+                    dict_size[name_bench] = {"skipped": str(e)}
+                    continue
+                dict_size[name_bench] = time_func(fun,
+                    nb_repeat_bench if nb_repeat is None else nb_repeat)
+                print("  {} : {:.4f} s".format(name_bench,
+                    dict_size[name_bench]["median"]))
+        dict_results[name_size] = dict_size
+    return dict_results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark suite")
+    parser.add_argument("--sizes", nargs="+", default=LIST_SIZES_DEFAULT,
+        choices=list(DICT_SIZES.keys()))
+    parser.add_argument("--bench", nargs="+", default=None,
+        choices=list(DICT_BENCH.keys()))
+    parser.add_argument("--repeat", type=int, default=None)
+    args = parser.parse_args()
+    save_results("suite", bench_suite(args.sizes, args.bench, args.repeat))
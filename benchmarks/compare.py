@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+''' Compare results of benchmarks saved in JSON between 2 commits :
+ratio of median times new / old for each timing found in both files
+
+python -m benchmarks.compare benchmarks/results/suite_<old>.json \
+    benchmarks/results/suite_<new>.json --threshold 0.2
+
+Exit code 1 if a timing is slower than threshold (regression).
+'''
+
+# import built-in
+import sys
+import json
+import argparse
+
+# DEFINITIONS
+THRESHOLD = 0.2 # relative change of median time to report
+MIN_TIME = 0.001 # [s] shorter timings are too noisy to be compared
+
+def load_results(path_file):
+    with open(path_file) as f:
+        return json.load(f)
+
+def find_timings(dict_in, prefix=""):
+    '''
+    Timings (dict with median) in nested results : {path/to/timing: median}
+    '''
+    dict_timings = dict()
+    for key, val in dict_in.items():
+        if not isinstance(val, dict):
+            continue
+        name = f"{prefix}/{key}" if prefix else key
+        if "median" in val:
+            dict_timings[name] = val["median"]
+        else:
+            dict_timings.update(find_timings(val, name))
+    return dict_timings
+
+def compare_results(dict_old, dict_new, threshold=THRESHOLD):
+    '''
+    Compare timings of results : list of (name, old, new, ratio, status)
+    status : "slower" / "faster" if changed more than threshold, else ""
+    '''
+    dict_time_old = find_timings(dict_old["results"])
+    dict_time_new = find_timings(dict_new["results"])
+    list_compare = []
+    for name, time_old in dict_time_old.items():
+        if name not in dict_time_new:
+            continue
+        time_new = dict_time_new[name]
+        ratio = time_new / time_old if time_old > 0 else float("inf")
+        status = ""
+        if max(time_old, time_new) >= MIN_TIME:
+            if ratio > 1 + threshold:
+                status = "slower"
+            elif ratio < 1 / (1 + threshold):
+                status = "faster"
+        list_compare.append((name, time_old, time_new, ratio, status))
+    return list_compare
+
+def print_compare(list_compare, commit_old, commit_new):
+    print("{:<50} {:>10} {:>10} {:>7}".format("benchmark", commit_old,
+        commit_new, "ratio"))
+    for name, time_old, time_new, ratio, status in list_compare:
+        print("{:<50} {:>10.4f} {:>10.4f} {:>7.2f} {}".format(name, time_old,
+            time_new, ratio, status))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare benchmarks results")
+    parser.add_argument("path_old")
+    parser.add_argument("path_new")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+    dict_old = load_results(args.path_old)
+    dict_new = load_results(args.path_new)
+    list_compare = compare_results(dict_old, dict_new, args.threshold)
+    print_compare(list_compare, dict_old["commit"], dict_new["commit"])
+    nb_slower = len([res for res in list_compare if res[-1] == "slower"])
+    print(f"{nb_slower} regression(s) / {len(list_compare)} benchmarks")
+    sys.exit(1 if nb_slower > 0 else 0)
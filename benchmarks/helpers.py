@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+''' Helpers for benchmarks : timings and results saved in JSON
+
+Run a benchmark from project folder, example :
+python -m benchmarks.bench_startup
+'''
+
+# import built-in
+import os
+import json
+import time
+import datetime
+import statistics
+import subprocess
+
+# DEFINITIONS
+PATH_BENCHMARKS = os.path.dirname(os.path.realpath(__file__))
+PATH_PROJECT = os.path.dirname(PATH_BENCHMARKS)
+PATH_RESULTS = os.path.join(PATH_BENCHMARKS, 'results')
+
+def time_func(fun, nb_repeat=5, fun_setup=None):
+    '''
+    Time nb_repeat calls of fun() (fun_setup() called before each, not timed)
+    return stats in seconds : min / median / max
+    '''
+    list_time = []
+    for _ in range(nb_repeat):
+        if fun_setup is not None:
+            fun_setup()
+        time_start = time.perf_counter()
+        fun()
+        list_time.append(time.perf_counter() - time_start)
+    return {"min": min(list_time), "median": statistics.median(list_time),
+        "max": max(list_time), "nb_repeat": nb_repeat}
+
+def get_commit():
+    '''
+    Short hash of current git commit ("unknown" if not available)
+    '''
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+            cwd=PATH_PROJECT).decode().strip()
+    except:
+        return "unknown"
+
+def save_results(name, dict_results):
+    '''
+    Save results of benchmark name in JSON : results/<name>_<commit>.json
+    return path of file
+    '''
+    os.makedirs(PATH_RESULTS, exist_ok=True)
+    commit = get_commit()
+    path_file = os.path.join(PATH_RESULTS, f"{name}_{commit}.json")
+    with open(path_file, 'w') as outfile:
+        json.dump({"name": name, "commit": commit, 
+            "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "results": dict_results}, outfile, indent=2)
+    print(json.dumps(dict_results, indent=2))
+    print(f"Results saved in {path_file}")
+    return path_file
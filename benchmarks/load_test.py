@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+''' Load test of running app : requests per second & latency percentiles
+for the page (index & layout) and the map-click callback
+
+Start server first, for example :
+APP_PORT=8050 gunicorn -c gunicorn.conf.py wsgi:application
+then :
+python -m benchmarks.load_test --url http://127.0.0.1:8050 --nb-users 8
+'''
+
+# import built-in
+import time
+import argparse
+import statistics
+import concurrent.futures
+
+# import third party
+import requests
+
+# import project modules
+from benchmarks.helpers import save_results
+
+# DEFINITIONS
+URL_APP = "http://127.0.0.1:8050"
+NB_USERS = 8 # concurrent clients
+NB_REQUESTS = 200 # by scenario
+LIST_DEP = ["Paris", "Nord", "Rhône", "Gironde", "Bas-Rhin", "Var"]
+
+def create_body_click(dep_curr, fig_type="pos_dep"):
+    '''
+    Body of callback request for a click on map on departement dep_curr
+    (request of figure computed by browser)
+    '''
+    return {"output": "covid-rt-dep-graph.figure",
+        "outputs": {"id": "covid-rt-dep-graph", "property": "figure"},
+        "inputs": [{"id": "fig-dep-request", "property": "data",
+            "value": {"fig_type": fig_type, "dep": dep_curr}}],
+        "changedPropIds": ["fig-dep-request.data"]}
+
+def run_scenario(fun_request, nb_requests, nb_users):
+    '''
+    Call fun_request(num_request) nb_requests times by nb_users in parallel
+    return stats : requests per second, latency percentiles [ms], errors
+    '''
+    def timed_request(num_request):
+        time_start = time.perf_counter()
+        res = fun_request(num_request)
+        return time.perf_counter() - time_start, res.status_code == 200
+    time_start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(nb_users) as executor:
+        list_res = list(executor.map(timed_request, range(nb_requests)))
+    time_total = time.perf_counter() - time_start
+    list_time = sorted([time_curr for time_curr, _ in list_res])
+    list_pct = statistics.quantiles(list_time, n=100)
+    return {"rps": nb_requests / time_total,
+        "p50_ms": 1000 * list_pct[49], "p95_ms": 1000 * list_pct[94],
+        "max_ms": 1000 * list_time[-1],
+        "nb_errors": sum([not flag_ok for _, flag_ok in list_res]),
+        "nb_requests": nb_requests, "nb_users": nb_users}
+
+def load_test(url_app=URL_APP, nb_requests=NB_REQUESTS, nb_users=NB_USERS):
+    session = requests.Session()
+    dict_scenario = {
+        "page_index": lambda num: session.get(url_app + "/"),
+        "page_layout": lambda num: session.get(url_app + "/_dash-layout"),
+        "map_click": lambda num: session.post(
+            url_app + "/_dash-update-component",
+            json=create_body_click(LIST_DEP[num % len(LIST_DEP)]))}
+    dict_results = {"url": url_app}
+    for name_scenario, fun_request in dict_scenario.items():
+        print(f"{name_scenario} ...")
+        dict_results[name_scenario] = run_scenario(fun_request, nb_requests,
+            nb_users)
+    return dict_results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test of running app")
+    parser.add_argument("--url", default=URL_APP)
+    parser.add_argument("--nb-requests", type=int, default=NB_REQUESTS)
+    parser.add_argument("--nb-users", type=int, default=NB_USERS)
+    args = parser.parse_args()
+    save_results("load_test", load_test(args.url, args.nb_requests,
+        args.nb_users))
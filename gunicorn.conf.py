@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+''' Configuration of gunicorn for App Covid Visu
+
+gunicorn -c gunicorn.conf.py wsgi:application
+
+Defaults in settings.py, can be changed by environment variables :
+APP_WORKERS, APP_THREADS, APP_PRELOAD (0 / 1), APP_PORT
+'''
+
+# import built-in
+import os
+
+# import project modules
+import settings
+
+# DEFINITIONS
+bind = "0.0.0.0:" + os.getenv("APP_PORT", "80")
+workers = int(os.getenv("APP_WORKERS", settings.SERVER_WORKERS))
+threads = int(os.getenv("APP_THREADS", settings.SERVER_THREADS))
+worker_class = "gthread"
+preload_app = os.getenv("APP_PRELOAD", str(int(settings.SERVER_PRELOAD))) \
+    == "1"
+timeout = 120 # first page can wait for data download
+accesslog = "-"
+
+def on_starting(server):
+    '''
+    Heavy initialization once in master (before fork) if preload
+    '''
+    if preload_app:
+        import wsgi
+        wsgi.preload()
+
+def post_fork(server, worker):
+    '''
+    Data refresh started in worker if needed (never in master before fork :
+    threads & locks not inherited by workers)
+    '''
+    import wsgi
+    wsgi.start_refresh_worker()
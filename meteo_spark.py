@@ -12,13 +12,14 @@ import ntpath
 
 # import third-party
 from pyspark import SparkContext, SparkConf, SQLContext
-from pyspark.sql.functions import explode, substring
-import pyspark.sql.functions as fun_sql
 import boto3
 import pandas as pd
 
 # import from project
 import settings
+from my_helpers.spark_meteo import timed_stage, print_timings
+from my_helpers.spark_meteo import aggregate_meteo_to_pandas
+from my_helpers.spark_meteo import read_meteo
 
 
 # definition 
@@ -32,6 +33,8 @@ if MODE_TEST:
                 'df_meteo_fr_for_test.csv')
         PATH_JSON_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA, 
                 'data_meteo_temp_fr_for_test.json')
+        PATH_PARQUET_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA, 
+                'data_meteo_temp_fr_for_test.parquet')
         PATH_DF_METEO_FR_OUT = os.path.join(PATH_TO_SAVE_DATA, 
                 'df_meteo_fr_for_test_out.csv')
 else:
@@ -39,6 +42,8 @@ else:
         PATH_DF_METEO_FR_OUT = PATH_DF_METEO_FR
         PATH_JSON_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA, 
                 'data_meteo_temp_fr.json')
+        PATH_PARQUET_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA, 
+                'data_meteo_temp_fr.parquet')
 
 s3 = boto3.resource('s3')
 
@@ -50,9 +55,17 @@ def upload_file_to_S3(filename, bucket_name):
         key = ntpath.basename(filename)
         s3.Bucket(bucket_name).upload_file(filename, key)
 
+dict_timings = {}
 # get data input from S3
 if MODE_S3:
         download_file_S3(PATH_JSON_METEO_TEMP_FR, BUCKET_NAME)
+        try:
+                download_file_S3(PATH_PARQUET_METEO_TEMP_FR, BUCKET_NAME)
+        except:
+                print('meteo spark : no Parquet data on S3')
+                # no old local Parquet read instead of new JSON
+                if os.path.isfile(PATH_PARQUET_METEO_TEMP_FR):
+                        os.remove(PATH_PARQUET_METEO_TEMP_FR)
         download_file_S3(PATH_DF_METEO_FR, BUCKET_NAME)
 # Configure Spark
 conf = SparkConf().set('spark.driver.host','127.0.0.1')
@@ -61,66 +74,22 @@ sparkcontext = SparkContext(conf=conf)
 # Create an sql context so that we can query data files in sql like syntax
 sqlContext = SQLContext(sparkcontext)
 
-# read the json data file and select only the field labeled as "text"
-# this returns a spark data frame
-#jsondata = sqlContext.read.json(os.path.join(abspath, datafile_json))
-jsondata = sqlContext.read.json(PATH_JSON_METEO_TEMP_FR)
-
-df = jsondata.select("records")
+# read new records (numer_sta, date, t, u) : 
+# from Parquet if available and made from same JSON (MD5 marker), 
+# else from JSON with explicit schema
 try:
-        dfMeteo = df.select(explode("records").alias("rec")). \
-        selectExpr("rec.fields as records"). \
-        selectExpr("records.numer_sta as numer_sta", 
-                "records.date as date", "records.t as t", "records.u as u"). \
-        alias("df").withColumn("date", substring("df.date", 1, 10))
+        with timed_stage(dict_timings, "read"):
+                dfMeteo = read_meteo(sqlContext, PATH_PARQUET_METEO_TEMP_FR, 
+                        PATH_JSON_METEO_TEMP_FR)
         flag_ok = True
 except:
         print('meteo spark : NO new data ?')
         flag_ok = False
 
 if flag_ok: 
-        dfMeteo.persist()
-
-        # T_min group by station and date
-        df_tmin = dfMeteo.groupby('date', 
-                'numer_sta').agg(fun_sql.min('t').alias('T_min'))
-        df_tmin = df_tmin.groupby('date').agg(fun_sql.mean('T_min').alias('T_min')).\
-                orderBy('date')
-        #df_tmin.show()
-        #df_tmin.persist()
-        # T_max group by station and date
-        df_tmax = dfMeteo.groupby('date', 
-                'numer_sta').agg(fun_sql.max('t').alias('T_max'))
-        df_tmax = df_tmax.groupby('date').agg(fun_sql.mean('T_max').alias('T_max')).\
-                orderBy('date')
-
-        # join
-        df_meteo =  df_tmin.join(df_tmax, df_tmin.date == df_tmax.date).\
-                drop(df_tmax.date)
-
-        # H_min group by station and date
-        df_hmin = dfMeteo.groupby('date', 
-                'numer_sta').agg(fun_sql.min('u').alias('H_min'))
-        df_hmin = df_hmin.groupby('date').agg(fun_sql.mean('H_min').alias('H_min')).\
-                orderBy('date')
-
-        # join
-        df_meteo =  df_meteo.join(df_hmin, df_meteo.date == df_hmin.date).\
-                drop(df_hmin.date)
-
-        # H_min group by station and date
-        df_hmax = dfMeteo.groupby('date', 
-                'numer_sta').agg(fun_sql.max('u').alias('H_max'))
-        df_hmax = df_hmax.groupby('date').agg(fun_sql.mean('H_max').alias('H_max')).\
-                orderBy('date')
-
-        # join
-        df_meteo =  df_meteo.join(df_hmax, df_meteo.date == df_hmax.date).\
-                drop(df_hmax.date)
-
-        # prepare to save
-        df_meteo_fr_new = df_meteo.toPandas()
-        df_meteo_fr_new.index = df_meteo_fr_new["date"]
+        # one shuffle : min/max by station-day then mean by day (no join)
+        with timed_stage(dict_timings, "aggregate"):
+                df_meteo_fr_new = aggregate_meteo_to_pandas(dfMeteo)
         # load old data 
         df_meteo_fr = pd.read_csv(PATH_DF_METEO_FR)
         df_meteo_fr.index = df_meteo_fr["date"]
@@ -129,13 +98,15 @@ if flag_ok:
         try:
                 df_meteo_fr = df_meteo_fr.append(df_meteo_fr_new, verify_integrity=True)
                 # save df_meteo
-                df_meteo_fr.to_csv(PATH_DF_METEO_FR_OUT, index=False) 
+                with timed_stage(dict_timings, "save"):
+                        df_meteo_fr.to_csv(PATH_DF_METEO_FR_OUT, index=False) 
                 # export on S3
                 if MODE_S3:
                         upload_file_to_S3(PATH_DF_METEO_FR_OUT, BUCKET_NAME)
         except: 
                 print('meteo spark : data duplicates ?')
 
-        df_meteo.show()
+        print(df_meteo_fr_new.tail())
+        print_timings(dict_timings)
 
 #input("press ctrl+c to exit")
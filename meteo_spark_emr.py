@@ -8,6 +8,8 @@ Push this script on S3
 - input files from S3: 
         - PATH_DF_METEO_FR : df_meteo_fr (csv)
         - PATH_JSON_METEO_TEMP_FR : data_meteo_temp_fr (json)
+        - PATH_PARQUET_METEO_TEMP_FR : data_meteo_temp_fr flattened 
+        (parquet, read instead of json if found)
 - output files to S3: 
         - PATH_DF_METEO_FR_OUT : df_meteo_fr updated (csv)
         - PATH_DF_METEO_FR_TMP : df_meteo_fr_tmp (new processed data) (csv)
@@ -19,11 +21,13 @@ import os
 from io import StringIO  # python3 (or BytesIO for python2)
 import sys
 import ntpath
+import time
 
 # import third-party
 from pyspark import SparkContext, SparkConf, SQLContext
-from pyspark.sql.functions import explode, substring
 import pyspark.sql.functions as fun_sql
+from pyspark.sql.types import StructType, StructField, ArrayType
+from pyspark.sql.types import StringType, DoubleType
 import boto3
 import pandas as pd
 
@@ -43,6 +47,8 @@ if MODE_TEST:
                 'df_meteo_fr_for_emr_test.csv')
         PATH_JSON_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA, 
                 'data_meteo_temp_fr_for_emr_test.json')
+        PATH_PARQUET_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA, 
+                'data_meteo_temp_fr_for_emr_test.parquet')
         # outputs
         PATH_DF_METEO_FR_TMP = os.path.join(PATH_TO_SAVE_DATA, 
                 'df_meteo_fr_tmp_for_emr_test.csv')
@@ -53,11 +59,24 @@ else:
         PATH_DF_METEO_FR = os.path.join(PATH_TO_SAVE_DATA, 'df_meteo_fr.csv')
         PATH_JSON_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA, 
                 'data_meteo_temp_fr.json')
+        PATH_PARQUET_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA, 
+                'data_meteo_temp_fr.parquet')
         # outputs
         PATH_DF_METEO_FR_TMP = os.path.join(PATH_TO_SAVE_DATA, 
                 'df_meteo_fr_tmp.csv')
         PATH_DF_METEO_FR_OUT = PATH_DF_METEO_FR
 
+# only fields used (numer_sta, date, t, u) : no schema inference
+# (same as my_helpers.spark_meteo)
+SCHEMA_METEO_FIELDS = StructType([
+        StructField("numer_sta", StringType()),
+        StructField("date", StringType()),
+        StructField("t", DoubleType()),
+        StructField("u", DoubleType())])
+SCHEMA_METEO_JSON = StructType([
+        StructField("records", ArrayType(StructType([
+                StructField("fields", SCHEMA_METEO_FIELDS)])))])
+
 s3 = boto3.resource('s3')
 
 def download_file_S3(path_file, bucket_name):
@@ -87,66 +106,53 @@ else:
 # Create an sql context so that we can query data files in sql like syntax
 sqlContext = SQLContext(sparkcontext)
 
-# read the json data file and select only the field labeled as "text"
-# this returns a spark data frame
-#jsondata = sqlContext.read.json(os.path.join(abspath, datafile_json))
-jsondata = sqlContext.read.json(PATH_JSON_METEO_TEMP_FR)
-
-df = jsondata.select("records")
+# read new records (numer_sta, date, t, u) : 
+# from Parquet if available, else from JSON with explicit schema
+dict_timings = {}
+time_start = time.perf_counter()
 try:
-        dfMeteo = df.select(explode("records").alias("rec")). \
-        selectExpr("rec.fields as records"). \
-        selectExpr("records.numer_sta as numer_sta", 
-                "records.date as date", "records.t as t", "records.u as u"). \
-        alias("df").withColumn("date", substring("df.date", 1, 10))
+        try:
+                dfMeteo = sqlContext.read.schema(SCHEMA_METEO_FIELDS). \
+                        parquet(PATH_PARQUET_METEO_TEMP_FR)
+        except Exception as e:
+                print("meteo spark : no Parquet data " + \
+                        f"({type(e).__name__}), read JSON")
+                dfMeteo = sqlContext.read.schema(SCHEMA_METEO_JSON). \
+                        json(PATH_JSON_METEO_TEMP_FR). \
+                        select(fun_sql.explode("records.fields").alias("rec")). \
+                        select("rec.numer_sta", 
+                        fun_sql.substring("rec.date", 1, 10).alias("date"), 
+                        "rec.t", "rec.u")
         flag_ok = True
 except:
         print('meteo spark : NO new data ?')
         flag_ok = False
+dict_timings["read"] = time.perf_counter() - time_start
 
 if flag_ok: 
-        dfMeteo.persist()
-
-        # T_min group by station and date
-        df_tmin = dfMeteo.groupby('date', 
-                'numer_sta').agg(fun_sql.min('t').alias('T_min'))
-        df_tmin = df_tmin.groupby('date').agg(fun_sql.mean('T_min'). \
-                alias('T_min')).orderBy('date')
-        #df_tmin.show()
-        #df_tmin.persist()
-        # T_max group by station and date
-        df_tmax = dfMeteo.groupby('date', 
-                'numer_sta').agg(fun_sql.max('t').alias('T_max'))
-        df_tmax = df_tmax.groupby('date').agg(fun_sql.mean('T_max'). \
-                alias('T_max')).orderBy('date')
-
-        # join
-        df_meteo =  df_tmin.join(df_tmax, df_tmin.date == df_tmax.date). \
-                drop(df_tmax.date)
-
-        # H_min group by station and date
-        df_hmin = dfMeteo.groupby('date', 
-                'numer_sta').agg(fun_sql.min('u').alias('H_min'))
-        df_hmin = df_hmin.groupby('date').agg(fun_sql.mean('H_min'). \
-                alias('H_min')).orderBy('date')
-
-        # join
-        df_meteo =  df_meteo.join(df_hmin, df_meteo.date == df_hmin.date). \
-                drop(df_hmin.date)
-
-        # H_min group by station and date
-        df_hmax = dfMeteo.groupby('date', 
-                'numer_sta').agg(fun_sql.max('u').alias('H_max'))
-        df_hmax = df_hmax.groupby('date').agg(fun_sql.mean('H_max'). \
-                alias('H_max')).orderBy('date')
-
-        # join
-        df_meteo =  df_meteo.join(df_hmax, df_meteo.date == df_hmax.date).\
-                drop(df_hmax.date)
-
-        # prepare to save
+        # one shuffle : min/max by station-day then mean by day (no join)
+        # (same as my_helpers.spark_meteo.aggregate_meteo : 
+        # this script runs alone on EMR)
+        time_start = time.perf_counter()
+        df_meteo = dfMeteo.repartition("date").groupBy("date", 
+                "numer_sta").agg(
+                fun_sql.min("t").alias("T_min"),
+                fun_sql.max("t").alias("T_max"),
+                fun_sql.min("u").alias("H_min"),
+                fun_sql.max("u").alias("H_max"))
+        df_meteo = df_meteo.groupBy("date").agg(
+                fun_sql.mean("T_min").alias("T_min"),
+                fun_sql.mean("T_max").alias("T_max"),
+                fun_sql.mean("H_min").alias("H_min"),
+                fun_sql.mean("H_max").alias("H_max"))
+
+        # prepare to save (sort after collect : small table)
         df_meteo_fr_new = df_meteo.toPandas()
+        df_meteo_fr_new = df_meteo_fr_new[["date", "T_min", "T_max", 
+                "H_min", "H_max"]]
+        df_meteo_fr_new.sort_values(by="date", inplace=True)
         df_meteo_fr_new.index = df_meteo_fr_new["date"]
+        dict_timings["aggregate"] = time.perf_counter() - time_start
 
         if MODE_S3:
                 upload_df_to_S3(df_meteo_fr_new, PATH_DF_METEO_FR_TMP)
@@ -170,6 +176,9 @@ if flag_ok:
         except: 
                 print('meteo spark : data duplicates ?')
 
-        df_meteo.show()
+        print(df_meteo_fr_new.tail())
+        print("meteo spark : stage timings [s]: " + \
+                " / ".join(["{}: {:.2f}".format(stage_name, time_stage) \
+                for stage_name, time_stage in dict_timings.items()]))
 
 #input("press ctrl+c to exit")
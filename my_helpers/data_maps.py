@@ -3,6 +3,7 @@
 # IMPORT
 
 # import bluit-in
+import os
 import pandas as pd
 import numpy as np
 import math
@@ -12,6 +13,9 @@ import datetime
 import settings
 from my_helpers.dates import create_date_ranges, add_days
 from my_helpers.data_plots import load_data_gouv 
+from my_helpers.data_plots import PATH_DF_POS_FR
+from my_helpers.manifest import record_stage
+from my_helpers.instrument import instrumented
 
 # DEFINITIONS
 
@@ -19,14 +23,28 @@ from my_helpers.data_plots import load_data_gouv
 PATH_TO_SAVE_DATA = settings.PATH_TO_SAVE_DATA
 PATH_DF_DEP_R0 = PATH_TO_SAVE_DATA + '/' + 'df_dep_r0.csv'
 PATH_PT_FR_TEST_LAST = PATH_TO_SAVE_DATA + '/' + 'pt_fr_test_last.csv'
+PATH_DF_RT_FR = PATH_TO_SAVE_DATA + '/' + 'df_rt_fr.csv'
+PATH_DF_DEP_SUM = PATH_TO_SAVE_DATA + '/' + 'df_dep_sum.csv'
 PATH_DEP_FR = PATH_TO_SAVE_DATA + '/' + 'dep_fr.csv'
 PATH_DF_CODE_DEP = PATH_TO_SAVE_DATA + '/' + 'df_code_dep.csv'
 PATH_GEO_DEP_FR = PATH_TO_SAVE_DATA + '/sources/geofrance/' + 'departments.csv'
+PATH_GEO_REG_FR = PATH_TO_SAVE_DATA + '/sources/geofrance/' + 'regions.csv'
 URL_GEOJSON_DEP_FR = PATH_TO_SAVE_DATA + \
     '/sources/departements-avec-outre-mer_simple.json'
+# pre-parsed geojson : coordinates in float32 arrays
+PATH_GEO_DEP_FR_BIN = PATH_TO_SAVE_DATA + \
+    '/sources/departements-avec-outre-mer_simple.npz'
 
 NB_DAYS_CV = 14
 
+# geometry simplification by map zoom level
+LIST_ZOOM_GEO = [2, 4.25, 7]
+ZOOM_GEO_MAP = 7 # max zoom of map buttons (IdF)
+DICT_GEO_FR_LOD = dict() # simplified geojson by zoom level
+DICT_DEP_REG = dict() # departements registry
+DICT_GEO_FR = dict() # geojson & code table cached in process
+NB_DECIMALS_GEO = 5 # precision of geojson source
+
 # HELPERS FUNCTIONS
 
 def sum_between(ser_val, str_date_start, str_date_end):
@@ -87,6 +105,20 @@ def mdl_R0_estim(nb_cases, nb_cases_init=1, nb_day_contag=14, delta_days=14):
                 raise
         return list_out
 
+def calc_sum_rt(ser_date, ser_pos, nb_days_cv=NB_DAYS_CV):
+    '''
+    Sums of daily positive cases of last nb_days_cv days (sum_pos)
+    and Reproduction Number Rt (ser_rt) : see calc_rt
+    '''
+    ser_start, ser_end = create_date_ranges(ser_date, nb_days_cv)
+    sum_pos = sum_mobile(ser_pos, ser_start, ser_end)
+    arr_rt = mdl_R0_estim(nb_cases=sum_pos.values[:-nb_days_cv] + \
+                          sum_pos.values[nb_days_cv:],
+                 nb_cases_init=sum_pos.values[:-nb_days_cv])
+    ser_rt = pd.Series(index=sum_pos.index[nb_days_cv:], data=arr_rt)
+    ser_rt = ser_rt[ser_rt.notna()]
+    return sum_pos, ser_rt
+
 def calc_rt(ser_date, ser_pos, nb_days_cv=NB_DAYS_CV):
     '''
     Calculation of Reproduction Number Rt from series dates 
@@ -98,16 +130,92 @@ def calc_rt(ser_date, ser_pos, nb_days_cv=NB_DAYS_CV):
     Assuming that, for each period, the sum represents 
     the number of contagious people on the last date of this period. 
     '''
-    ser_start, ser_end = create_date_ranges(ser_date, nb_days_cv)
-    sum_pos = sum_mobile(ser_pos, ser_start, ser_end)
-    arr_rt = mdl_R0_estim(nb_cases=sum_pos.values[:-nb_days_cv] + \
-                          sum_pos.values[nb_days_cv:],
-                 nb_cases_init=sum_pos.values[:-nb_days_cv])
-    ser_rt = pd.Series(index=sum_pos.index[nb_days_cv:], data=arr_rt)
-    ser_rt = ser_rt[ser_rt.notna()]
+    _, ser_rt = calc_sum_rt(ser_date, ser_pos, nb_days_cv)
     return ser_rt
 
-def get_geo_fr():
+@instrumented()
+def calc_dep_sum(df_dep_pos, ser_date, nb_days_cv=NB_DAYS_CV):
+    '''
+    Sums of daily positive cases of last nb_days_cv days by departement
+    from df_dep_pos (date, [daily cases by dep.])
+    output : df_dep_sum DataFrame (date, [ date, [sums by dep.] ])
+    '''
+    ser_start, ser_end = create_date_ranges(ser_date, nb_days_cv)
+    # all columns at once (not inserted one by one)
+    dict_sum = {"date": df_dep_pos.index.tolist()}
+    for dep_curr in df_dep_pos.columns:
+        dict_sum[dep_curr] = sum_mobile(df_dep_pos[dep_curr], ser_start, 
+            ser_end).values
+    return pd.DataFrame(dict_sum, index=df_dep_pos.index)
+
+def save_geo_fr_bin(dep_fr, path_geo_bin=PATH_GEO_DEP_FR_BIN):
+    '''
+    Save geojson dep_fr pre-parsed in compact binary form (npz) :
+    coordinates in float32 array and sizes of rings / polygons / features
+    '''
+    list_coords = []
+    list_ring_len = []
+    list_poly_len = []
+    list_feat_len = []
+    list_multi = []
+    for feat_curr in dep_fr['features']:
+        geo_curr = feat_curr['geometry']
+        list_multi.append(geo_curr['type'] == 'MultiPolygon')
+        if list_multi[-1]:
+            list_poly = geo_curr['coordinates']
+        else:
+            list_poly = [geo_curr['coordinates']]
+        list_feat_len.append(len(list_poly))
+        for poly_curr in list_poly:
+            list_poly_len.append(len(poly_curr))
+            for ring_curr in poly_curr:
+                list_ring_len.append(len(ring_curr))
+                list_coords.extend(ring_curr)
+    str_props = json.dumps([feat_curr["properties"] \
+        for feat_curr in dep_fr['features']])
+    with open(path_geo_bin, 'wb') as f:
+        np.savez(f, coords=np.array(list_coords, dtype=np.float32),
+            ring_len=np.array(list_ring_len, dtype=np.int32),
+            poly_len=np.array(list_poly_len, dtype=np.int32),
+            feat_len=np.array(list_feat_len, dtype=np.int32),
+            multi=np.array(list_multi), props=np.array(str_props))
+
+def load_geo_fr_bin(path_geo_bin=PATH_GEO_DEP_FR_BIN):
+    '''
+    Load geojson saved in compact binary form by save_geo_fr_bin
+    '''
+    data_bin = np.load(path_geo_bin)
+    arr_coords = data_bin["coords"].astype(np.float64).round(NB_DECIMALS_GEO)
+    list_ring = [arr_ring.tolist() for arr_ring in np.split(arr_coords, 
+        np.cumsum(data_bin["ring_len"])[:-1])]
+    iter_ring = iter(list_ring)
+    list_poly = [[next(iter_ring) for _ in range(nb_ring)] \
+        for nb_ring in data_bin["poly_len"].tolist()]
+    iter_poly = iter(list_poly)
+    list_feat = []
+    for nb_poly, flag_multi, props in zip(data_bin["feat_len"].tolist(),
+            data_bin["multi"].tolist(), json.loads(str(data_bin["props"]))):
+        list_poly_curr = [next(iter_poly) for _ in range(nb_poly)]
+        if flag_multi:
+            geo_curr = {"type": "MultiPolygon", "coordinates": list_poly_curr}
+        else:
+            geo_curr = {"type": "Polygon", "coordinates": list_poly_curr[0]}
+        list_feat.append({"type": "Feature", "geometry": geo_curr,
+            "properties": props})
+    return {"type": "FeatureCollection", "features": list_feat}
+
+def read_geo_fr(flag_bin=None):
+    '''
+    Read geojson dep. France from disk :
+    from compact binary form if activated (settings.GEO_FR_BIN) 
+    and up to date (created if needed), else from JSON
+    '''
+    if flag_bin is None:
+        flag_bin = settings.GEO_FR_BIN
+    if flag_bin & os.path.isfile(PATH_GEO_DEP_FR_BIN):
+        if os.path.getmtime(PATH_GEO_DEP_FR_BIN) >= \
+            os.path.getmtime(URL_GEOJSON_DEP_FR):
+            return load_geo_fr_bin()
     ###########
     # GEOJSON : dep france : source : https://france-geojson.gregoiredavid.fr/
     #
@@ -117,23 +225,184 @@ def get_geo_fr():
 
     with open(URL_GEOJSON_DEP_FR) as f:
         dep_fr = json.load(f)
+    if flag_bin:
+        save_geo_fr_bin(dep_fr)
+    return dep_fr
+
+def get_geo_fr():
+    '''
+    Get geojson dep. France and table dep. code / name
+    Cached in process : read again only if file has been modified.
+    '''
+    mtime = os.path.getmtime(URL_GEOJSON_DEP_FR)
+    if DICT_GEO_FR.get("mtime") != mtime:
+        dep_fr = read_geo_fr()
+
+        # example : 
+        # dep_fr['features'][0]['geometry']['type']
+        # dep_fr['features'][0]['geometry']["coordinates"]
+        # dep_fr['features'][0]["properties"]["code"]
+        # dep_fr['features'][0]["properties"]["nom"]
+
+        # get list dep / code
+        list_code = [feat_curr["properties"]["code"] \
+            for feat_curr in dep_fr['features']]
+        list_name = [feat_curr["properties"]["nom"] \
+            for feat_curr in dep_fr['features']]
+        df_code_dep = pd.DataFrame(data=list_code, columns=["code"])
+        df_code_dep["name"] = list_name
+
+        # data depending on geojson must be computed again
+        DICT_GEO_FR_LOD.clear()
+        DICT_DEP_REG.clear()
+        DICT_GEO_FR["dep_fr"] = dep_fr
+        DICT_GEO_FR["df_code_dep"] = df_code_dep
+        DICT_GEO_FR["mtime"] = mtime
+
+    return DICT_GEO_FR["dep_fr"], DICT_GEO_FR["df_code_dep"].copy()
+
+def tolerance_zoom(zoom):
+    '''
+    Simplification tolerance [deg] for a map zoom level :
+    about half a pixel of 256 pixels tiles
+    '''
+    return 180 / (256 * 2**zoom)
 
-    # example : 
-    # dep_fr['features'][0]['geometry']['type']
-    # dep_fr['features'][0]['geometry']["coordinates"]
-    # dep_fr['features'][0]["properties"]["code"]
-    # dep_fr['features'][0]["properties"]["nom"]
+def simplify_ring(arr_ring, tolerance):
+    '''
+    Douglas-Peucker simplification of one ring (array of [lon, lat])
+    Ring is kept unchanged if result has less than 4 points.
+    '''
+    nb_pts = arr_ring.shape[0]
+    if nb_pts <= 4:
+        return arr_ring
+    arr_keep = np.zeros(nb_pts, dtype=bool)
+    arr_keep[0] = True
+    arr_keep[-1] = True
+    list_stack = [(0, nb_pts - 1)]
+    while list_stack:
+        I_start, I_end = list_stack.pop()
+        if I_end - I_start < 2:
+            continue
+        pt_start = arr_ring[I_start]
+        vec = arr_ring[I_end] - pt_start
+        arr_pts = arr_ring[I_start+1:I_end] - pt_start
+        norm = math.hypot(vec[0], vec[1])
+        if norm == 0: # closed ring : distance to first point
+            arr_dist = np.hypot(arr_pts[:, 0], arr_pts[:, 1])
+        else:
+            arr_dist = np.abs(vec[0]*arr_pts[:, 1] - vec[1]*arr_pts[:, 0]) \
+                / norm
+        I_max = np.argmax(arr_dist)
+        if arr_dist[I_max] > tolerance:
+            I_mid = I_start + 1 + I_max
+            arr_keep[I_mid] = True
+            list_stack.append((I_start, I_mid))
+            list_stack.append((I_mid, I_end))
+    if arr_keep.sum() < 4:
+        return arr_ring
+    return arr_ring[arr_keep]
+
+def simplify_geo_fr(dep_fr, tolerance):
+    '''
+    Simplify geometry of geojson dep_fr with tolerance [deg]
+    and round coordinates to useful decimals.
+    return new geojson
+    '''
+    nb_decimals = max(0, math.ceil(-math.log10(tolerance))) + 1
+    list_feat = []
+    for feat_curr in dep_fr['features']:
+        geo_curr = feat_curr['geometry']
+        if geo_curr['type'] == 'Polygon':
+            list_poly = [geo_curr['coordinates']]
+        else:
+            list_poly = geo_curr['coordinates']
+        list_poly_out = []
+        for poly_curr in list_poly:
+            list_poly_out.append([np.round(simplify_ring(np.array(ring_curr), 
+                tolerance), nb_decimals).tolist() for ring_curr in poly_curr])
+        if geo_curr['type'] == 'Polygon':
+            coords_out = list_poly_out[0]
+        else:
+            coords_out = list_poly_out
+        list_feat.append({"type": "Feature",
+            "geometry": {"type": geo_curr['type'], "coordinates": coords_out},
+            "properties": feat_curr["properties"]})
+    return {"type": "FeatureCollection", "features": list_feat}
+
+def get_zoom_lod(zoom):
+    '''
+    Level of detail (zoom level of LIST_ZOOM_GEO) for map zoom level :
+    finest level needed (finest of all if zoom is higher)
+    '''
+    list_zoom_ok = [zoom_curr for zoom_curr in LIST_ZOOM_GEO \
+        if zoom_curr >= zoom]
+    if list_zoom_ok == []:
+        return max(LIST_ZOOM_GEO)
+    return min(list_zoom_ok)
 
-    # get list dep / code
-    list_code = \
-        [feat_curr["properties"]["code"] for feat_curr in dep_fr['features']]
-    list_name = \
-        [feat_curr["properties"]["nom"] for feat_curr in dep_fr['features']]
-    df_code_dep = pd.DataFrame(data=list_code, columns=["code"])
-    df_code_dep["name"] = list_name
+def get_geo_fr_lod(zoom=ZOOM_GEO_MAP):
+    '''
+    Get geojson dep. France simplified for map zoom level
+    (all levels in LIST_ZOOM_GEO are pre-computed at first call
+    and again if geojson file has been modified)
+    '''
+    dep_fr, _ = get_geo_fr()
+    if DICT_GEO_FR_LOD == dict():
+        for zoom_curr in LIST_ZOOM_GEO:
+            DICT_GEO_FR_LOD[zoom_curr] = simplify_geo_fr(dep_fr, 
+                tolerance_zoom(zoom_curr))
+    return DICT_GEO_FR_LOD[get_zoom_lod(zoom)]
+
+def get_dep_registry():
+    '''
+    Registry of departements of map (built once) : 
+    dict of dict for O(1) lookups
+    - "code_name" : dep. code -> dep. name
+    - "name_code" : dep. name -> dep. code
+    - "code_region" : dep. code -> region name
+
+    Only departements with geometry are registered 
+    (975, 977, 978 are in SPF data but not in map)
+    '''
+    if DICT_DEP_REG == dict():
+        _, df_code_dep = get_geo_fr()
+        df_geo_dep = pd.read_csv(PATH_GEO_DEP_FR, dtype=str)
+        df_geo_reg = pd.read_csv(PATH_GEO_REG_FR, dtype=str)
+        dict_reg = dict(zip(df_geo_reg["code"], df_geo_reg["name"]))
+        dict_dep_reg = dict(zip(df_geo_dep["code"], 
+            df_geo_dep["region_code"].map(dict_reg)))
+        DICT_DEP_REG["code_name"] = dict(zip(df_code_dep["code"], 
+            df_code_dep["name"]))
+        DICT_DEP_REG["name_code"] = dict(zip(df_code_dep["name"], 
+            df_code_dep["code"]))
+        DICT_DEP_REG["code_region"] = {code: dict_dep_reg.get(code) \
+            for code in df_code_dep["code"]}
+    return DICT_DEP_REG
+
+def dep_code_to_name(dep_code):
+    return get_dep_registry()["code_name"][dep_code]
+
+def dep_name_to_code(dep_name):
+    return get_dep_registry()["name_code"][dep_name]
+
+def dep_code_to_region(dep_code):
+    return get_dep_registry()["code_region"][dep_code]
+
+def filter_dep_codes(list_code):
+    '''
+    Keep only departements codes of map (in registry)
+    '''
+    dict_code_name = get_dep_registry()["code_name"]
+    return [code for code in list_code if code in dict_code_name]
 
-    return dep_fr, df_code_dep
+def get_dict_dep_val(pt_fr_test_last, col_name="p"):
+    '''
+    dict dep. code -> value of column col_name of pt_fr_test_last
+    '''
+    return dict(zip(pt_fr_test_last["dep"], pt_fr_test_last[col_name]))
 
+@instrumented()
 def get_data_rt(df_gouv_fr_raw):
     ############################
     # Create data last 14 days : FRANCE Tested and Positive
@@ -170,15 +439,7 @@ def get_data_rt(df_gouv_fr_raw):
     pt_fr_test_last.index.name = ''
     pt_fr_test_last["dep"] = pt_fr_test_last.index
 
-    ser_start, ser_end = create_date_ranges(df_gouv_fr_raw["jour"], NB_DAYS_CV)
-    #print("ser_start : ", ser_start)
-    #print("ser_end : ", ser_end)
-
-    df_dep_sum = pd.DataFrame(index=df_dep_pos.index, columns=["date"],
-                            data=df_dep_pos.index.tolist())
-    for dep_curr in df_dep_pos.columns:
-        df_dep_sum[dep_curr] = sum_mobile(df_dep_pos[dep_curr], ser_start, 
-            ser_end)
+    df_dep_sum = calc_dep_sum(df_dep_pos, df_gouv_fr_raw["jour"])
 
     df_dep_r0 = pd.DataFrame(index=df_dep_pos.index, columns=["date"],
                             data=df_dep_pos.index.tolist())
@@ -240,6 +501,8 @@ def get_data_rt(df_gouv_fr_raw):
 
     df_dep_r0.to_csv(PATH_DF_DEP_R0, index=False)
 
+    df_dep_sum.to_csv(PATH_DF_DEP_SUM, index=False)
+
     pt_fr_test_last.to_csv(PATH_PT_FR_TEST_LAST, index=False)
 
     return df_dep_r0, pt_fr_test_last, dep_fr, df_code_dep
@@ -262,6 +525,65 @@ def load_df_dep_r0():
 def load_pt_fr_test_last():
     return pd.read_csv(PATH_PT_FR_TEST_LAST)
 
+def load_df_dep_sum(path_df_dep_sum=PATH_DF_DEP_SUM):
+    df_dep_sum = pd.read_csv(path_df_dep_sum)
+    df_dep_sum.index = df_dep_sum["date"]
+    return df_dep_sum
+
+@instrumented()
+def prepare_plot_data_dep_sum(df_pos_fr, path_df_dep_sum=PATH_DF_DEP_SUM):
+    '''
+    Prepare plot data for positive cases by departement : sums of last 
+    NB_DAYS_CV days pre-computed on disk (by get_data_rt),
+    computed from df_pos_fr (date, [daily cases by dep.]) if not found
+    '''
+    if os.path.isfile(path_df_dep_sum):
+        return load_df_dep_sum(path_df_dep_sum)
+    df_dep_sum = calc_dep_sum(df_pos_fr[filter_dep_codes(df_pos_fr.columns)],
+        df_pos_fr["date"])
+    df_dep_sum.to_csv(path_df_dep_sum, index=False)
+    return df_dep_sum
+
+@instrumented()
+def get_data_rt_fr(ser_date, ser_pos, path_df_rt_fr=PATH_DF_RT_FR):
+    '''
+    Pre-compute Rt France & sums of positive cases of last NB_DAYS_CV days
+    from dates & daily positive cases France
+    output : df_rt_fr DataFrame (date, sum_pos, rt) saved on disk
+    '''
+    ser_pos = pd.Series(index=ser_date.values, data=ser_pos.values)
+    sum_pos, ser_rt = calc_sum_rt(ser_date, ser_pos, NB_DAYS_CV)
+    df_rt_fr = pd.DataFrame(index=sum_pos.index, columns=["date"],
+                            data=sum_pos.index.tolist())
+    df_rt_fr["sum_pos"] = sum_pos
+    df_rt_fr["rt"] = ser_rt
+    df_rt_fr.to_csv(path_df_rt_fr, index=False)
+    record_stage(path_df_rt_fr, "prepare_data_rt_fr", df_rt_fr)
+    return df_rt_fr
+
+def prepare_data_rt_fr_disk():
+    '''
+    Pre-compute Rt France from daily positive cases on disk (df_pos_fr)
+    '''
+    df_pos_fr = pd.read_csv(PATH_DF_POS_FR)
+    get_data_rt_fr(df_pos_fr["date"], df_pos_fr["daily"])
+
+def load_df_rt_fr(path_df_rt_fr=PATH_DF_RT_FR):
+    df_rt_fr = pd.read_csv(path_df_rt_fr)
+    df_rt_fr.index = df_rt_fr["date"]
+    return df_rt_fr
+
+@instrumented()
+def prepare_plot_data_rt_fr(df_feat_fr, flag_update=False):
+    '''
+    Prepare plot data for Rt France : pre-computed on disk,
+    computed from df_feat_fr (date, pos) if flag_update or not found
+    '''
+    if flag_update or (not os.path.isfile(PATH_DF_RT_FR)):
+        return get_data_rt_fr(df_feat_fr["date"], df_feat_fr["pos"])
+    return load_df_rt_fr()
+
+@instrumented()
 def prepare_plot_data_map(flag_update=False):
     '''Prepare plot data for RT MAP'''
     # plot data for MAPS
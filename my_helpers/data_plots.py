@@ -11,11 +11,12 @@ import os
 # import third party
 import pandas as pd
 import numpy as np
-import requests
+# requests : lazy import (slow) only when downloading
 
 # import project libraries
 import settings
 from my_helpers.dates import days_between, add_days, get_file_date
+from my_helpers.dates import add_date_dt
 from my_helpers.meteo import update_data_meteo_light
 from my_helpers.meteo import precompute_data_meteo_light
 from my_helpers.meteo import extrapolate_df_meteo
@@ -24,6 +25,11 @@ from my_helpers.meteo import PATH_DF_METEO_FR_OLD
 from my_helpers.meteo import PATH_JSON_METEO_TEMP_FR_OLD
 from my_helpers.model import FUTURE_TARGET, TRAIN_SPLIT
 from my_helpers.model import update_pred_pos, update_pred_pos_all
+from my_helpers.manifest import record_stage, get_source_tag
+from my_helpers.manifest import read_manifest, get_path_manifest
+from my_helpers.manifest import get_last_date, probe_source_changed
+from my_helpers.instrument import instrumented, stage
+from my_helpers.tracing import traced
 
 # DEFINITIONS
 PATH_TO_SAVE_DATA = settings.PATH_TO_SAVE_DATA
@@ -49,15 +55,21 @@ NB_DAY_PLOT = FUTURE_TARGET * NB_PERIOD_PLOT
 from my_helpers.meteo import PATH_DF_METEO_FR
 
 # DATA from SPF
+@instrumented()
 def get_data_gouv_fr():
     '''
     Get from Gouv  SFP page data cases in France 
     Clean & Save
     '''
+    import requests
     # patch 29/07/2020 : SSL error patch
-    req = requests.get(URL_CSV_GOUV_FR).content
-    df_gouv_fr_raw = pd.read_csv(io.StringIO(req.decode('utf-8')), sep=";", 
-        low_memory=False) # patch dtype 2020-09-08
+    with stage("data_plots.download_gouv_fr"):
+        res = requests.get(URL_CSV_GOUV_FR)
+        req = res.content
+    with stage("data_plots.parse_gouv_fr") as record:
+        df_gouv_fr_raw = pd.read_csv(io.StringIO(req.decode('utf-8')), 
+            sep=";", low_memory=False) # patch dtype 2020-09-08
+        record.set_rows(rows_out=df_gouv_fr_raw.shape[0])
 
     # past treat data upper cases -> lower cases
     if "t" not in df_gouv_fr_raw.columns:
@@ -67,7 +79,11 @@ def get_data_gouv_fr():
     # patch : clear data in double !!!
     df_gouv_fr_raw = df_gouv_fr_raw[df_gouv_fr_raw["cl_age90"] != 0]
 
-    df_gouv_fr_raw.to_csv(PATH_DF_GOUV_FR_RAW, index=False)
+    with stage("data_plots.write_gouv_fr", df_gouv_fr_raw.shape[0]):
+        df_gouv_fr_raw.to_csv(PATH_DF_GOUV_FR_RAW, index=False)
+    record_stage(PATH_DF_GOUV_FR_RAW, "get_data_gouv_fr", df_gouv_fr_raw,
+        dict_extra={"last_date": str(df_gouv_fr_raw["jour"].max()),
+        "source_tag": get_source_tag(res.headers)})
 
     return df_gouv_fr_raw
 
@@ -118,6 +134,7 @@ def compute_sum_dep(df_in):
         df_in["daily"]  += df_in[dep_curr]
     return df_in
 
+@instrumented()
 def precompute_data_pos(df_gouv_fr_raw, nb_pos_start=NB_POS_DATE_MIN_DF_FEAT,
         path_df_pos_fr=PATH_DF_POS_FR, path_df_test_fr=PATH_DF_TEST_FR):
     '''Pre-compute data from Sante Publique France'''
@@ -158,6 +175,7 @@ def precompute_data_pos(df_gouv_fr_raw, nb_pos_start=NB_POS_DATE_MIN_DF_FEAT,
     df_pos_fr["nb_cases"] = nb_pos_start + arr_nb_cases
     # save data pos
     df_pos_fr.to_csv(path_df_pos_fr, index=False)
+    record_stage(path_df_pos_fr, "precompute_data_pos", df_pos_fr)
 
     # prepare data tested
     df_test_fr = pt_fr_test["t"].copy()
@@ -170,6 +188,7 @@ def precompute_data_pos(df_gouv_fr_raw, nb_pos_start=NB_POS_DATE_MIN_DF_FEAT,
     df_test_fr = compute_sum_dep(df_test_fr)
     # save data tested
     df_test_fr.to_csv(path_df_test_fr, index=False)
+    record_stage(path_df_test_fr, "precompute_data_pos", df_test_fr)
 
     return df_pos_fr, df_test_fr
 
@@ -186,6 +205,7 @@ def precompute_old_data_pos_disk():
     precompute_data_pos(df_gouv_fr_raw_old, nb_pos_start=0, 
         path_df_pos_fr=PATH_DF_POS_FR_OLD, path_df_test_fr=PATH_DF_TEST_FR_OLD)
 
+@instrumented()
 def prepare_features(df_feat_fr, df_pos_fr, df_test_fr, 
         path_df_feat_fr=PATH_DF_FEAT_FR):
     '''Finalize preparation of model features df_feat_fr table 
@@ -211,6 +231,7 @@ def prepare_features(df_feat_fr, df_pos_fr, df_test_fr,
 
     # save for future uses
     df_feat_fr.to_csv(path_df_feat_fr, index=False)
+    record_stage(path_df_feat_fr, "prepare_features", df_feat_fr)
 
 def prepare_features_disk():
     '''
@@ -233,14 +254,23 @@ def prepare_features_disk_emr():
     df_feat_fr = extrapolate_df_meteo(df_feat_fr, list_dates)
     prepare_features(df_feat_fr, df_pos_fr, df_test_fr)
 
+def load_list_dates_gouv(path_df_gouv_fr_raw=PATH_DF_GOUV_FR_RAW):
+    '''
+    List of dates of raw data from SPF (same as df_pos_fr dates)
+    only column "jour" is read
+    '''
+    return sorted(pd.read_csv(path_df_gouv_fr_raw, 
+        usecols=["jour"])["jour"].unique().tolist())
+
 def update_data_meteo_disk():
     ''' Update meteo light from disk for Airflow DAG
+    dates from raw data SPF : no need to wait for precompute_data_pos
     '''
-    df_pos_fr = pd.read_csv(PATH_DF_POS_FR)
-    data_meteo_new = update_data_meteo_light(df_pos_fr["date"].tolist())
+    data_meteo_new = update_data_meteo_light(load_list_dates_gouv())
     assert data_meteo_new != None
 
-def get_data_pos():
+@instrumented()
+def get_data_pos(fun_progress=None):
     '''
     1) Retrieve data from Sante Publique France direct CSV URL 
         (updated every days but with 4 to 5 days delay...)
@@ -250,20 +280,28 @@ def get_data_pos():
     5) Proceed features data for model by combining all these data
 
     Every databases are saved in CSV format.
+    fun_progress(step, progress) is called before each step (progress 0-1)
     '''
+    if fun_progress is None:
+        fun_progress = lambda step, progress: None
+    fun_progress("download SPF data", 0)
     df_gouv_fr_raw = get_data_gouv_fr()
     # creation of data tables : tested & positive
+    fun_progress("compute positive cases", 0.2)
     df_pos_fr, df_test_fr = precompute_data_pos(df_gouv_fr_raw)
     # list dates 
     list_dates = df_pos_fr["date"].tolist()
     # meteo
+    fun_progress("download meteo data", 0.3)
     data_meteo = update_data_meteo_light(list_dates)
     # create features for model
     # pre-compute data meteo & add
+    fun_progress("compute meteo", 0.6)
     df_meteo_fr = precompute_data_meteo_light(data_meteo)
     # extrapolation meteo
     df_feat_fr = extrapolate_df_meteo(df_meteo_fr, list_dates)
     # finalize features and save (df_feat_fr on disk)
+    fun_progress("prepare features", 0.7)
     prepare_features(df_feat_fr, df_pos_fr, df_test_fr)
 
 def get_old_data_pos():
@@ -295,6 +333,7 @@ def get_old_data_pos():
         path_df_feat_fr=PATH_DF_FEAT_FR_OLD)
 
 # FOR data to plot
+@instrumented()
 def load_data_pos(path_df_feat_fr=PATH_DF_FEAT_FR):
     '''
     Load data positive cases France
@@ -303,6 +342,15 @@ def load_data_pos(path_df_feat_fr=PATH_DF_FEAT_FR):
     df_feat_fr.index = df_feat_fr["date"]
     return df_feat_fr
 
+@instrumented()
+def load_df_pos_fr(path_df_pos_fr=PATH_DF_POS_FR):
+    '''
+    Load daily positive cases by departement
+    '''
+    df_pos_fr = pd.read_csv(path_df_pos_fr)
+    df_pos_fr.index = df_pos_fr["date"]
+    return df_pos_fr
+
 def load_old_data_pos():
     '''
     Load Old data positive cases France
@@ -312,6 +360,7 @@ def load_old_data_pos():
     return df_feat_fr_old
 
 
+@instrumented()
 def load_data_gouv():
     '''
     Load data gouv France
@@ -339,7 +388,7 @@ def update_pos(df_feat_fr):
     # pos last NB_DAY_PLOT days : date, pos, total (sum)
     str_date_0 = add_days(df_feat_fr.date.max(), -NB_DAY_PLOT)
     df_plot = df_feat_fr[df_feat_fr["date"] >= str_date_0].copy()
-    return df_plot
+    return add_date_dt(df_plot)
 
 def prepare_data_input(flag_update):
     '''Prepare data input'''
@@ -362,42 +411,58 @@ def prepare_old_data_input(flag_update):
     df_feat_fr_old = load_old_data_pos()
     return df_feat_fr_old
 
+@instrumented()
 def prepare_plot_data_pos(df_feat_fr, flag_update):
-    '''Prepare data for plot positive cases'''
+    '''
+    Prepare data for plot positive cases
+    (dates parsed once for figures : column date_dt)
+    '''
     # plot data for positive cases
     df_plot = update_pos(df_feat_fr)
     str_date_last = df_plot.date.max()
     # predict 3 future days
     flag_pred_disk = not(flag_update)
-    df_plot_pred = update_pred_pos(df_feat_fr, flag_pred_disk)
+    df_plot_pred = add_date_dt(update_pred_pos(df_feat_fr, flag_pred_disk))
     # predict all past days
-    df_plot_pred_all = update_pred_pos_all(df_feat_fr, flag_pred_disk)
+    df_plot_pred_all = add_date_dt(update_pred_pos_all(df_feat_fr, 
+        flag_pred_disk))
 
     return df_plot, df_plot_pred, df_plot_pred_all, str_date_last
 
-def check_update():
+@traced()
+def check_update(flag_probe=None, fun_head=None):
     '''
     Just check if new data possibly available
-    (if file date older than 24 hours or 
+    (if file date older than 6 hours or 
     different dates of postive cases and meteo)
+    Dates are read in manifest (CSV files only if not in manifest).
+    If flag_probe (default settings.CHECK_UPDATE_PROBE), old data is 
+    considered as updatable only if SPF source changed (HTTP HEAD).
     '''
     time_file_df_feat_date = get_file_date(PATH_DF_FEAT_FR)
     dtime_now  = datetime.datetime.now() - time_file_df_feat_date
 
     # meteo check
     # if date df_pos != date df_meteo
-    if (os.path.isfile(PATH_DF_POS_FR) & os.path.isfile(PATH_DF_METEO_FR)):
-        df_pos_fr = pd.read_csv(PATH_DF_POS_FR)
-        df_meteo_fr = pd.read_csv(PATH_DF_METEO_FR)
-        if df_pos_fr["date"].max() !=  df_meteo_fr["date"].max():
-            flag_meteo = True
-        else:
-            flag_meteo = False
-    else:
+    dict_manifest = read_manifest(get_path_manifest(PATH_DF_POS_FR))
+    date_pos = get_last_date(PATH_DF_POS_FR, dict_manifest)
+    date_meteo = get_last_date(PATH_DF_METEO_FR, dict_manifest)
+    if (date_pos is None) | (date_meteo is None):
         flag_meteo = True
+    else:
+        flag_meteo = date_pos != date_meteo
 
     # update only if more than 6 hours without update
-    if ((dtime_now.total_seconds() > 6*3600) | flag_meteo):
+    flag_old = (dtime_now.total_seconds() > 6*3600)
+    if flag_probe is None:
+        flag_probe = settings.CHECK_UPDATE_PROBE
+    if flag_old & (not flag_meteo) & flag_probe:
+        # only if SPF source changed since last download
+        dict_raw = dict_manifest.get(os.path.basename(PATH_DF_GOUV_FR_RAW), 
+            dict())
+        flag_old = probe_source_changed(URL_CSV_GOUV_FR, 
+            dict_raw.get("source_tag"), fun_head=fun_head)
+    if (flag_old | flag_meteo):
         flag_old = True
         # update data from external 
         print("Maybe new data available...")
@@ -405,4 +470,4 @@ def check_update():
     else:
         flag_old = False
         print("No new data available.")
-    return flag_old
\ No newline at end of file
+    return flag_old
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+''' Module for snapshot of data displayed by app
+
+A snapshot (dict) holds all data needed for the page, loaded at once.
+It is replaced atomically when data are refreshed : requests see the old
+or the new snapshot, never a mix.
+'''
+
+# import built-in
+import threading
+
+# import project modules
+from my_helpers.data_plots import prepare_data_input
+from my_helpers.data_plots import prepare_plot_data_pos
+from my_helpers.data_plots import get_data_pos
+from my_helpers.data_plots import load_df_pos_fr
+from my_helpers.data_plots import PATH_DF_FEAT_FR, PATH_DF_POS_FR
+from my_helpers.data_maps import prepare_plot_data_map
+from my_helpers.data_maps import prepare_plot_data_rt_fr
+from my_helpers.data_maps import prepare_plot_data_dep_sum
+from my_helpers.data_maps import PATH_DF_DEP_R0, PATH_PT_FR_TEST_LAST
+from my_helpers.data_maps import PATH_DF_RT_FR, PATH_DF_DEP_SUM
+from my_helpers.model import PATH_DF_PLOT_PRED, PATH_DF_PLOT_PRED_ALL
+from my_helpers.fig_cache import get_data_version
+from my_helpers.refresh import refresh_runner
+from my_helpers.tracing import traced
+
+# DEFINITIONS
+# data of snapshot (version = last modification)
+LIST_PATH_DATA_SNAPSHOT = [PATH_DF_FEAT_FR, PATH_DF_PLOT_PRED,
+    PATH_DF_PLOT_PRED_ALL, PATH_DF_DEP_R0, PATH_PT_FR_TEST_LAST,
+    PATH_DF_RT_FR, PATH_DF_POS_FR, PATH_DF_DEP_SUM]
+DICT_SNAPSHOT = {"current": None}
+LOCK_SNAPSHOT = threading.Lock()
+
+@traced()
+def build_snapshot(flag_update=False):
+    '''
+    Load data for app from disk
+    (flag_update : predictions & Rt computed again from data on disk)
+    '''
+    df_feat_fr, str_date_mdl, str_data_date = prepare_data_input(False)
+    df_plot, df_plot_pred, df_plot_pred_all, str_date_last = \
+        prepare_plot_data_pos(df_feat_fr, flag_update)
+    df_dep_r0, pt_fr_test_last, dep_fr, df_code_dep = \
+        prepare_plot_data_map(flag_update)
+    df_rt_fr = prepare_plot_data_rt_fr(df_feat_fr, flag_update)
+    df_pos_fr = load_df_pos_fr()
+    df_dep_sum = prepare_plot_data_dep_sum(df_pos_fr)
+    return {"version": get_data_version(LIST_PATH_DATA_SNAPSHOT),
+        "df_feat_fr": df_feat_fr, "str_date_mdl": str_date_mdl,
+        "str_data_date": str_data_date, "df_plot": df_plot,
+        "df_plot_pred": df_plot_pred, "df_plot_pred_all": df_plot_pred_all,
+        "str_date_last": str_date_last, "df_dep_r0": df_dep_r0,
+        "pt_fr_test_last": pt_fr_test_last, "df_rt_fr": df_rt_fr,
+        "df_pos_fr": df_pos_fr, "df_dep_sum": df_dep_sum}
+
+def set_snapshot(snapshot):
+    DICT_SNAPSHOT["current"] = snapshot
+
+@traced()
+def get_snapshot():
+    '''
+    Current snapshot : loaded from disk if none or if data on disk
+    changed (not during refresh : files are being written)
+    '''
+    snapshot = DICT_SNAPSHOT["current"]
+    if (snapshot is not None) and (refresh_runner.is_running() or \
+        (snapshot["version"] == get_data_version(LIST_PATH_DATA_SNAPSHOT))):
+        return snapshot
+    with LOCK_SNAPSHOT:
+        # maybe loaded by another thread meanwhile
+        snapshot = DICT_SNAPSHOT["current"]
+        if (snapshot is None) or \
+            (snapshot["version"] != get_data_version(LIST_PATH_DATA_SNAPSHOT)):
+            snapshot = build_snapshot()
+            set_snapshot(snapshot)
+    return snapshot
+
+def refresh_snapshot(fun_progress=None):
+    '''
+    Download & compute new data, then replace snapshot
+    (job for refresh runner)
+    '''
+    if fun_progress is None:
+        fun_progress = lambda step, progress: None
+    get_data_pos(fun_progress)
+    fun_progress("predictions & Rt maps", 0.8)
+    snapshot = build_snapshot(flag_update=True)
+    set_snapshot(snapshot)
+    return snapshot
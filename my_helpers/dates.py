@@ -4,6 +4,9 @@ import os
 import pandas as pd
 import numpy as np
 
+# column of dates parsed (datetime64) from string dates column "date"
+COL_DATE_DT = "date_dt"
+
 # FOR DATES
 def add_days(str_date_0, nb_days_CV):
     '''
@@ -80,4 +83,24 @@ def create_date_ranges(ser_dates, nb_days_CV):
     while ser_start[-1] > str_date_min:
         ser_end.append(add_days(ser_end[-1], -1))
         ser_start.append(add_days(ser_end[-1], -(nb_days_CV-1)))
-    return ser_start, ser_end
\ No newline at end of file
+    return ser_start, ser_end
+
+def add_date_dt(df, col_date="date"):
+    '''
+    Add column COL_DATE_DT : string dates of col_date parsed once 
+    in datetime64 (for figures)
+    '''
+    if COL_DATE_DT not in df.columns:
+        df[COL_DATE_DT] = pd.to_datetime(df[col_date], format="%Y-%m-%d")
+    return df
+
+def get_dates_ms(df, col_date="date"):
+    '''
+    Dates of df in ms since epoch (int64 array) for date axis of figures
+    (from column COL_DATE_DT if already parsed)
+    '''
+    if COL_DATE_DT in df.columns:
+        ser_date = df[COL_DATE_DT]
+    else:
+        ser_date = pd.to_datetime(df[col_date], format="%Y-%m-%d")
+    return ser_date.values.astype("datetime64[ms]").astype(np.int64)
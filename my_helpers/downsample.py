@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+''' Module for downsampling of time series in figures (level of detail)
+
+LTTB : Largest-Triangle-Three-Buckets (S. Steinarsson, 2013)
+keeps the visual shape (peaks, trends) of a series with few points.
+Points are selected by their positions : first & last always kept.
+With zoom (x_range), all points inside the range are kept 
+(downsampled again if still too many).
+'''
+
+# import third party
+import numpy as np
+
+# import project modules
+import settings
+
+# DEFINITIONS
+NB_POINTS_PLOT = settings.PLOT_NB_POINTS_MAX
+
+def lttb_indices(arr_y, nb_points, arr_x=None):
+    '''
+    Positions of nb_points selected by LTTB in series arr_y 
+    (x : arr_x or positions). All positions if not enough points.
+    NaN values are kept only if no other choice in bucket.
+    '''
+    arr_y = np.asarray(arr_y, dtype=float)
+    nb = arr_y.shape[0]
+    if (nb_points >= nb) or (nb_points < 3):
+        return np.arange(nb)
+    if arr_x is None:
+        arr_x = np.arange(nb, dtype=float)
+    else:
+        arr_x = np.asarray(arr_x, dtype=float)
+    # buckets (except first & last points)
+    arr_edge = np.linspace(1, nb - 1, nb_points - 1).astype(int)
+    list_index = [0]
+    for i_bucket in range(nb_points - 2):
+        i_start, i_end = arr_edge[i_bucket], arr_edge[i_bucket + 1]
+        # third point : average of next bucket (last point at the end)
+        if i_bucket < nb_points - 3:
+            i_next_end = arr_edge[i_bucket + 2]
+            x_avg = arr_x[i_end:i_next_end].mean()
+            y_avg = np.nanmean(arr_y[i_end:i_next_end]) \
+                if np.any(~np.isnan(arr_y[i_end:i_next_end])) else np.nan
+        else:
+            x_avg, y_avg = arr_x[-1], arr_y[-1]
+        # first point : last selected
+        i_a = list_index[-1]
+        arr_area = np.abs((arr_x[i_a] - x_avg) * \
+            (arr_y[i_start:i_end] - arr_y[i_a]) - \
+            (arr_x[i_a] - arr_x[i_start:i_end]) * (y_avg - arr_y[i_a]))
+        arr_area[np.isnan(arr_area)] = -1
+        list_index.append(i_start + int(np.argmax(arr_area)))
+    list_index.append(nb - 1)
+    return np.array(list_index)
+
+def to_datetime(arr_x):
+    '''
+    String dates as datetime64 (data "YYYY-MM-DD" or zoom bounds of plotly
+    "YYYY-MM-DD HH:MM:SS.sss"), other values unchanged
+    '''
+    arr_x = np.asarray(arr_x)
+    if arr_x.dtype.kind in "OSU":
+        return arr_x.astype("datetime64[ms]")
+    return arr_x
+
+def get_index_plot(arr_y, arr_x=None, x_range=None, nb_points=None):
+    '''
+    Positions of points to plot for series arr_y :
+    LTTB over all series, and all points in x_range [x_min, x_max] if zoom
+    (string dates of x_range & arr_x compared as dates)
+    '''
+    if nb_points is None:
+        nb_points = NB_POINTS_PLOT
+    if nb_points <= 0: # no downsampling
+        return np.arange(len(arr_y))
+    arr_y = np.asarray(arr_y, dtype=float)
+    arr_index = lttb_indices(arr_y, nb_points)
+    if (x_range is None) or (arr_x is None):
+        return arr_index
+    arr_x = to_datetime(arr_x)
+    x_min, x_max = to_datetime(x_range)
+    arr_index_zoom = np.flatnonzero((arr_x >= x_min) & (arr_x <= x_max))
+    arr_index_zoom = arr_index_zoom[lttb_indices(arr_y[arr_index_zoom], 
+        nb_points)]
+    return np.union1d(arr_index, arr_index_zoom)
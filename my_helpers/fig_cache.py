@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+''' Module for cache of pre-rendered figures
+
+Figures are stored serialized in JSON, keyed by
+(figure type, departement, data version), with LRU eviction.
+'''
+
+# import built-in
+import os
+import json
+import time
+import datetime
+import threading
+from collections import OrderedDict
+
+# import project modules
+import settings
+from my_helpers.tracing import span
+
+# DEFINITIONS
+FIG_CACHE_SIZE = settings.FIG_CACHE_SIZE
+# upper bounds of build time histogram buckets [ms]
+LIST_BUCKETS_MS = [10, 50, 100, 250, 500, 1000, 2500, float("inf")]
+# log statistics every NB_LOG_STATS requests
+NB_LOG_STATS = 50
+
+# HELPERS FUNCTIONS
+
+def get_data_version(list_path):
+    '''
+    Data version from last modification time of files in list_path
+    (files not found are ignored)
+    '''
+    list_mtime = [os.path.getmtime(path_curr) for path_curr in list_path \
+        if os.path.isfile(path_curr)]
+    if list_mtime == []:
+        return "none"
+    return "{:.6f}".format(max(list_mtime))
+
+class FigCache:
+    '''
+    LRU cache of figures serialized in JSON
+
+    key : (fig_type, dep, data_version)
+    '''
+    def __init__(self, size_max=FIG_CACHE_SIZE):
+        self.size_max = size_max
+        self.dict_fig = OrderedDict()
+        self.lock = threading.Lock()
+        self.nb_hit = 0
+        self.nb_miss = 0
+        self.dict_hist_ms = OrderedDict((bound, 0) for bound in LIST_BUCKETS_MS)
+
+    def __len__(self):
+        return len(self.dict_fig)
+
+    def get(self, key):
+        '''
+        Get figure JSON for key (None if not in cache)
+        '''
+        with self.lock:
+            fig_json = self.dict_fig.get(key)
+            if fig_json is not None:
+                self.dict_fig.move_to_end(key)
+            return fig_json
+
+    def put(self, key, fig_json):
+        '''
+        Store figure JSON for key, evict least recently used if full
+        '''
+        with self.lock:
+            self.dict_fig[key] = fig_json
+            self.dict_fig.move_to_end(key)
+            while len(self.dict_fig) > self.size_max:
+                self.dict_fig.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.dict_fig.clear()
+
+    def add_build_time(self, time_ms):
+        with self.lock:
+            for bound in self.dict_hist_ms.keys():
+                if time_ms <= bound:
+                    self.dict_hist_ms[bound] += 1
+                    break
+
+    def hit_ratio(self):
+        with self.lock:
+            nb_req = self.nb_hit + self.nb_miss
+            if nb_req == 0:
+                return 0
+            return self.nb_hit / nb_req
+
+    def get_fig(self, fig_type, dep, data_version, fun_build):
+        '''
+        Get figure (dict) from cache or build it with fun_build()
+        (returns plotly figure) and store it.
+        '''
+        key = (fig_type, dep, data_version)
+        # lookup & counters together : called by requests & prewarm threads
+        with self.lock:
+            fig_json = self.dict_fig.get(key)
+            if fig_json is None:
+                self.nb_miss += 1
+            else:
+                self.dict_fig.move_to_end(key)
+                self.nb_hit += 1
+            flag_log = (self.nb_hit + self.nb_miss) % NB_LOG_STATS == 0
+        if fig_json is None:
+            time_start = time.perf_counter()
+            with span("fig_cache.build"):
+                fig = fun_build()
+            with span("fig_cache.to_json"):
+                fig_json = fig.to_json()
+            self.add_build_time(1000 * (time.perf_counter() - time_start))
+            self.put(key, fig_json)
+        if flag_log:
+            self.log_stats()
+        with span("fig_cache.loads"):
+            return json.loads(fig_json)
+
+    def log_stats(self):
+        '''
+        Print hit ratio and build time histogram
+        '''
+        with self.lock:
+            str_hist = " ".join(["<={}:{}".format(bound, nb) \
+                for bound, nb in self.dict_hist_ms.items()])
+            nb_fig, nb_hit, nb_miss = len(self.dict_fig), self.nb_hit, \
+                self.nb_miss
+        print("{} : fig cache : {} figs / hit ratio: {:.2f} ({} hit {} miss)"\
+            .format(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            nb_fig, nb_hit / max(1, nb_hit + nb_miss), nb_hit, nb_miss) + \
+            " / build time [ms]: " + str_hist)
+
+# cache shared in process
+fig_cache = FigCache()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+''' Module for versions of data files saved before update
+
+Versions are compressed copies (gzip) stored in versions/<file name>/
+(next to the file by default) with an index (JSON) :
+same content is not saved twice, only last versions are kept
+(number and age).
+'''
+
+# import built-in
+import os
+import json
+import gzip
+import shutil
+import hashlib
+import datetime
+
+# import project modules
+import settings
+
+# DEFINITIONS
+NAME_DIR_VERSIONS = 'versions'
+NB_KEEP = settings.FILE_VERSIONS_NB_KEEP
+MAX_AGE_DAYS = settings.FILE_VERSIONS_MAX_AGE_DAYS
+COMPRESS_LEVEL = 6
+NAME_INDEX = 'index.json'
+FORMAT_VERSION = "%Y%m%d_%H_%M_%S_%f"
+
+# HELPERS FUNCTIONS
+
+def get_dir_versions(path_file, path_versions=None):
+    '''
+    Folder of versions of file (path_versions : versions/ next to file
+    if None)
+    '''
+    if path_versions is None:
+        path_versions = os.path.join(
+            os.path.dirname(os.path.abspath(path_file)), NAME_DIR_VERSIONS)
+    return os.path.join(path_versions, os.path.basename(path_file))
+
+def hash_file(path_file, chunksize=1024*1024):
+    '''
+    MD5 of file content
+    '''
+    hash_md5 = hashlib.md5()
+    with open(path_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunksize), b''):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+def write_json_atomic(obj, path_file):
+    path_tmp = path_file + '.tmp'
+    with open(path_tmp, 'w') as outfile:
+        json.dump(obj, outfile, indent=1)
+    os.replace(path_tmp, path_file)
+
+def list_versions(path_file, path_versions=None):
+    '''
+    List of versions of file (oldest first) :
+    dicts with keys version, date, hash, size, size_gz, file
+    '''
+    path_index = os.path.join(get_dir_versions(path_file, path_versions),
+        NAME_INDEX)
+    if not os.path.isfile(path_index):
+        return []
+    with open(path_index) as f:
+        return json.load(f)
+
+def apply_retention(list_version, nb_keep=NB_KEEP,
+    max_age_days=MAX_AGE_DAYS, date_now=None):
+    '''
+    Split versions in (kept, removed) :
+    nb_keep last versions not older than max_age_days (last one always kept)
+    '''
+    if date_now is None:
+        date_now = datetime.datetime.now()
+    date_min = date_now - datetime.timedelta(days=max_age_days)
+    list_keep = []
+    list_remove = []
+    for num_version, dict_version in enumerate(reversed(list_version)):
+        date_version = datetime.datetime.strptime(dict_version["version"],
+            FORMAT_VERSION)
+        if (num_version == 0) or ((num_version < nb_keep) and \
+            (date_version >= date_min)):
+            list_keep.insert(0, dict_version)
+        else:
+            list_remove.insert(0, dict_version)
+    return list_keep, list_remove
+
+def save_version(path_file, path_versions=None, nb_keep=NB_KEEP,
+    max_age_days=MAX_AGE_DAYS):
+    '''
+    Save compressed version of file (if content changed since last version)
+    and remove old versions.
+    return version saved (dict) or None if file not found
+    '''
+    if not os.path.isfile(path_file):
+        print('File {} does not exist!'.format(path_file))
+        return None
+    dir_versions = get_dir_versions(path_file, path_versions)
+    os.makedirs(dir_versions, exist_ok=True)
+    list_version = list_versions(path_file, path_versions)
+    hash_curr = hash_file(path_file)
+    if (list_version != []) and (list_version[-1]["hash"] == hash_curr):
+        # same content : already saved
+        return list_version[-1]
+    date_now = datetime.datetime.now()
+    str_version = date_now.strftime(FORMAT_VERSION)
+    name_gz = os.path.basename(path_file) + '_' + str_version + '.gz'
+    path_gz = os.path.join(dir_versions, name_gz)
+    with open(path_file, 'rb') as f_in, \
+        gzip.open(path_gz + '.tmp', 'wb', compresslevel=COMPRESS_LEVEL) \
+        as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.replace(path_gz + '.tmp', path_gz)
+    dict_version = {"version": str_version,
+        "date": date_now.strftime("%Y-%m-%d %H:%M:%S"), "hash": hash_curr,
+        "size": os.path.getsize(path_file),
+        "size_gz": os.path.getsize(path_gz), "file": name_gz}
+    list_keep, list_remove = apply_retention(list_version + [dict_version],
+        nb_keep=nb_keep, max_age_days=max_age_days, date_now=date_now)
+    write_json_atomic(list_keep, os.path.join(dir_versions, NAME_INDEX))
+    for dict_remove in list_remove:
+        try:
+            os.remove(os.path.join(dir_versions, dict_remove["file"]))
+        except FileNotFoundError:
+            pass
+    print('File {} saved in version {}'.format(path_file, str_version))
+    return dict_version
+
+def restore_version(path_file, version=None, path_out=None,
+    path_versions=None):
+    '''
+    Restore version of file (last one if version is None)
+    into path_out (path_file if None)
+    return path of file restored
+    '''
+    list_version = list_versions(path_file, path_versions)
+    if version is None:
+        list_select = list_version[-1:]
+    else:
+        list_select = [dict_version for dict_version in list_version \
+            if dict_version["version"] == version]
+    if list_select == []:
+        raise FileNotFoundError(
+            'No version {} of file {}'.format(version, path_file))
+    if path_out is None:
+        path_out = path_file
+    path_gz = os.path.join(get_dir_versions(path_file, path_versions),
+        list_select[0]["file"])
+    with gzip.open(path_gz, 'rb') as f_in, open(path_out + '.tmp', 'wb') \
+        as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.replace(path_out + '.tmp', path_out)
+    return path_out
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+''' Module for instrumentation of pipeline stages
+
+A stage (context manager stage() or decorator @instrumented) records :
+wall time, CPU time, increase of peak RSS and nb of rows in / out.
+Each record is logged in JSON (one line by stage, stdout or file)
+and summed by stage for the Prometheus text endpoint (/metrics)
+of the server : metrics are by process (gunicorn worker).
+
+Disabled by default (settings.INSTRUMENT) : stages do nothing.
+'''
+
+# import built-in
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import contextlib
+try:
+    import resource
+except ImportError: # not on Windows : no RSS measure
+    resource = None
+
+# import project modules
+import settings
+
+# DEFINITIONS
+PREFIX_METRICS = "app_stage"
+# enabled : instrumentation on, path_log : JSON lines file ("" : stdout)
+DICT_CONF = {"enabled": settings.INSTRUMENT,
+    "path_log": settings.INSTRUMENT_LOG}
+# Prometheus metrics : (name, type, help, key of stats)
+LIST_METRICS = [
+    ("calls_total", "counter", "Nb of runs of stage", "nb_calls"),
+    ("errors_total", "counter", "Nb of runs of stage with error",
+        "nb_errors"),
+    ("wall_seconds_total", "counter", "Wall time of stage", "wall_s"),
+    ("cpu_seconds_total", "counter", "CPU time of stage (process)", "cpu_s"),
+    ("wall_seconds_last", "gauge", "Wall time of last run", "wall_s_last"),
+    ("rss_peak_increase_bytes_max", "gauge",
+        "Max increase of peak RSS during stage", "rss_peak_delta_max"),
+    ("rows_in_last", "gauge", "Nb of rows in of last run", "rows_in"),
+    ("rows_out_last", "gauge", "Nb of rows out of last run", "rows_out"),
+]
+DICT_STATS = dict() # stage : stats summed
+LOCK_STATS = threading.Lock()
+LOCK_LOG = threading.Lock()
+LOCAL_STACK = threading.local() # stages running in thread (nesting)
+
+# HELPERS FUNCTIONS
+
+def set_instrument(enabled, path_log=None):
+    '''
+    Enable / disable instrumentation (path_log : JSON lines file)
+    '''
+    DICT_CONF["enabled"] = enabled
+    if path_log is not None:
+        DICT_CONF["path_log"] = path_log
+
+def is_enabled():
+    return DICT_CONF["enabled"]
+
+def reset_stats():
+    with LOCK_STATS:
+        DICT_STATS.clear()
+
+def get_peak_rss():
+    '''
+    Peak RSS of process [bytes] (0 if unknown)
+    '''
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux : kB, macOS : bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def count_rows(obj):
+    '''
+    Nb of rows of DataFrame / array / list / meteo records
+    (tuple : first item), None if unknown
+    '''
+    if isinstance(obj, tuple):
+        return count_rows(obj[0]) if len(obj) else None
+    if hasattr(obj, "shape") and len(obj.shape):
+        return int(obj.shape[0])
+    if isinstance(obj, dict) and "records" in obj:
+        return len(obj["records"])
+    if isinstance(obj, list):
+        return len(obj)
+    return None
+
+def get_stack():
+    if not hasattr(LOCAL_STACK, "list_stages"):
+        LOCAL_STACK.list_stages = []
+    return LOCAL_STACK.list_stages
+
+class StageRecord:
+    '''
+    Stage running : rows in / out can be set by code of stage
+    '''
+    def __init__(self, name, parent=None, rows_in=None):
+        self.name = name
+        self.parent = parent
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def set_rows(self, rows_in=None, rows_out=None):
+        if rows_in is not None:
+            self.rows_in = rows_in
+        if rows_out is not None:
+            self.rows_out = rows_out
+
+class NoRecord:
+    '''
+    Stage not instrumented : nothing recorded
+    '''
+    def set_rows(self, rows_in=None, rows_out=None):
+        pass
+
+NO_RECORD = NoRecord()
+
+def add_stats(dict_rec):
+    '''
+    Add record of stage run into stats by stage
+    '''
+    with LOCK_STATS:
+        stats = DICT_STATS.setdefault(dict_rec["stage"], {"nb_calls": 0,
+            "nb_errors": 0, "wall_s": 0., "cpu_s": 0., "wall_s_last": 0.,
+            "rss_peak_delta_max": 0, "rows_in": None, "rows_out": None})
+        stats["nb_calls"] += 1
+        stats["nb_errors"] += int(dict_rec["error"] is not None)
+        stats["wall_s"] += dict_rec["wall_s"]
+        stats["cpu_s"] += dict_rec["cpu_s"]
+        stats["wall_s_last"] = dict_rec["wall_s"]
+        stats["rss_peak_delta_max"] = max(stats["rss_peak_delta_max"],
+            dict_rec["rss_peak_delta"])
+        for key in ["rows_in", "rows_out"]:
+            if dict_rec[key] is not None:
+                stats[key] = dict_rec[key]
+
+def log_record(dict_rec):
+    '''
+    Log record of stage run in JSON (one line)
+    '''
+    str_log = json.dumps(dict_rec)
+    path_log = DICT_CONF["path_log"]
+    with LOCK_LOG:
+        if path_log:
+            with open(path_log, "a") as f:
+                f.write(str_log + "\n")
+        else:
+            print(str_log, flush=True)
+
+def get_stats():
+    '''
+    Copy of stats by stage
+    '''
+    with LOCK_STATS:
+        return {name: dict(stats) for name, stats in DICT_STATS.items()}
+
+def format_metrics():
+    '''
+    Stats by stage in Prometheus text format
+    '''
+    dict_stats = get_stats()
+    list_lines = []
+    for name, type_metric, str_help, key in LIST_METRICS:
+        name_metric = f"{PREFIX_METRICS}_{name}"
+        list_lines.append(f"# HELP {name_metric} {str_help}")
+        list_lines.append(f"# TYPE {name_metric} {type_metric}")
+        for name_stage in sorted(dict_stats.keys()):
+            val = dict_stats[name_stage][key]
+            if val is None:
+                continue
+            list_lines.append('{}{{stage="{}"}} {}'.format(name_metric,
+                name_stage, val))
+    return "\n".join(list_lines) + "\n"
+
+# INSTRUMENTATION
+
+@contextlib.contextmanager
+def stage(name, rows_in=None):
+    '''
+    Instrument stage name :
+    yield record to set rows in / out (record.set_rows)
+    '''
+    if not DICT_CONF["enabled"]:
+        yield NO_RECORD
+        return
+    list_stages = get_stack()
+    record = StageRecord(name, list_stages[-1] if list_stages else None,
+        rows_in)
+    list_stages.append(name)
+    error = None
+    rss_start = get_peak_rss()
+    cpu_start = time.process_time()
+    time_start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        wall_s = time.perf_counter() - time_start
+        cpu_s = time.process_time() - cpu_start
+        list_stages.pop()
+        dict_rec = {"stage": name, "parent": record.parent,
+            "time": round(time.time(), 3), "pid": os.getpid(),
+            "wall_s": round(wall_s, 6), "cpu_s": round(cpu_s, 6),
+            "rss_peak_delta": get_peak_rss() - rss_start,
+            "rows_in": record.rows_in, "rows_out": record.rows_out,
+            "error": error}
+        add_stats(dict_rec)
+        log_record(dict_rec)
+
+def instrumented(name=None):
+    '''
+    Decorator : function run as stage name (default module.function),
+    rows in from first argument, rows out from result
+    '''
+    def decorator(fun):
+        name_stage = name or "{}.{}".format(fun.__module__.split(".")[-1],
+            fun.__name__)
+        @functools.wraps(fun)
+        def wrapper(*args, **kwargs):
+            if not DICT_CONF["enabled"]:
+                return fun(*args, **kwargs)
+            rows_in = count_rows(args[0]) if args else None
+            with stage(name_stage, rows_in) as record:
+                res = fun(*args, **kwargs)
+                record.set_rows(rows_out=count_rows(res))
+            return res
+        return wrapper
+    return decorator
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+''' Module for manifest of data files (manifest.json next to files)
+
+Each pipeline stage records for the file saved : last date, nb of rows,
+content hash, modification time and timestamps.
+Used to check if data is up to date without reading the CSV files.
+'''
+
+# import built-in
+import os
+import json
+import time
+import datetime
+import tempfile
+try:
+    import fcntl
+except ImportError: # not on Windows
+    fcntl = None
+
+# import third party
+import pandas as pd
+
+# import project modules
+from my_helpers.file_versions import hash_file
+
+# DEFINITIONS
+NAME_MANIFEST = 'manifest.json'
+TIMEOUT_PROBE = 5 # [s] HTTP HEAD on data source
+
+# HELPERS FUNCTIONS
+
+def get_path_manifest(path_file):
+    return os.path.join(os.path.dirname(os.path.abspath(path_file)),
+        NAME_MANIFEST)
+
+def read_manifest(path_manifest):
+    '''
+    Read manifest (empty dict if not found or not valid)
+    '''
+    try:
+        with open(path_manifest) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return dict()
+
+def write_manifest(dict_manifest, path_manifest):
+    '''
+    Write manifest atomically (temporary file then replace)
+    '''
+    fd, path_tmp = tempfile.mkstemp(dir=os.path.dirname(path_manifest),
+        prefix='.manifest_', suffix='.tmp')
+    with os.fdopen(fd, 'w') as outfile:
+        json.dump(dict_manifest, outfile, indent=1)
+    os.replace(path_tmp, path_manifest)
+
+def record_stage(path_file, stage, df=None, dict_extra=None):
+    '''
+    Record file saved by stage in manifest :
+    last date & nb of rows (of df if given), hash, mtime, timestamp
+    '''
+    path_manifest = get_path_manifest(path_file)
+    dict_file = {"stage": stage,
+        "time_end": time.time(),
+        "date_end": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "mtime": os.path.getmtime(path_file),
+        "hash": hash_file(path_file)}
+    if df is not None:
+        dict_file["nb_rows"] = int(df.shape[0])
+        if "date" in df.columns:
+            dict_file["last_date"] = str(df["date"].max())
+    if dict_extra is not None:
+        dict_file.update(dict_extra)
+    # lock : stages can run in parallel
+    with open(path_manifest + '.lock', 'w') as f_lock:
+        if fcntl is not None:
+            fcntl.flock(f_lock, fcntl.LOCK_EX)
+        dict_manifest = read_manifest(path_manifest)
+        dict_manifest[os.path.basename(path_file)] = dict_file
+        write_manifest(dict_manifest, path_manifest)
+    return dict_file
+
+def get_file_info(path_file, dict_manifest=None):
+    '''
+    Info of file in manifest (None if not found or file modified since)
+    '''
+    if dict_manifest is None:
+        dict_manifest = read_manifest(get_path_manifest(path_file))
+    dict_file = dict_manifest.get(os.path.basename(path_file))
+    if (dict_file is None) or (not os.path.isfile(path_file)):
+        return None
+    if dict_file.get("mtime") != os.path.getmtime(path_file):
+        # modified by another process (ex: Spark job)
+        return None
+    return dict_file
+
+def get_last_date(path_file, dict_manifest=None):
+    '''
+    Last date of file : from manifest,
+    else from CSV (only column date) if not in manifest
+    (None if file not found)
+    '''
+    dict_file = get_file_info(path_file, dict_manifest)
+    if (dict_file is not None) and ("last_date" in dict_file):
+        return dict_file["last_date"]
+    if not os.path.isfile(path_file):
+        return None
+    return str(pd.read_csv(path_file, usecols=["date"])["date"].max())
+
+def head_url(url):
+    '''
+    HTTP HEAD on url : return headers (dict)
+    '''
+    import requests
+    res = requests.head(url, allow_redirects=True, timeout=TIMEOUT_PROBE)
+    res.raise_for_status()
+    return dict(res.headers)
+
+def get_source_tag(dict_headers):
+    '''
+    Tag of source version from HTTP headers : ETag or Last-Modified
+    '''
+    dict_headers = {key.lower(): val for key, val in dict_headers.items()}
+    return dict_headers.get("etag", dict_headers.get("last-modified"))
+
+def probe_source_changed(url, tag_last, fun_head=None):
+    '''
+    Check with HTTP HEAD if source at url changed since tag_last
+    (True if unknown)
+    fun_head(url) returns headers (default : head_url)
+    '''
+    if fun_head is None:
+        fun_head = head_url
+    if tag_last is None:
+        return True
+    try:
+        tag_curr = get_source_tag(fun_head(url))
+    except Exception as e:
+        print(f"Probe {url} failed : {type(e).__name__}")
+        return True
+    return (tag_curr is None) or (tag_curr != tag_last)
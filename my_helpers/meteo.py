@@ -14,6 +14,12 @@ import urllib.request
 import settings
 from my_helpers.dates import days_between
 from my_helpers.utils import clean_file
+from my_helpers.manifest import record_stage
+from my_helpers.instrument import instrumented
+from my_helpers.meteo_engine import records_to_df, aggregate_data_meteo
+from my_helpers.meteo_engine import choose_meteo_engine, ENGINE_PANDAS
+from my_helpers.meteo_engine import COL_JSON_MD5
+from my_helpers.file_versions import hash_file
 
 # DEFINITIONS
 PATH_TO_SAVE_DATA = settings.PATH_TO_SAVE_DATA
@@ -24,6 +30,9 @@ PATH_JSON_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA,
     'data_meteo_temp_fr.json')
 PATH_JSON_METEO_TEMP_FR_OLD = os.path.join(PATH_TO_SAVE_DATA, 
     'data_meteo_temp_fr_old.json')
+# new records flattened (numer_sta, date, t, u) for Spark jobs
+PATH_PARQUET_METEO_TEMP_FR = os.path.join(PATH_TO_SAVE_DATA, 
+    'data_meteo_temp_fr.parquet')
 PATH_DF_METEO_FR = os.path.join(PATH_TO_SAVE_DATA, 'df_meteo_fr.csv')
 PATH_DF_METEO_FR_OLD = os.path.join(PATH_TO_SAVE_DATA, 'df_meteo_fr_old.csv')
 PATH_METEO_SPARK = os.path.join(PATH_TO_SAVE_DATA, 'meteo_spark_emr.py') 
@@ -48,6 +57,7 @@ def get_data_meteo_by_date(str_date):
     # parse json object
     return json.loads(data)
 
+@instrumented()
 def get_data_meteo_by_list(list_date):
     '''
     Retrieve data meteo for a list of dates
@@ -145,6 +155,7 @@ def calculate_mean_field(list_field, fun):
 
     return np.mean(list_by_sta)
 
+@instrumented()
 def calc_list_mean_field(data_meteo, fieldname, fun):
     list_date = get_data_meteo_date_list(data_meteo)
     list_mean = []
@@ -155,6 +166,28 @@ def calc_list_mean_field(data_meteo, fieldname, fun):
         list_mean.append(calculate_mean_field(list_field, fun))
     return list_mean
 
+def save_data_meteo_parquet(data_meteo, 
+    path_parquet_meteo=PATH_PARQUET_METEO_TEMP_FR,
+    path_json_meteo=PATH_JSON_METEO_TEMP_FR):
+    '''
+    Save records of data meteo flattened in Parquet (columnar) format
+    for Spark jobs (no schema inference, no explode)
+    Records are marked with MD5 of JSON file already saved (path_json_meteo) :
+    Spark jobs read JSON if Parquet not found or from another JSON (stale).
+    Old file is always removed (and removed from S3 by upload if not saved).
+    '''
+    if os.path.isfile(path_parquet_meteo):
+        os.remove(path_parquet_meteo)
+    try:
+        df_rec = records_to_df(data_meteo)
+        df_rec[COL_JSON_MD5] = hash_file(path_json_meteo)
+        df_rec.to_parquet(path_parquet_meteo, index=False)
+        return True
+    except ImportError:
+        print("No Parquet engine (pyarrow) : only JSON saved")
+        return False
+
+@instrumented()
 def update_data_meteo(list_str_dates, path_json_meteo_fr=PATH_JSON_METEO_FR):
     '''Update with missing data from meteo france'''
     # meteo
@@ -221,8 +254,10 @@ def update_data_meteo(list_str_dates, path_json_meteo_fr=PATH_JSON_METEO_FR):
 
     return data_meteo
 
+@instrumented()
 def update_data_meteo_light(list_str_dates, path_df_meteo_fr=PATH_DF_METEO_FR,
-    path_json_meteo_temp_fr=PATH_JSON_METEO_TEMP_FR):
+    path_json_meteo_temp_fr=PATH_JSON_METEO_TEMP_FR, 
+    path_parquet_meteo_temp_fr=PATH_PARQUET_METEO_TEMP_FR):
     '''
     Update with missing data from meteo france
     using df_meteo_fr instead of big meteo data in JSON format
@@ -281,6 +316,9 @@ def update_data_meteo_light(list_str_dates, path_df_meteo_fr=PATH_DF_METEO_FR,
         # save
         with open(path_json_meteo_temp_fr, 'w') as outfile:
             json.dump(data_meteo_new, outfile)
+        save_data_meteo_parquet(data_meteo_new, 
+            path_parquet_meteo=path_parquet_meteo_temp_fr,
+            path_json_meteo=path_json_meteo_temp_fr)
     else:
         data_meteo_new = None
         print("No new data meteo")
@@ -312,10 +350,12 @@ def precompute_data_meteo(data_meteo): # NOT USED ANYMORE
 
     return df_meteo_fr
 
+@instrumented()
 def precompute_data_meteo_light(data_meteo=None, 
-    path_df_meteo_fr=PATH_DF_METEO_FR):
+    path_df_meteo_fr=PATH_DF_METEO_FR, engine=ENGINE_PANDAS):
     '''pre-compute data meteo
     using only new data 
+    engine : "pandas", "spark" or None (chosen by number of records)
     '''
 
     if data_meteo is None:
@@ -324,22 +364,7 @@ def precompute_data_meteo_light(data_meteo=None,
         df_meteo_fr.index = df_meteo_fr["date"]
         return df_meteo_fr
     
-    list_t_min = calc_list_mean_field(data_meteo, "t", min)
-    list_t_max = calc_list_mean_field(data_meteo, "t", max)
-    list_u_min = calc_list_mean_field(data_meteo, "u", min)
-    list_u_max = calc_list_mean_field(data_meteo, "u", max)
-
-    dict_meteo = dict()
-    dict_meteo["date"] = get_data_meteo_date_list(data_meteo)
-    dict_meteo["t_min"] = list_t_min
-    dict_meteo["t_max"] = list_t_max
-    dict_meteo["u_min"] = list_u_min
-    dict_meteo["u_max"] = list_u_max
-
-    df_meteo_fr_new = pd.DataFrame(data=dict_meteo)
-    df_meteo_fr_new.columns = ["date", "T_min", "T_max", "H_min", "H_max"]
-    df_meteo_fr_new.sort_values(by="date", inplace=True)
-    df_meteo_fr_new.index = df_meteo_fr_new["date"]
+    df_meteo_fr_new = aggregate_data_meteo(data_meteo, engine=engine)
 
     if os.path.isfile(path_df_meteo_fr):
         # load old data 
@@ -371,10 +396,42 @@ def precompute_data_meteo_light(data_meteo=None,
     # save df_meteo
     clean_file(path_df_meteo_fr, flag_copy=True)
     df_meteo_fr.to_csv(path_df_meteo_fr, index=False) 
+    record_stage(path_df_meteo_fr, "precompute_data_meteo", df_meteo_fr)
 
     return df_meteo_fr
 
+def load_data_meteo_temp(path_json_meteo_temp_fr=PATH_JSON_METEO_TEMP_FR):
+    '''
+    Load new data meteo downloaded (None if not found)
+    '''
+    if not os.path.isfile(path_json_meteo_temp_fr):
+        return None
+    with open(path_json_meteo_temp_fr) as f:
+        return json.load(f)
+
+def choose_meteo_engine_disk(
+    path_json_meteo_temp_fr=PATH_JSON_METEO_TEMP_FR):
+    '''
+    Choose engine by number of new records downloaded on disk
+    '''
+    data_meteo = load_data_meteo_temp(path_json_meteo_temp_fr)
+    if data_meteo is None:
+        return ENGINE_PANDAS
+    return choose_meteo_engine(len(data_meteo["records"]))
+
+def precompute_data_meteo_disk(engine=None, 
+    path_json_meteo_temp_fr=PATH_JSON_METEO_TEMP_FR, 
+    path_df_meteo_fr=PATH_DF_METEO_FR):
+    '''
+    Pre-compute new data meteo downloaded on disk for Airflow DAG
+    (engine chosen by number of records if None)
+    '''
+    data_meteo = load_data_meteo_temp(path_json_meteo_temp_fr)
+    return precompute_data_meteo_light(data_meteo, 
+        path_df_meteo_fr=path_df_meteo_fr, engine=engine)
+
 # extrapolation meteo
+@instrumented()
 def extrapolate_df_meteo(df_meteo_fr_in, list_dates, 
         path_df_meteo_fr=PATH_DF_METEO_FR):
     '''
@@ -401,5 +458,6 @@ def extrapolate_df_meteo(df_meteo_fr_in, list_dates,
     df_meteo_fr.index = df_meteo_fr["date"]
     # save df_meteo
     df_meteo_fr.to_csv(path_df_meteo_fr, index=False) 
+    record_stage(path_df_meteo_fr, "extrapolate_meteo", df_meteo_fr)
 
     return df_meteo_fr
\ No newline at end of file
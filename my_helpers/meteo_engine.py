@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+''' Engines to aggregate Meteo France records (synop) :
+daily means over stations of min/max temperature and humidity by station
+
+- "pandas" : vectorized pandas / numpy (in process, for few days of data)
+- "spark" : local Spark session (same job as meteo_spark.py)
+
+Same input (records) and output (new df_meteo_fr rows) for all engines.
+'''
+
+# import built-in
+
+# import third party
+import pandas as pd
+
+# import project modules
+import settings
+
+# DEFINITIONS
+LIST_FIELD_METEO = ["numer_sta", "date", "t", "u"]
+# column of Parquet records : MD5 of JSON file they come from
+COL_JSON_MD5 = "json_md5"
+LIST_COL_METEO = ["date", "T_min", "T_max", "H_min", "H_max"]
+ENGINE_PANDAS = "pandas"
+ENGINE_SPARK = "spark"
+# Spark engine only if more records than this
+NB_RECORDS_SPARK = settings.METEO_NB_RECORDS_SPARK
+
+def records_to_df(data_meteo):
+    '''
+    Flatten records of data meteo into DataFrame (numer_sta, date, t, u)
+    date is the day (YYYY-MM-DD), missing t or u are NaN
+    '''
+    list_rec = [[rec_curr['fields'].get(field_name) \
+        for field_name in LIST_FIELD_METEO] \
+        for rec_curr in data_meteo["records"]]
+    df_rec = pd.DataFrame(list_rec, columns=LIST_FIELD_METEO)
+    df_rec["numer_sta"] = df_rec["numer_sta"].astype(str)
+    df_rec["date"] = df_rec["date"].str[0:10]
+    df_rec[["t", "u"]] = df_rec[["t", "u"]].astype(float)
+    return df_rec
+
+def aggregate_meteo_pandas(df_rec):
+    '''
+    Aggregate records DataFrame (numer_sta, date, t, u) with pandas :
+    min/max by station-day then mean by day (NaN ignored)
+    return df_meteo_fr new rows (date, T_min, T_max, H_min, H_max)
+    sorted by date (index = date)
+    '''
+    df_sta = df_rec.groupby(["date", "numer_sta"], sort=False).agg(
+        T_min=("t", "min"), T_max=("t", "max"),
+        H_min=("u", "min"), H_max=("u", "max"))
+    df_meteo_fr_new = df_sta.groupby(level="date").mean().reset_index()
+    df_meteo_fr_new = df_meteo_fr_new[LIST_COL_METEO]
+    df_meteo_fr_new.index = df_meteo_fr_new["date"]
+    return df_meteo_fr_new
+
+def aggregate_meteo_spark(df_rec):
+    '''
+    Aggregate records DataFrame (numer_sta, date, t, u)
+    with a local Spark session (needs pyspark & java)
+    '''
+    from pyspark.sql import SparkSession
+    from my_helpers.spark_meteo import aggregate_meteo_to_pandas
+    from my_helpers.spark_meteo import SCHEMA_METEO_FIELDS
+    spark = SparkSession.builder.master("local[*]") \
+        .config("spark.driver.host", "127.0.0.1") \
+        .appName("meteo_engine").getOrCreate()
+    # NaN -> null : ignored by Spark min / max as by pandas
+    list_rec = df_rec.astype(object).where(df_rec.notna(), None) \
+        .values.tolist()
+    return aggregate_meteo_to_pandas(spark.createDataFrame(list_rec, 
+        schema=SCHEMA_METEO_FIELDS))
+
+DICT_ENGINE = {ENGINE_PANDAS: aggregate_meteo_pandas,
+    ENGINE_SPARK: aggregate_meteo_spark}
+
+def choose_meteo_engine(nb_records, nb_records_spark=NB_RECORDS_SPARK):
+    '''
+    Choose engine by number of records : Spark only for big updates
+    '''
+    if nb_records >= nb_records_spark:
+        return ENGINE_SPARK
+    return ENGINE_PANDAS
+
+def aggregate_data_meteo(data_meteo, engine=None):
+    '''
+    Aggregate records of data meteo (JSON from API) with engine
+    (chosen by number of records if None)
+    return df_meteo_fr new rows (date, T_min, T_max, H_min, H_max)
+    '''
+    if engine is None:
+        engine = choose_meteo_engine(len(data_meteo["records"]))
+    print(f'meteo : {len(data_meteo["records"])} records / engine: {engine}')
+    return DICT_ENGINE[engine](records_to_df(data_meteo))
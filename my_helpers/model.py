@@ -11,13 +11,11 @@ import math
 import numpy as np
 import pandas as pd
 import json
-import requests
-if settings.PREDICT:
-    if not settings.MODEL_TFLITE:
-        import tensorflow as tf
+# requests & tensorflow : lazy imports (slow) only when prediction is needed
 
 # import project modules
 from my_helpers.dates import add_days, generate_list_dates
+from my_helpers.instrument import instrumented
 
 # DEFINITIONS 
 
@@ -65,6 +63,7 @@ def multivariate_data(dataset, target, start_index, end_index, history_size,
     return np.array(data), np.array(labels)
 
 # FOR AWS Lambda predict
+@instrumented()
 def prepare_to_lambda(dataset):
     '''
     Prepare data input model to be used by lambda: 
@@ -96,6 +95,7 @@ def retrieve_from_lambda(response):
     To retrieve prediction from AWS Lambda
     '''
 
+    import requests
     if type(response)  == requests.models.Response:
         list_list_out = response.json()
     else: # for local test
@@ -112,6 +112,7 @@ def retrieve_from_lambda(response):
             y_multi_pred_out = np.array(list_x_multi)
     return y_multi_pred_out   
 
+@instrumented()
 def prepare_dataset(df_feat_fr):
     '''
     Prepare final data input model
@@ -130,6 +131,7 @@ def prepare_dataset(df_feat_fr):
 
 # Prediction
 
+@instrumented()
 def update_pred_pos(df_feat_fr, from_disk=False):
     '''
     Update prediction data positive cases France
@@ -152,6 +154,7 @@ def update_pred_pos(df_feat_fr, from_disk=False):
     dataset, data_std, data_mean = prepare_dataset(df_feat_fr)
     # predict next days
     if settings.MODEL_TFLITE:
+        import requests
         json_list_list_x = prepare_to_lambda_future(dataset)
         resp = requests.post(URL_PREDICT, json=json_list_list_x)
         print("status code : ", resp.status_code) 
@@ -166,6 +169,7 @@ def update_pred_pos(df_feat_fr, from_disk=False):
         # prepare data : very last days
         x_multi = np.array([dataset[-PAST_HISTORY:,:]]) 
         # load model
+        import tensorflow as tf
         multi_step_model = tf.keras.models.load_model(PATH_MDL_MULTI_STEP)
         y_multi_pred = multi_step_model.predict(x_multi)
 
@@ -190,6 +194,7 @@ def update_pred_pos(df_feat_fr, from_disk=False):
 
     return df_plot_pred
 
+@instrumented()
 def update_pred_pos_all(df_feat_fr, from_disk=False):
     '''
     Update prediction data positive cases France for all days
@@ -210,6 +215,7 @@ def update_pred_pos_all(df_feat_fr, from_disk=False):
 
     # predict
     if settings.MODEL_TFLITE:
+        import requests
         json_list_list_x = prepare_to_lambda(dataset)
         resp = requests.post(URL_PREDICT, json=json_list_list_x)
         print("status code : ", resp.status_code) 
@@ -223,6 +229,7 @@ def update_pred_pos_all(df_feat_fr, from_disk=False):
     else:
 
         # load model
+        import tensorflow as tf
         multi_step_model = tf.keras.models.load_model(PATH_MDL_MULTI_STEP)
 
         list_x = []
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+''' Module for data refresh in background
+
+Only one refresh runs at a time (single-flight) : other requests to start
+are ignored while running. Status & progress can be polled.
+With path_status, the status is shared by all processes (server workers)
+in a JSON file, and a file lock allows only one refresh for all of them.
+Runners are reset in forked processes (ex: workers of preloaded server) :
+locks and job of parent are not inherited.
+'''
+
+# import built-in
+import os
+import json
+import time
+import threading
+import traceback
+import weakref
+try:
+    import fcntl
+except ImportError: # not on Windows
+    fcntl = None
+
+# import project modules
+import settings
+from my_helpers.file_versions import write_json_atomic
+
+# DEFINITIONS
+PATH_REFRESH_STATUS = os.path.join(settings.PATH_TO_SAVE_DATA,
+    'refresh_status.json')
+STATE_IDLE = "idle"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_ERROR = "error"
+PERIOD_WAIT = 0.5 # [s] wait for job in another process
+SET_RUNNERS = weakref.WeakSet() # runners of process (reset after fork)
+
+def lock_file(path_lock):
+    '''
+    Lock file without waiting : return opened file if locked, else None
+    (release by closing file)
+    '''
+    file_lock = open(path_lock, 'w')
+    try:
+        fcntl.flock(file_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        file_lock.close()
+        return None
+    return file_lock
+
+class RefreshRunner:
+    '''
+    Run refresh job fun_job(fun_progress) in a background thread
+    '''
+    def __init__(self, path_status=None):
+        self.lock = threading.Lock() # held while job is running
+        self.lock_status = threading.Lock()
+        self.thread = None
+        self.path_status = path_status # shared with other processes
+        self.file_lock = None # held while job is running (all processes)
+        self.dict_status = {"state": STATE_IDLE, "step": "", "progress": 0,
+            "time_start": None, "time_end": None, "error": None, "nb_run": 0}
+        SET_RUNNERS.add(self)
+
+    def reset_after_fork(self):
+        '''
+        In forked process : new locks, no job (thread of parent not copied).
+        File lock copy closed : still held by parent until end of its job
+        '''
+        self.lock = threading.Lock()
+        self.lock_status = threading.Lock()
+        self.thread = None
+        if self.file_lock is not None:
+            self.file_lock.close()
+            self.file_lock = None
+
+    def acquire_file_lock(self):
+        '''
+        Lock file shared by processes (True if locked, or no shared status)
+        '''
+        if (self.path_status is None) or (fcntl is None):
+            return True
+        self.file_lock = lock_file(self.path_status + '.lock')
+        return self.file_lock is not None
+
+    def release_file_lock(self):
+        if self.file_lock is not None:
+            self.file_lock.close()
+            self.file_lock = None
+
+    def is_running_other(self):
+        '''
+        Job running in another process
+        '''
+        if self.lock.locked() or (self.path_status is None) or \
+            (fcntl is None) or (not os.path.isfile(self.path_status + '.lock')):
+            return False
+        file_lock = lock_file(self.path_status + '.lock')
+        if file_lock is None:
+            return True
+        file_lock.close()
+        return False
+
+    def is_running(self):
+        return self.lock.locked() or self.is_running_other()
+
+    def get_status(self):
+        '''
+        Copy of status : state, step, progress (0-1), times, error, nb_run
+        (from shared file if job in another process)
+        '''
+        if (self.path_status is not None) and (not self.lock.locked()) and \
+            os.path.isfile(self.path_status):
+            try:
+                with open(self.path_status) as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        with self.lock_status:
+            return dict(self.dict_status)
+
+    def update_status(self, **kwargs):
+        with self.lock_status:
+            self.dict_status.update(kwargs)
+            if self.path_status is not None:
+                write_json_atomic(self.dict_status, self.path_status)
+
+    def set_progress(self, step, progress):
+        print("refresh : {} ({:.0f}%)".format(step, 100 * progress))
+        self.update_status(step=step, progress=progress)
+
+    def start(self, fun_job):
+        '''
+        Start job in background if no job running
+        return True if started
+        '''
+        if not self.lock.acquire(blocking=False):
+            return False
+        if not self.acquire_file_lock():
+            self.lock.release()
+            return False
+        self.update_status(state=STATE_RUNNING, step="", progress=0,
+            time_start=time.time(), time_end=None, error=None)
+        self.thread = threading.Thread(target=self.run, args=(fun_job,),
+            daemon=True)
+        self.thread.start()
+        return True
+
+    def run(self, fun_job):
+        try:
+            fun_job(self.set_progress)
+            self.update_status(state=STATE_DONE, step="", progress=1)
+        except Exception as e:
+            traceback.print_exc()
+            self.update_status(state=STATE_ERROR, error=repr(e))
+        finally:
+            with self.lock_status:
+                nb_run = self.dict_status["nb_run"] + 1
+            self.update_status(time_end=time.time(), nb_run=nb_run)
+            self.release_file_lock()
+            self.lock.release()
+
+    def wait(self, timeout=None):
+        '''
+        Wait for end of current job (also in another process)
+        '''
+        time_start = time.time()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        while self.is_running_other() and ((timeout is None) or \
+            (time.time() - time_start < timeout)):
+            time.sleep(PERIOD_WAIT)
+
+def reset_runners_after_fork():
+    for runner in list(SET_RUNNERS):
+        runner.reset_after_fork()
+
+if hasattr(os, "register_at_fork"): # not on Windows
+    os.register_at_fork(after_in_child=reset_runners_after_fork)
+
+# refresh runner shared in process (status shared with other workers)
+refresh_runner = RefreshRunner(PATH_REFRESH_STATUS)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+''' Spark helpers to treat Meteo France data (synop records)
+
+Used by meteo_spark.py (local Spark).
+meteo_spark_emr.py has its own copy because it is run alone on AWS EMR.
+'''
+
+# import built-in
+import os
+import time
+import contextlib
+
+# import third-party
+import pyspark.sql.functions as fun_sql
+from pyspark.sql.types import StructType, StructField, ArrayType
+from pyspark.sql.types import StringType, DoubleType
+
+# import project modules
+from my_helpers.meteo_engine import LIST_COL_METEO, LIST_FIELD_METEO
+from my_helpers.meteo_engine import COL_JSON_MD5
+from my_helpers.file_versions import hash_file
+
+# DEFINITIONS
+# only fields used (numer_sta, date, t, u) : no schema inference
+SCHEMA_METEO_FIELDS = StructType([
+    StructField("numer_sta", StringType()),
+    StructField("date", StringType()),
+    StructField("t", DoubleType()),
+    StructField("u", DoubleType())])
+# Parquet records : fields & MD5 of JSON file they come from
+SCHEMA_METEO_PARQUET = StructType(SCHEMA_METEO_FIELDS.fields + \
+    [StructField(COL_JSON_MD5, StringType())])
+# JSON from opendatasoft API : {"records": [{"fields": {...}}, ...]}
+SCHEMA_METEO_JSON = StructType([
+    StructField("records", ArrayType(StructType([
+        StructField("fields", SCHEMA_METEO_FIELDS)])))])
+
+@contextlib.contextmanager
+def timed_stage(dict_timings, stage_name):
+    '''
+    Measure wall time of a stage into dict_timings[stage_name] (s)
+    '''
+    time_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        dict_timings[stage_name] = time.perf_counter() - time_start
+
+def print_timings(dict_timings):
+    print("meteo spark : stage timings [s]: " + \
+        " / ".join(["{}: {:.2f}".format(stage_name, time_stage) \
+        for stage_name, time_stage in dict_timings.items()]))
+
+def read_meteo_json(sql_context, path_json_meteo):
+    '''
+    Read meteo records from JSON (opendatasoft API) with explicit schema
+    return spark DataFrame (numer_sta, date, t, u) (date : YYYY-MM-DD)
+    '''
+    return sql_context.read.schema(SCHEMA_METEO_JSON).json(path_json_meteo) \
+        .select(fun_sql.explode("records.fields").alias("rec")) \
+        .select("rec.numer_sta", 
+            fun_sql.substring("rec.date", 1, 10).alias("date"), 
+            "rec.t", "rec.u")
+
+def read_meteo(sql_context, path_parquet_meteo, path_json_meteo):
+    '''
+    Read meteo records (numer_sta, date, t, u) :
+    from Parquet file written by downloader (already flat) if found
+    and made from same JSON file (MD5 marker), else from JSON
+    '''
+    try:
+        df_meteo = sql_context.read.schema(SCHEMA_METEO_PARQUET) \
+            .parquet(path_parquet_meteo)
+    except Exception as e:
+        print(f"meteo spark : no Parquet data ({type(e).__name__}), read JSON")
+        return read_meteo_json(sql_context, path_json_meteo)
+    row_first = df_meteo.select(COL_JSON_MD5).first()
+    if (row_first is None) or (not os.path.isfile(path_json_meteo)) or \
+        (row_first[0] != hash_file(path_json_meteo)):
+        print("meteo spark : Parquet data not from JSON (stale), read JSON")
+        return read_meteo_json(sql_context, path_json_meteo)
+    return df_meteo.select(LIST_FIELD_METEO)
+
+def aggregate_meteo(df_meteo):
+    '''
+    Aggregate meteo records (date, numer_sta, t, u) into daily means
+    over stations of min/max temperature and humidity by station.
+
+    Only one shuffle : data is partitioned by date once,
+    then station-day and day aggregations are done in place (no join).
+    return spark DataFrame (date, T_min, T_max, H_min, H_max)
+    (not sorted : sort after collect)
+    '''
+    df_sta = df_meteo.repartition("date").groupBy("date", "numer_sta").agg(
+        fun_sql.min("t").alias("T_min"),
+        fun_sql.max("t").alias("T_max"),
+        fun_sql.min("u").alias("H_min"),
+        fun_sql.max("u").alias("H_max"))
+    return df_sta.groupBy("date").agg(
+        fun_sql.mean("T_min").alias("T_min"),
+        fun_sql.mean("T_max").alias("T_max"),
+        fun_sql.mean("H_min").alias("H_min"),
+        fun_sql.mean("H_max").alias("H_max"))
+
+def aggregate_meteo_to_pandas(df_meteo):
+    '''
+    Aggregate meteo records and collect in pandas DataFrame sorted by date
+    (index = date)
+    '''
+    df_meteo_fr_new = aggregate_meteo(df_meteo).toPandas()
+    df_meteo_fr_new = df_meteo_fr_new[LIST_COL_METEO]
+    df_meteo_fr_new.sort_values(by="date", inplace=True)
+    df_meteo_fr_new.index = df_meteo_fr_new["date"]
+    return df_meteo_fr_new
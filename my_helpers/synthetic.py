@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+''' Module for synthetic data (offline tests & benchmarks)
+
+Same formats as data downloaded :
+- SPF raw data : dep, jour, cl_age90, t, p (CSV with ";" as published)
+- synop meteo : opendatasoft records (JSON) or columnar DataFrame
+for any nb of days, departements and stations,
+with gaps (missing rows / records / days) and revisions (next releases).
+'''
+
+# import third party
+import numpy as np
+import pandas as pd
+
+# import project modules
+from my_helpers.dates import add_days
+from my_helpers.data_maps import get_dep_registry
+from my_helpers.meteo_engine import records_to_df, aggregate_meteo_pandas
+
+# DEFINITIONS
+DATE_START = "2020-05-13"
+LIST_CL_AGE90 = [9, 19, 29, 39, 49, 59, 69, 79, 89, 90]
+CL_AGE90_ALL = 0 # all ages (sum of classes) : removed when cleaned
+LIST_COL_GOUV = ["dep", "jour", "cl_age90", "t", "p"]
+NB_REC_STA_DAY = 8 # synop every 3 hours
+NUM_STA_START = 7005 # first synop station number
+LIST_FIELD_SYNOP = ["t", "u"] # fields which can be missing in records
+
+# HELPERS FUNCTIONS
+
+def create_list_dates(nb_days, date_start=DATE_START):
+    return pd.date_range(date_start, periods=nb_days) \
+        .strftime("%Y-%m-%d").tolist()
+
+def get_list_dep(nb_dep=None):
+    '''
+    Codes of nb_dep departements of map (all if None, max 101)
+    '''
+    list_dep = sorted(get_dep_registry()["code_name"].keys())
+    return list_dep if nb_dep is None else list_dep[:nb_dep]
+
+def calc_rate_pos(arr_day):
+    '''
+    Rate of positive tests by day index : 2 epidemic waves
+    '''
+    return 0.01 + 0.12 * np.exp(-((arr_day - 150) / 35) ** 2) + \
+        0.06 * np.exp(-((arr_day - 400) / 60) ** 2)
+
+def drop_gaps(df, ratio_gap, list_days_gap, col_date, rng):
+    '''
+    Remove rows at random (ratio_gap) and all rows of days
+    (list_days_gap : index of days from first date)
+    '''
+    list_dates = sorted(df[col_date].unique())
+    list_dates_gap = [list_dates[i_day] for i_day in (list_days_gap or []) \
+        if i_day < len(list_dates)]
+    b_keep = ~df[col_date].isin(list_dates_gap) & \
+        (rng.rand(df.shape[0]) >= ratio_gap)
+    return df[b_keep].reset_index(drop=True)
+
+# SPF DATA
+
+def create_data_gouv(nb_days, nb_dep=None, date_start=DATE_START, seed=0,
+        ratio_gap=0., list_days_gap=None, flag_clean=True):
+    '''
+    SPF raw data (dep, jour, cl_age90, t, p) for nb_days from date_start
+    and nb_dep departements (all if None)
+
+    - ratio_gap : ratio of rows (dep, jour, cl_age90) missing
+    - list_days_gap : index of days missing (no row)
+    - flag_clean : rows for all ages (cl_age90 = 0) removed
+    as done after download (get_data_gouv_fr)
+    '''
+    rng = np.random.RandomState(seed)
+    list_dep = get_list_dep(nb_dep)
+    nb_cl = len(LIST_CL_AGE90)
+    nb_rows = nb_days * len(list_dep) * nb_cl
+    day_start = (pd.Timestamp(date_start) - pd.Timestamp(DATE_START)).days
+    arr_day = np.tile(np.repeat(np.arange(nb_days), nb_cl), len(list_dep))
+    # less tests on sundays
+    arr_weekday = (pd.Timestamp(date_start).dayofweek + arr_day) % 7
+    arr_t = rng.poisson(np.where(arr_weekday == 6, 60, 250), nb_rows)
+    df_gouv_fr_raw = pd.DataFrame({
+        "dep": np.repeat(list_dep, nb_days * nb_cl),
+        "jour": np.array(create_list_dates(nb_days, date_start))[arr_day],
+        "cl_age90": np.tile(LIST_CL_AGE90, nb_days * len(list_dep)),
+        "t": arr_t,
+        "p": rng.binomial(arr_t, calc_rate_pos(day_start + arr_day))})
+    if not flag_clean:
+        df_gouv_fr_raw = create_all_ages(df_gouv_fr_raw)
+    return drop_gaps(df_gouv_fr_raw, ratio_gap, list_days_gap, "jour", rng)
+
+def revise_data_gouv(df_gouv_fr_raw, nb_days_new=1, nb_days_revised=3,
+        seed=1):
+    '''
+    Next release of SPF raw data : nb_days_new days added and
+    last nb_days_revised days revised (late results : more tests & cases)
+    '''
+    rng = np.random.RandomState(seed)
+    df_revised = df_gouv_fr_raw.copy()
+    list_dates = sorted(df_revised["jour"].unique())
+    b_revised = df_revised["jour"].isin(list_dates[-nb_days_revised:]) & \
+        (df_revised["cl_age90"] != CL_AGE90_ALL)
+    arr_t_late = rng.poisson(10, b_revised.sum())
+    df_revised.loc[b_revised, "t"] += arr_t_late
+    df_revised.loc[b_revised, "p"] += rng.binomial(arr_t_late, 0.05)
+    if CL_AGE90_ALL in df_revised["cl_age90"].values:
+        df_revised = create_all_ages(df_revised)
+    if nb_days_new > 0:
+        df_new = create_data_gouv(nb_days_new,
+            len(df_revised["dep"].unique()),
+            date_start=add_days(list_dates[-1], 1), seed=seed,
+            flag_clean=CL_AGE90_ALL not in df_revised["cl_age90"].values)
+        df_revised = pd.concat([df_revised, df_new], ignore_index=True)
+    return df_revised
+
+def create_all_ages(df_gouv_fr_raw):
+    '''
+    Rows for all ages (cl_age90 = 0) computed again from classes
+    '''
+    df_cl = df_gouv_fr_raw[df_gouv_fr_raw["cl_age90"] != CL_AGE90_ALL]
+    df_all = df_cl.groupby(["dep", "jour"], as_index=False)[["t", "p"]].sum()
+    df_all["cl_age90"] = CL_AGE90_ALL
+    return pd.concat([df_cl, df_all[LIST_COL_GOUV]]) \
+        .sort_values(["dep", "jour", "cl_age90"], kind="mergesort") \
+        .reset_index(drop=True)
+
+def to_csv_gouv(df_gouv_fr_raw, path_file=None):
+    '''
+    SPF raw data as published (CSV with ";") :
+    saved in path_file or returned (str) if None
+    '''
+    return df_gouv_fr_raw.to_csv(path_file, sep=";", index=False)
+
+# SYNOP METEO DATA
+
+def create_records_meteo(nb_days, nb_sta, date_start=DATE_START, seed=0,
+        ratio_gap=0., list_days_gap=None, ratio_field_gap=0.):
+    '''
+    Synop records in columnar format (numer_sta, date, t, u)
+    for nb_days from date_start and nb_sta stations (every 3 hours)
+    date : ISO date time, t : temperature [K], u : humidity [%]
+
+    - ratio_gap : ratio of records missing
+    - list_days_gap : index of days missing (no record)
+    - ratio_field_gap : ratio of fields t or u missing (NaN)
+    '''
+    rng = np.random.RandomState(seed)
+    nb_rec_day = nb_sta * NB_REC_STA_DAY
+    nb_rec = nb_days * nb_rec_day
+    arr_time = pd.date_range(date_start, periods=nb_days * NB_REC_STA_DAY,
+        freq="3H")
+    arr_hour = np.repeat(arr_time.hour.values, nb_sta)
+    arr_doy = np.repeat(arr_time.dayofyear.values, nb_sta)
+    arr_sta = np.tile(np.arange(nb_sta) + NUM_STA_START,
+        nb_days * NB_REC_STA_DAY)
+    # seasonal & daily cycles (min at 6h), offset by station
+    arr_t = 285 + 8 * np.sin(2 * np.pi * (arr_doy - 110) / 365) + \
+        4 * np.sin(2 * np.pi * (arr_hour - 12) / 24) + \
+        (arr_sta - NUM_STA_START) % 7 - 3 + rng.normal(0, 1.5, nb_rec)
+    arr_u = np.clip(75 - 15 * np.sin(2 * np.pi * (arr_hour - 12) / 24) + \
+        rng.normal(0, 8, nb_rec), 5, 100).round()
+    df_rec = pd.DataFrame({"numer_sta": [f"{sta:05d}" for sta in arr_sta],
+        "date": np.repeat(arr_time.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+            nb_sta),
+        "t": arr_t.round(2), "u": arr_u})
+    for field_name in LIST_FIELD_SYNOP:
+        df_rec.loc[rng.rand(nb_rec) < ratio_field_gap, field_name] = np.nan
+    df_rec["day"] = df_rec["date"].str[0:10]
+    df_rec = drop_gaps(df_rec, ratio_gap, list_days_gap, "day", rng)
+    return df_rec.drop(columns=["day"])
+
+def records_to_data_meteo(df_rec):
+    '''
+    Columnar records (numer_sta, date, t, u) into opendatasoft JSON data :
+    {"records": [{"fields": {...}}]} (missing fields not in record)
+    '''
+    list_rec = []
+    for rec_curr in df_rec.to_dict("records"):
+        dict_fields = {key: val for key, val in rec_curr.items() \
+            if not (isinstance(val, float) and np.isnan(val))}
+        list_rec.append({"fields": dict_fields})
+    return {"records": list_rec}
+
+def create_data_meteo(nb_days, nb_sta, date_start=DATE_START, seed=0,
+        ratio_gap=0., list_days_gap=None, ratio_field_gap=0.):
+    '''
+    Synop records (opendatasoft JSON) : see create_records_meteo
+    '''
+    return records_to_data_meteo(create_records_meteo(nb_days, nb_sta,
+        date_start, seed, ratio_gap, list_days_gap, ratio_field_gap))
+
+def revise_records_meteo(df_rec, nb_days_new=1, nb_days_revised=1, seed=1):
+    '''
+    Next download of synop records : nb_days_new days added and
+    records of last nb_days_revised days corrected (values changed)
+    '''
+    rng = np.random.RandomState(seed)
+    df_revised = df_rec.copy()
+    list_days = sorted(df_revised["date"].str[0:10].unique())
+    b_revised = df_revised["date"].str[0:10].isin(
+        list_days[-nb_days_revised:])
+    df_revised.loc[b_revised, "t"] += rng.normal(0, 0.5, b_revised.sum()) \
+        .round(2)
+    if nb_days_new > 0:
+        df_new = create_records_meteo(nb_days_new,
+            len(df_revised["numer_sta"].unique()),
+            date_start=add_days(list_days[-1], 1), seed=seed)
+        df_revised = pd.concat([df_revised, df_new], ignore_index=True)
+    return df_revised
+
+def create_df_meteo(nb_days, nb_sta=62, date_start=DATE_START, seed=0,
+        list_days_gap=None):
+    '''
+    Meteo France by day (date, T_min, T_max, H_min, H_max) aggregated
+    from synop records (days of list_days_gap missing)
+    '''
+    data_meteo = create_data_meteo(nb_days, nb_sta, date_start, seed,
+        list_days_gap=list_days_gap)
+    return aggregate_meteo_pandas(records_to_df(data_meteo))
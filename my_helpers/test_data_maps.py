@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# third party libs
+import numpy as np
+import pandas as pd
+# projects libs
+from my_helpers.data_maps import simplify_ring
+from my_helpers.data_maps import get_geo_fr
+from my_helpers.data_maps import get_geo_fr_lod
+from my_helpers.data_maps import LIST_ZOOM_GEO
+from my_helpers.data_maps import get_zoom_lod
+from my_helpers.data_maps import dep_code_to_name
+from my_helpers.data_maps import dep_name_to_code
+from my_helpers.data_maps import dep_code_to_region
+from my_helpers.data_maps import filter_dep_codes
+from my_helpers.data_maps import save_geo_fr_bin
+from my_helpers.data_maps import load_geo_fr_bin
+from my_helpers.data_maps import calc_rt
+from my_helpers.data_maps import get_data_rt_fr
+from my_helpers.data_maps import load_df_rt_fr
+from my_helpers.data_maps import NB_DAYS_CV
+from my_helpers.data_maps import calc_dep_sum
+from my_helpers.data_maps import prepare_plot_data_dep_sum
+
+# definitions
+
+def count_points(dep_fr):
+    '''
+    Count points of all rings in geojson
+    '''
+    nb_pts = 0
+    for feat_curr in dep_fr['features']:
+        geo_curr = feat_curr['geometry']
+        if geo_curr['type'] == 'Polygon':
+            list_poly = [geo_curr['coordinates']]
+        else:
+            list_poly = geo_curr['coordinates']
+        for poly_curr in list_poly:
+            for ring_curr in poly_curr:
+                nb_pts += len(ring_curr)
+    return nb_pts
+
+# TESTS
+class TestGeoFr:
+
+    def test_simplify_ring(self):
+        # square with points on edges : only corners are needed
+        arr_ring = np.array([[0, 0], [0.5, 0], [1, 0], [1, 0.5], [1, 1],
+            [0.5, 1], [0, 1], [0, 0.5], [0, 0]])
+        arr_out = simplify_ring(arr_ring, 0.01)
+        np.testing.assert_array_equal(arr_out,
+            np.array([[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]))
+
+    def test_simplify_ring_keep_valid(self):
+        # too small ring is not destroyed
+        arr_ring = np.array([[0, 0], [1e-4, 0], [1e-4, 1e-4], [0, 1e-4],
+            [0, 0]])
+        arr_out = simplify_ring(arr_ring, 1)
+        assert arr_out.shape[0] >= 4
+
+    def test_get_geo_fr_lod(self):
+        dep_fr, _ = get_geo_fr()
+        list_nb_pts = [count_points(get_geo_fr_lod(zoom_curr)) \
+            for zoom_curr in LIST_ZOOM_GEO]
+        # less points for low zoom levels
+        assert list_nb_pts == sorted(list_nb_pts)
+        assert list_nb_pts[-1] <= count_points(dep_fr)
+        # same departements
+        assert len(get_geo_fr_lod(LIST_ZOOM_GEO[0])['features']) == \
+            len(dep_fr['features'])
+
+    def test_get_zoom_lod(self):
+        # only levels of LIST_ZOOM_GEO : finest needed for zoom
+        assert get_zoom_lod(0) == LIST_ZOOM_GEO[0]
+        assert get_zoom_lod(LIST_ZOOM_GEO[1]) == LIST_ZOOM_GEO[1]
+        assert get_zoom_lod(LIST_ZOOM_GEO[0] + 0.1) == LIST_ZOOM_GEO[1]
+        assert get_zoom_lod(100) == LIST_ZOOM_GEO[-1]
+
+    def test_get_geo_fr_cached(self):
+        dep_fr_0, df_code_dep_0 = get_geo_fr()
+        dep_fr_1, df_code_dep_1 = get_geo_fr()
+        assert dep_fr_0 is dep_fr_1
+        # code table can be modified by caller
+        assert df_code_dep_0 is not df_code_dep_1
+
+    def test_geo_fr_bin(self, tmp_path):
+        dep_fr, _ = get_geo_fr()
+        path_geo_bin = str(tmp_path / "dep_fr.npz")
+        save_geo_fr_bin(dep_fr, path_geo_bin=path_geo_bin)
+        assert load_geo_fr_bin(path_geo_bin=path_geo_bin) == dep_fr
+
+class TestDepRegistry:
+
+    def test_lookups(self):
+        assert dep_code_to_name("75") == "Paris"
+        assert dep_name_to_code("Paris") == "75"
+        assert dep_code_to_region("75") == "Île-de-France"
+        assert dep_code_to_region("2A") == "Corse"
+        assert dep_code_to_name("971") == "Guadeloupe"
+
+    def test_filter_dep_codes(self):
+        _, df_code_dep = get_geo_fr()
+        list_code = df_code_dep["code"].tolist() + ["975", "977", "978"]
+        assert filter_dep_codes(list_code) == df_code_dep["code"].tolist()
+
+class TestRtFr:
+
+    def test_get_data_rt_fr(self, tmp_path):
+        path_df_rt_fr = str(tmp_path / "df_rt_fr.csv")
+        ser_date = pd.Series(pd.date_range("2020-09-01", periods=60) \
+            .strftime("%Y-%m-%d"))
+        ser_pos = pd.Series(np.arange(60) * 10 + 100)
+        get_data_rt_fr(ser_date, ser_pos, path_df_rt_fr)
+        df_rt_fr = load_df_rt_fr(path_df_rt_fr)
+        # same Rt as computed on the fly
+        ser_rt = calc_rt(ser_date, pd.Series(index=ser_date.values, 
+            data=ser_pos.values))
+        assert np.allclose(df_rt_fr["rt"].dropna().values, ser_rt.values)
+        assert df_rt_fr["rt"].dropna().index.tolist() == ser_rt.index.tolist()
+        # sum of last days
+        assert df_rt_fr["sum_pos"].values[-1] == ser_pos[-NB_DAYS_CV:].sum()
+
+class TestDepSum:
+
+    def test_prepare_plot_data_dep_sum(self, tmp_path):
+        path_df_dep_sum = str(tmp_path / "df_dep_sum.csv")
+        list_dates = pd.date_range("2020-09-01", periods=30) \
+            .strftime("%Y-%m-%d").tolist()
+        df_pos_fr = pd.DataFrame(index=list_dates, 
+            data={"date": list_dates, "75": np.ones(30), 
+            "2A": np.arange(30), "daily": np.arange(30) + 1})
+        df_dep_sum = prepare_plot_data_dep_sum(df_pos_fr, path_df_dep_sum)
+        # only departements
+        assert df_dep_sum.columns.tolist() == ["date", "75", "2A"]
+        assert df_dep_sum["75"].values[-1] == NB_DAYS_CV
+        assert df_dep_sum["2A"].values[-1] == \
+            np.arange(30)[-NB_DAYS_CV:].sum()
+        # then loaded from disk
+        df_dep_sum_disk = prepare_plot_data_dep_sum(None, path_df_dep_sum)
+        assert df_dep_sum_disk.index.tolist() == list_dates
+        assert np.allclose(df_dep_sum_disk["2A"].values, 
+            df_dep_sum["2A"].values, equal_nan=True)
+        assert np.allclose(df_dep_sum_disk["2A"].values, calc_dep_sum(
+            df_pos_fr[["2A"]], df_pos_fr["date"])["2A"].values, equal_nan=True)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# third party libs
+import numpy as np
+import pandas as pd
+# projects libs
+from my_helpers.downsample import lttb_indices
+from my_helpers.downsample import get_index_plot
+
+# definitions
+NB_DAYS = 3650
+NB_POINTS = 500
+
+def create_series(nb_days=NB_DAYS, seed=0):
+    '''
+    Daily series (waves + noise + 1 peak) with string dates
+    '''
+    rng = np.random.RandomState(seed)
+    arr_t = np.arange(nb_days)
+    arr_y = 1000 + 800 * np.sin(arr_t / 60) + 50 * rng.randn(nb_days)
+    arr_y[nb_days // 3] = 5000 # peak
+    arr_date = pd.date_range("2020-05-13", periods=nb_days) \
+        .strftime("%Y-%m-%d").values
+    return arr_date, arr_y
+
+# TESTS
+class TestDownsample:
+
+    def test_lttb_indices(self):
+        _, arr_y = create_series()
+        arr_index = lttb_indices(arr_y, NB_POINTS)
+        assert arr_index.shape[0] == NB_POINTS
+        assert arr_index[0] == 0
+        assert arr_index[-1] == NB_DAYS - 1
+        assert np.all(np.diff(arr_index) > 0)
+        # not enough points : all kept
+        assert lttb_indices(arr_y[:100], NB_POINTS).tolist() == \
+            list(range(100))
+
+    def test_visual_parity(self):
+        _, arr_y = create_series()
+        arr_index = lttb_indices(arr_y, NB_POINTS)
+        # peak kept, range of values close to full series
+        assert arr_y[arr_index].max() == arr_y.max()
+        assert arr_y[arr_index].min() - arr_y.min() < 0.05 * np.ptp(arr_y)
+        # curve drawn by lines between points close to full series
+        arr_y_interp = np.interp(np.arange(NB_DAYS), arr_index, 
+            arr_y[arr_index])
+        err_rel = np.abs(arr_y_interp - arr_y).mean() / np.ptp(arr_y)
+        assert err_rel < 0.02
+
+    def test_nan(self):
+        _, arr_y = create_series()
+        arr_y[:100] = np.nan # ex: Rt not available for first days
+        arr_index = lttb_indices(arr_y, NB_POINTS)
+        assert arr_index.shape[0] == NB_POINTS
+        assert np.nanmax(arr_y[arr_index]) == np.nanmax(arr_y)
+
+    def test_zoom(self):
+        arr_date, arr_y = create_series()
+        x_range = ["2021-01-01", "2021-03-01 12:00:00"]
+        arr_index = get_index_plot(arr_y, arr_date, x_range, NB_POINTS)
+        # full resolution in zoom range
+        arr_zoom = np.flatnonzero((arr_date >= "2021-01-01") & \
+            (arr_date <= "2021-03-01"))
+        assert np.isin(arr_zoom, arr_index).all()
+        # outside : downsampled
+        assert arr_index.shape[0] < NB_POINTS + arr_zoom.shape[0] + 1
+        # no downsampling
+        assert get_index_plot(arr_y, nb_points=0).shape[0] == NB_DAYS
+
+    def test_zoom_bounds_on_days(self):
+        # relayout bounds of plotly on data days : both days kept
+        arr_date, arr_y = create_series()
+        for x_range in [["2021-01-01 00:00:00", "2021-01-10 00:00:00"],
+                ["2021-01-01 00:00:00.000", "2021-01-10 12:34:56.789"],
+                ["2021-01-01", "2021-01-10"]]:
+            arr_index = get_index_plot(arr_y, arr_date, x_range, NB_POINTS)
+            arr_zoom = np.flatnonzero((arr_date >= "2021-01-01") & \
+                (arr_date <= "2021-01-10"))
+            assert arr_zoom.shape[0] == 10
+            assert np.isin(arr_zoom, arr_index).all()
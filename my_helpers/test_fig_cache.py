@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import threading
+# third party libs
+import plotly.graph_objects as go
+# projects libs
+from my_helpers.fig_cache import FigCache
+from my_helpers.fig_cache import get_data_version
+
+# definitions
+list_build = [] # figures built
+
+def build_fig(name):
+    '''
+    Build small figure and remember it has been built
+    '''
+    list_build.append(name)
+    return go.Figure(go.Scatter(x=[0, 1], y=[1, 2], name=name))
+
+# TESTS
+class TestFigCache:
+
+    def setup_method(self):
+        list_build.clear()
+
+    def test_get_fig_hit(self):
+        fig_cache = FigCache(size_max=4)
+        fig_0 = fig_cache.get_fig("rt_dep", "Paris", "v0",
+            lambda: build_fig("Paris"))
+        fig_1 = fig_cache.get_fig("rt_dep", "Paris", "v0",
+            lambda: build_fig("Paris"))
+        assert list_build == ["Paris"]
+        assert fig_0 == fig_1
+        assert fig_1["data"][0]["name"] == "Paris"
+        assert fig_cache.hit_ratio() == 0.5
+
+    def test_data_version(self):
+        fig_cache = FigCache(size_max=4)
+        fig_cache.get_fig("rt_dep", "Paris", "v0", lambda: build_fig("v0"))
+        fig_cache.get_fig("rt_dep", "Paris", "v1", lambda: build_fig("v1"))
+        assert list_build == ["v0", "v1"]
+
+    def test_lru_eviction(self):
+        fig_cache = FigCache(size_max=2)
+        for dep_curr in ["Ain", "Aisne", "Ain", "Allier"]:
+            fig_cache.get_fig("pos_dep", dep_curr, "v0",
+                lambda: build_fig(dep_curr))
+        # "Aisne" is least recently used : evicted
+        assert len(fig_cache) == 2
+        assert fig_cache.get(("pos_dep", "Aisne", "v0")) is None
+        assert fig_cache.get(("pos_dep", "Ain", "v0")) is not None
+        assert sum(fig_cache.dict_hist_ms.values()) == 3
+
+    def test_counters_threads(self):
+        # requests & prewarm threads : each request counted once
+        fig_cache = FigCache(size_max=4)
+        nb_threads, nb_req = 8, 200
+        def request_figs():
+            for i_req in range(nb_req):
+                fig_cache.get_fig("rt_dep", i_req % 2, "v0",
+                    lambda: build_fig("dep"))
+        list_thread = [threading.Thread(target=request_figs) \
+            for _ in range(nb_threads)]
+        for thread in list_thread:
+            thread.start()
+        for thread in list_thread:
+            thread.join()
+        assert fig_cache.nb_hit + fig_cache.nb_miss == nb_threads * nb_req
+        assert fig_cache.nb_miss == len(list_build)
+
+    def test_get_data_version(self, tmp_path):
+        path_file = tmp_path / "df.csv"
+        assert get_data_version([str(path_file)]) == "none"
+        path_file.write_text("date\n")
+        assert get_data_version([str(path_file)]) != "none"
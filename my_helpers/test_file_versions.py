@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import os
+import datetime
+# projects libs
+from my_helpers.file_versions import save_version
+from my_helpers.file_versions import list_versions
+from my_helpers.file_versions import restore_version
+from my_helpers.file_versions import apply_retention
+from my_helpers.file_versions import get_dir_versions
+from my_helpers.file_versions import FORMAT_VERSION
+from my_helpers.utils import clean_file
+
+# definitions
+
+def write_file(path_file, nb_lines):
+    with open(path_file, "w") as f:
+        f.write("date,val\n")
+        for num_line in range(nb_lines):
+            f.write(f"2020-11-{1 + num_line % 30:02d},{num_line}\n")
+
+def create_list_version(list_days_ago, date_now):
+    return [{"version": (date_now - datetime.timedelta(days=days_ago)) \
+        .strftime(FORMAT_VERSION)} for days_ago in list_days_ago]
+
+# TESTS
+class TestFileVersions:
+
+    def test_save_restore(self, tmp_path):
+        path_file = str(tmp_path / "df_meteo_fr.csv")
+        write_file(path_file, 1000)
+        version_0 = save_version(path_file)
+        # same content : not saved again
+        assert save_version(path_file) == version_0
+        write_file(path_file, 1001)
+        save_version(path_file)
+        list_version = list_versions(path_file)
+        assert len(list_version) == 2
+        assert list_version[0]["size_gz"] < list_version[0]["size"]
+        # restore first version
+        path_out = str(tmp_path / "df_restored.csv")
+        restore_version(path_file, version_0["version"], path_out=path_out)
+        write_file(path_file, 1000)
+        with open(path_file) as f_0, open(path_out) as f_1:
+            assert f_0.read() == f_1.read()
+
+    def test_retention_nb_keep(self, tmp_path):
+        path_file = str(tmp_path / "df_meteo_fr.csv")
+        for nb_lines in range(6):
+            write_file(path_file, nb_lines)
+            save_version(path_file, nb_keep=3)
+        list_version = list_versions(path_file)
+        assert len(list_version) == 3
+        # old compressed copies removed
+        assert sorted(os.listdir(get_dir_versions(path_file))) == \
+            sorted([dict_version["file"] for dict_version in list_version] + \
+            ["index.json"])
+
+    def test_retention_age(self):
+        date_now = datetime.datetime(2020, 11, 30)
+        list_keep, list_remove = apply_retention(
+            create_list_version([40, 20, 10, 0], date_now), nb_keep=10,
+            max_age_days=30, date_now=date_now)
+        assert len(list_keep) == 3
+        assert len(list_remove) == 1
+        # last version always kept
+        list_keep, _ = apply_retention(create_list_version([40], date_now),
+            nb_keep=10, max_age_days=30, date_now=date_now)
+        assert len(list_keep) == 1
+
+    def test_clean_file(self, tmp_path):
+        path_file = str(tmp_path / "df_pos_fr.csv")
+        write_file(path_file, 10)
+        clean_file(path_file, flag_copy=True)
+        assert os.path.isfile(path_file)
+        clean_file(path_file)
+        assert not os.path.isfile(path_file)
+        assert len(list_versions(path_file)) == 1
+        restore_version(path_file)
+        assert os.path.isfile(path_file)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import json
+# third party libs
+import pandas as pd
+import pytest
+# projects libs
+from my_helpers.instrument import stage, instrumented, set_instrument
+from my_helpers.instrument import get_stats, reset_stats, format_metrics
+from my_helpers.instrument import count_rows, DICT_CONF
+
+# definitions
+@instrumented("test.double")
+def double_rows(df_in):
+    return pd.concat([df_in, df_in])
+
+@instrumented()
+def fail_stage(df_in):
+    with stage("test.inner"):
+        raise ValueError("fail")
+
+# TESTS
+class TestInstrument:
+
+    def setup_method(self):
+        self.enabled = DICT_CONF["enabled"]
+        self.path_log = DICT_CONF["path_log"]
+        reset_stats()
+
+    def teardown_method(self):
+        set_instrument(self.enabled, self.path_log)
+        reset_stats()
+
+    def test_disabled(self):
+        set_instrument(False)
+        with stage("test.off") as record:
+            record.set_rows(rows_out=1)
+        double_rows(pd.DataFrame({"a": [1, 2]}))
+        assert get_stats() == {}
+
+    def test_stage_log(self, tmp_path):
+        path_log = tmp_path / "instrument.log"
+        set_instrument(True, str(path_log))
+        with stage("test.outer", rows_in=3) as record:
+            df_out = double_rows(pd.DataFrame({"a": [1, 2, 3]}))
+            record.set_rows(rows_out=df_out.shape[0])
+        list_rec = [json.loads(line) for line in \
+            path_log.read_text().splitlines()]
+        # inner stage logged first, with its parent
+        assert [rec["stage"] for rec in list_rec] == \
+            ["test.double", "test.outer"]
+        assert list_rec[0]["parent"] == "test.outer"
+        assert (list_rec[0]["rows_in"], list_rec[0]["rows_out"]) == (3, 6)
+        assert (list_rec[1]["rows_in"], list_rec[1]["rows_out"]) == (3, 6)
+        assert list_rec[1]["wall_s"] >= list_rec[0]["wall_s"]
+        assert list_rec[1]["rss_peak_delta"] >= 0
+
+    def test_error_metrics(self, tmp_path):
+        set_instrument(True, str(tmp_path / "instrument.log"))
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                fail_stage(pd.DataFrame({"a": [1]}))
+        dict_stats = get_stats()
+        assert dict_stats["test_instrument.fail_stage"]["nb_calls"] == 2
+        assert dict_stats["test.inner"]["nb_errors"] == 2
+        str_metrics = format_metrics()
+        assert 'app_stage_calls_total{stage="test.inner"} 2' in str_metrics
+        assert "# TYPE app_stage_cpu_seconds_total counter" in str_metrics
+        assert 'app_stage_rows_in_last{stage="test.inner"}' \
+            not in str_metrics
+
+    def test_count_rows(self):
+        assert count_rows((pd.DataFrame({"a": [1, 2]}), None)) == 2
+        assert count_rows({"records": [{}, {}, {}]}) == 3
+        assert count_rows(None) is None
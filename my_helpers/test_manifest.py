@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import os
+import time
+# third party libs
+import pandas as pd
+# projects libs
+import my_helpers.data_plots as data_plots
+from my_helpers.manifest import record_stage
+from my_helpers.manifest import read_manifest
+from my_helpers.manifest import get_path_manifest
+from my_helpers.manifest import get_last_date
+from my_helpers.manifest import probe_source_changed
+
+# definitions
+ETAG_SOURCE = '"5fb3c1a2-3c5e"'
+
+def save_df(path_file, list_dates):
+    df = pd.DataFrame({"date": list_dates, "val": range(len(list_dates))})
+    df.to_csv(path_file, index=False)
+    return df
+
+def fun_head_stub(url):
+    return {"ETag": ETAG_SOURCE}
+
+def fun_head_fail(url):
+    raise ConnectionError("no network")
+
+# TESTS
+class TestManifest:
+
+    def test_record_stage(self, tmp_path):
+        path_file = str(tmp_path / "df_pos_fr.csv")
+        df = save_df(path_file, ["2020-11-01", "2020-11-02"])
+        record_stage(path_file, "precompute_data_pos", df)
+        dict_manifest = read_manifest(get_path_manifest(path_file))
+        assert dict_manifest["df_pos_fr.csv"]["nb_rows"] == 2
+        assert dict_manifest["df_pos_fr.csv"]["last_date"] == "2020-11-02"
+        # only manifest written (no temporary file left)
+        assert sorted(os.listdir(tmp_path)) == ["df_pos_fr.csv",
+            "manifest.json", "manifest.json.lock"]
+
+    def test_get_last_date(self, tmp_path):
+        path_file = str(tmp_path / "df_meteo_fr.csv")
+        assert get_last_date(path_file) is None
+        df = save_df(path_file, ["2020-11-01", "2020-11-02"])
+        record_stage(path_file, "precompute_data_meteo", df)
+        assert get_last_date(path_file) == "2020-11-02"
+        # file modified by another process : read from CSV
+        time.sleep(0.01)
+        save_df(path_file, ["2020-11-01", "2020-11-03"])
+        assert get_last_date(path_file) == "2020-11-03"
+
+    def test_probe_source_changed(self):
+        assert not probe_source_changed("url", ETAG_SOURCE,
+            fun_head=fun_head_stub)
+        assert probe_source_changed("url", '"old"', fun_head=fun_head_stub)
+        assert probe_source_changed("url", None, fun_head=fun_head_stub)
+        assert probe_source_changed("url", ETAG_SOURCE,
+            fun_head=fun_head_fail)
+
+    def test_check_update(self, tmp_path, monkeypatch):
+        for name_path in ["PATH_DF_FEAT_FR", "PATH_DF_POS_FR",
+            "PATH_DF_METEO_FR", "PATH_DF_GOUV_FR_RAW"]:
+            monkeypatch.setattr(data_plots, name_path,
+                str(tmp_path / (name_path[5:].lower() + ".csv")))
+        save_df(data_plots.PATH_DF_FEAT_FR, ["2020-11-02"])
+        df = save_df(data_plots.PATH_DF_POS_FR, ["2020-11-02"])
+        record_stage(data_plots.PATH_DF_POS_FR, "precompute_data_pos", df)
+        # meteo missing
+        assert data_plots.check_update()
+        df = save_df(data_plots.PATH_DF_METEO_FR, ["2020-11-02"])
+        record_stage(data_plots.PATH_DF_METEO_FR, "precompute_data_meteo", df)
+        assert not data_plots.check_update()
+        # old features : update only if SPF source changed
+        time_old = time.time() - 7 * 3600
+        os.utime(data_plots.PATH_DF_FEAT_FR, (time_old, time_old))
+        assert data_plots.check_update(flag_probe=False)
+        save_df(data_plots.PATH_DF_GOUV_FR_RAW, ["2020-11-02"])
+        record_stage(data_plots.PATH_DF_GOUV_FR_RAW, "get_data_gouv_fr",
+            dict_extra={"source_tag": ETAG_SOURCE})
+        assert not data_plots.check_update(flag_probe=True,
+            fun_head=fun_head_stub)
+        assert data_plots.check_update(flag_probe=True,
+            fun_head=fun_head_fail)
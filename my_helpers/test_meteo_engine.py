@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import json
+# third party libs
+import numpy as np
+import pandas as pd
+# projects libs
+from my_helpers.meteo import calc_list_mean_field
+from my_helpers.meteo import precompute_data_meteo_disk
+from my_helpers.meteo_engine import records_to_df
+from my_helpers.meteo_engine import aggregate_meteo_pandas
+from my_helpers.meteo_engine import aggregate_data_meteo
+from my_helpers.meteo_engine import choose_meteo_engine
+from my_helpers.meteo_engine import LIST_COL_METEO
+from my_helpers.meteo_engine import ENGINE_PANDAS, ENGINE_SPARK
+
+# definitions
+
+def create_data_meteo(nb_days=5, nb_sta=4, seed=0):
+    '''
+    Create random synop records (as downloaded) : 8 by station-day,
+    some without humidity
+    '''
+    rng = np.random.RandomState(seed)
+    list_rec = []
+    for date_curr in pd.date_range("2020-11-01", periods=nb_days):
+        for num_sta in range(nb_sta):
+            for hour in range(0, 24, 3):
+                dict_fields = {"numer_sta": f"{7005 + num_sta:05d}",
+                    "date": date_curr.strftime("%Y-%m-%d") + \
+                        f"T{hour:02d}:00:00+00:00",
+                    "t": 270 + 20 * rng.rand()}
+                if rng.rand() > 0.2:
+                    dict_fields["u"] = int(100 * rng.rand())
+                list_rec.append({"fields": dict_fields})
+    # not in date order (as downloaded by date lists)
+    rng.shuffle(list_rec)
+    return {"records": list_rec}
+
+# TESTS
+class TestMeteoEngine:
+
+    def test_records_to_df(self):
+        df_rec = records_to_df(create_data_meteo(nb_days=2, nb_sta=2))
+        assert df_rec.columns.tolist() == ["numer_sta", "date", "t", "u"]
+        assert df_rec.shape[0] == 2 * 2 * 8
+        assert sorted(df_rec["date"].unique()) == ["2020-11-01", "2020-11-02"]
+        assert df_rec["u"].isna().any()
+
+    def test_aggregate_meteo_pandas(self):
+        # same results as previous implementation by list
+        data_meteo = create_data_meteo()
+        df_meteo_fr_new = aggregate_meteo_pandas(records_to_df(data_meteo))
+        assert df_meteo_fr_new.columns.tolist() == LIST_COL_METEO
+        assert df_meteo_fr_new.index.tolist() == \
+            sorted(df_meteo_fr_new["date"].tolist())
+        for col_curr, field_name, fun in [("T_min", "t", min),
+            ("T_max", "t", max), ("H_min", "u", min), ("H_max", "u", max)]:
+            np.testing.assert_allclose(df_meteo_fr_new[col_curr].values,
+                calc_list_mean_field(data_meteo, field_name, fun))
+
+    def test_choose_meteo_engine(self):
+        assert choose_meteo_engine(10, nb_records_spark=100) == ENGINE_PANDAS
+        assert choose_meteo_engine(100, nb_records_spark=100) == ENGINE_SPARK
+        data_meteo = create_data_meteo(nb_days=1, nb_sta=1)
+        assert aggregate_data_meteo(data_meteo).shape[0] == 1
+
+    def test_precompute_data_meteo_disk(self, tmp_path):
+        path_json = str(tmp_path / "data_meteo_temp_fr.json")
+        path_df_meteo_fr = str(tmp_path / "df_meteo_fr.csv")
+        # old data : first 3 days
+        data_meteo = create_data_meteo(nb_days=5)
+        df_meteo_fr = aggregate_meteo_pandas(records_to_df(data_meteo))
+        df_meteo_fr.iloc[0:3].to_csv(path_df_meteo_fr, index=False)
+        # new data : last 2 days
+        data_meteo["records"] = [rec_curr for rec_curr in \
+            data_meteo["records"] if rec_curr["fields"]["date"][0:10] > \
+            df_meteo_fr["date"].iloc[2]]
+        with open(path_json, "w") as outfile:
+            json.dump(data_meteo, outfile)
+        df_meteo_fr_out = precompute_data_meteo_disk(engine=ENGINE_PANDAS,
+            path_json_meteo_temp_fr=path_json,
+            path_df_meteo_fr=path_df_meteo_fr)
+        assert df_meteo_fr_out["date"].tolist() == df_meteo_fr["date"].tolist()
+        np.testing.assert_allclose(
+            pd.read_csv(path_df_meteo_fr)["T_min"].values,
+            df_meteo_fr["T_min"].values)
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import os
+import threading
+# third party libs
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+# projects libs
+import my_helpers.data_snapshot as data_snapshot
+from my_helpers.refresh import RefreshRunner
+from my_helpers.refresh import STATE_IDLE, STATE_DONE, STATE_ERROR
+from my_helpers.refresh import fcntl
+from my_helpers.fig_cache import FigCache
+
+# definitions
+TIMEOUT = 5 # [s]
+
+def job_fail(fun_progress):
+    fun_progress("download SPF data", 0)
+    raise ConnectionError("no network")
+
+# TESTS
+class TestRefreshRunner:
+
+    def test_single_flight(self):
+        refresh_runner = RefreshRunner()
+        event_go = threading.Event()
+        list_run = []
+        def job(fun_progress):
+            list_run.append(1)
+            fun_progress("compute meteo", 0.6)
+            event_go.wait(TIMEOUT)
+        assert refresh_runner.get_status()["state"] == STATE_IDLE
+        assert refresh_runner.start(job)
+        # second start ignored while running
+        assert not refresh_runner.start(job)
+        assert refresh_runner.is_running()
+        event_go.set()
+        refresh_runner.wait(TIMEOUT)
+        dict_status = refresh_runner.get_status()
+        assert dict_status["state"] == STATE_DONE
+        assert dict_status["progress"] == 1
+        assert dict_status["nb_run"] == 1
+        assert list_run == [1]
+        # can run again after end
+        assert refresh_runner.start(job)
+        refresh_runner.wait(TIMEOUT)
+        assert refresh_runner.get_status()["nb_run"] == 2
+
+    def test_progress(self):
+        refresh_runner = RefreshRunner()
+        event_step, event_go = threading.Event(), threading.Event()
+        def job(fun_progress):
+            fun_progress("compute meteo", 0.6)
+            event_step.set()
+            event_go.wait(TIMEOUT)
+        refresh_runner.start(job)
+        event_step.wait(TIMEOUT)
+        dict_status = refresh_runner.get_status()
+        assert dict_status["step"] == "compute meteo"
+        assert dict_status["progress"] == 0.6
+        event_go.set()
+        refresh_runner.wait(TIMEOUT)
+
+    def test_error(self):
+        refresh_runner = RefreshRunner()
+        refresh_runner.start(job_fail)
+        refresh_runner.wait(TIMEOUT)
+        dict_status = refresh_runner.get_status()
+        assert dict_status["state"] == STATE_ERROR
+        assert "no network" in dict_status["error"]
+        assert not refresh_runner.is_running()
+
+    @pytest.mark.skipif((not hasattr(os, "fork")) or (fcntl is None),
+        reason="no fork / file lock")
+    def test_fork(self, tmp_path):
+        # worker forked while refresh of parent running (preloaded server) :
+        # locks not inherited, child can refresh after end of parent job
+        refresh_runner = RefreshRunner(str(tmp_path / "refresh_status.json"))
+        event_go = threading.Event()
+        assert refresh_runner.start(lambda fun_progress: \
+            event_go.wait(TIMEOUT))
+        fd_read, fd_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            code_exit = 1
+            try:
+                os.close(fd_read)
+                flag_ok = (not refresh_runner.lock.locked()) and \
+                    refresh_runner.is_running_other()
+                os.write(fd_write, b"1")
+                refresh_runner.wait(TIMEOUT)
+                flag_ok = flag_ok and (not refresh_runner.is_running()) and \
+                    refresh_runner.start(lambda fun_progress: None)
+                refresh_runner.wait(TIMEOUT)
+                if flag_ok and \
+                    (refresh_runner.get_status()["state"] == STATE_DONE):
+                    code_exit = 0
+            finally:
+                os._exit(code_exit)
+        os.close(fd_write)
+        os.read(fd_read, 1) # child checked parent job running
+        os.close(fd_read)
+        event_go.set()
+        refresh_runner.wait(TIMEOUT)
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and (os.WEXITSTATUS(status) == 0)
+
+class TestDataSnapshot:
+
+    def test_refresh_snapshot(self, monkeypatch):
+        monkeypatch.setattr(data_snapshot, "DICT_SNAPSHOT", {"current": None})
+        monkeypatch.setattr(data_snapshot, "get_data_pos", 
+            lambda fun_progress: fun_progress("download SPF data", 0))
+        monkeypatch.setattr(data_snapshot, "build_snapshot", 
+            lambda flag_update=False: {"version": "v1"})
+        monkeypatch.setattr(data_snapshot, "get_data_version", 
+            lambda list_path: "v1")
+        list_step = []
+        snapshot = data_snapshot.refresh_snapshot(
+            lambda step, progress: list_step.append(step))
+        # new snapshot replaces old one at once
+        assert data_snapshot.DICT_SNAPSHOT["current"] is snapshot
+        assert list_step[0] == "download SPF data"
+        # not loaded again if data on disk not changed
+        assert data_snapshot.get_snapshot() is snapshot
+
+    def test_fig_during_refresh(self, monkeypatch, tmp_path):
+        # click on map while refresh writes new files : figure of old
+        # snapshot not cached as new data
+        monkeypatch.setenv("APP_FAST_START", "1") # no data preparation
+        import app
+        path_feat = tmp_path / "df_feat_fr.csv"
+        path_feat.write_text("")
+        monkeypatch.setattr(app, "PATH_DF_FEAT_FR", str(path_feat))
+        snapshot_old = {"version": "v0",
+            "pt_fr_test_last": pd.DataFrame({"name": ["Paris"]})}
+        monkeypatch.setattr(data_snapshot, "DICT_SNAPSHOT",
+            {"current": snapshot_old})
+        monkeypatch.setattr(data_snapshot.refresh_runner, "is_running",
+            lambda: True)
+        monkeypatch.setattr(data_snapshot, "get_data_version",
+            lambda list_path: "v1")
+        monkeypatch.setattr(app, "fig_cache", FigCache())
+        monkeypatch.setattr(app, "build_fig_dep", 
+            lambda fig_type, dep_curr, x_range=None, snapshot=None: \
+            go.Figure(layout_title_text=snapshot["version"]))
+        fig = app.get_fig_dep(app.FIG_RT_DEP, "Paris")
+        assert fig["layout"]["title"]["text"] == "v0"
+        assert app.get_etag_layout() is None
+        # refresh done : new snapshot, figures built again & prewarmed
+        data_snapshot.set_snapshot({"version": "v1",
+            "pt_fr_test_last": pd.DataFrame({"name": ["Paris"]})})
+        monkeypatch.setattr(data_snapshot.refresh_runner, "is_running",
+            lambda: False)
+        app.prewarm_fig_cache()
+        assert app.fig_cache.get((app.FIG_RT_DEP, "Paris", "v1")) is not None
+        fig = app.get_fig_dep(app.FIG_RT_DEP, "Paris")
+        assert fig["layout"]["title"]["text"] == "v1"
+        # layout cached for same version as figures
+        assert app.get_etag_layout() == app.calc_etag("v1")
+
+    def test_shared_status(self, tmp_path):
+        # 2 runners sharing status file : as 2 server workers
+        path_status = str(tmp_path / "refresh_status.json")
+        runner_0 = RefreshRunner(path_status)
+        runner_1 = RefreshRunner(path_status)
+        event_step, event_go = threading.Event(), threading.Event()
+        def job(fun_progress):
+            fun_progress("compute meteo", 0.6)
+            event_step.set()
+            event_go.wait(TIMEOUT)
+        assert runner_0.start(job)
+        event_step.wait(TIMEOUT)
+        # only one refresh for all workers, status seen by all
+        assert runner_1.is_running()
+        assert not runner_1.start(job)
+        assert runner_1.get_status()["step"] == "compute meteo"
+        event_go.set()
+        runner_0.wait(TIMEOUT)
+        runner_1.wait(TIMEOUT)
+        assert not runner_1.is_running()
+        assert runner_1.get_status()["state"] == STATE_DONE
+        assert runner_1.start(job)
+        runner_1.wait(TIMEOUT)
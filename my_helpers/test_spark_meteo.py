@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import os
+import json
+import shutil
+# third party libs
+import numpy as np
+import pandas as pd
+import pytest
+pytest.importorskip("pyspark")
+if (shutil.which("java") is None) and (os.getenv("JAVA_HOME") is None):
+    pytest.skip("java not found : no local Spark", allow_module_level=True)
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import substring
+# projects libs
+from my_helpers.meteo import calc_list_mean_field
+from my_helpers.meteo import save_data_meteo_parquet
+from my_helpers.spark_meteo import aggregate_meteo_to_pandas
+from my_helpers.spark_meteo import LIST_COL_METEO, LIST_FIELD_METEO
+from my_helpers.spark_meteo import read_meteo
+
+# definitions
+from settings import PATH_TO_SAVE_DATA
+PATH_DF_METEO_FR_TEST_DEF = os.path.join(PATH_TO_SAVE_DATA,
+    'df_meteo_fr_for_test.csv')
+DELTA_STA = 0.5 # offset between the 2 stations
+
+def create_data_meteo(df_meteo_fr):
+    '''
+    Create synop records (as downloaded) for 2 stations by day :
+    mean over stations of min/max by station gives df_meteo_fr back
+    '''
+    list_rec = []
+    for _, row in df_meteo_fr.iterrows():
+        for num_sta, delta in [("07005", -DELTA_STA), ("07015", DELTA_STA)]:
+            for hour, t_curr, u_curr in [("03", row["T_min"], row["H_max"]),
+                ("15", row["T_max"], row["H_min"])]:
+                list_rec.append({"fields": {"numer_sta": num_sta,
+                    "date": row["date"] + "T" + hour + ":00:00+00:00",
+                    "t": t_curr + delta, "u": u_curr + delta}})
+    return {"records": list_rec}
+
+# TESTS
+class TestSparkMeteo:
+
+    @classmethod
+    def setup_class(cls):
+        cls.spark = SparkSession.builder.master("local[2]") \
+            .config("spark.driver.host", "127.0.0.1") \
+            .config("spark.sql.shuffle.partitions", "4") \
+            .appName("test_spark_meteo").getOrCreate()
+        cls.df_meteo_fr = pd.read_csv(PATH_DF_METEO_FR_TEST_DEF)
+        cls.data_meteo = create_data_meteo(cls.df_meteo_fr)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.spark.stop()
+
+    def get_df_meteo_spark(self):
+        df_rec = pd.DataFrame([rec["fields"] \
+            for rec in self.data_meteo["records"]])
+        return self.spark.createDataFrame(df_rec).alias("df") \
+            .withColumn("date", substring("df.date", 1, 10))
+
+    def test_aggregate_meteo(self):
+        df_meteo_fr_new = aggregate_meteo_to_pandas(self.get_df_meteo_spark())
+        assert df_meteo_fr_new.columns.tolist() == LIST_COL_METEO
+        assert df_meteo_fr_new["date"].tolist() == \
+            self.df_meteo_fr["date"].tolist()
+        for col_curr in LIST_COL_METEO[1:]:
+            np.testing.assert_allclose(df_meteo_fr_new[col_curr].values,
+                self.df_meteo_fr[col_curr].values)
+
+    def test_aggregate_meteo_as_pandas(self):
+        # same results as pandas / numpy implementation
+        df_meteo_fr_new = aggregate_meteo_to_pandas(self.get_df_meteo_spark())
+        for col_curr, field_name, fun in [("T_min", "t", min),
+            ("T_max", "t", max), ("H_min", "u", min), ("H_max", "u", max)]:
+            np.testing.assert_allclose(df_meteo_fr_new[col_curr].values,
+                calc_list_mean_field(self.data_meteo, field_name, fun))
+
+    def test_read_meteo_json(self, tmp_path):
+        # no Parquet file : JSON read with explicit schema
+        path_json = str(tmp_path / "data_meteo_temp_fr.json")
+        with open(path_json, "w") as outfile:
+            json.dump(self.data_meteo, outfile)
+        df_meteo = read_meteo(self.spark,
+            str(tmp_path / "data_meteo_temp_fr.parquet"), path_json)
+        assert df_meteo.columns == ["numer_sta", "date", "t", "u"]
+        df_meteo_fr_new = aggregate_meteo_to_pandas(df_meteo)
+        np.testing.assert_allclose(df_meteo_fr_new["T_min"].values,
+            self.df_meteo_fr["T_min"].values)
+
+    def save_data_meteo(self, tmp_path, data_meteo):
+        path_json = str(tmp_path / "data_meteo_temp_fr.json")
+        with open(path_json, "w") as outfile:
+            json.dump(data_meteo, outfile)
+        return path_json
+
+    def test_read_meteo_parquet(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        path_json = self.save_data_meteo(tmp_path, self.data_meteo)
+        path_parquet = str(tmp_path / "data_meteo_temp_fr.parquet")
+        assert save_data_meteo_parquet(self.data_meteo,
+            path_parquet_meteo=path_parquet, path_json_meteo=path_json)
+        df_meteo = read_meteo(self.spark, path_parquet, path_json)
+        assert df_meteo.columns == LIST_FIELD_METEO
+        df_meteo_fr_new = aggregate_meteo_to_pandas(df_meteo)
+        for col_curr in LIST_COL_METEO[1:]:
+            np.testing.assert_allclose(df_meteo_fr_new[col_curr].values,
+                self.df_meteo_fr[col_curr].values)
+
+    def test_read_meteo_stale_parquet(self, tmp_path):
+        # Parquet of previous download (new one not saved) : JSON read
+        pytest.importorskip("pyarrow")
+        path_json = self.save_data_meteo(tmp_path, self.data_meteo)
+        path_parquet = str(tmp_path / "data_meteo_temp_fr.parquet")
+        assert save_data_meteo_parquet(self.data_meteo,
+            path_parquet_meteo=path_parquet, path_json_meteo=path_json)
+        date_last = self.df_meteo_fr["date"].max()
+        data_meteo_new = {"records": [rec for rec in \
+            self.data_meteo["records"] if rec["fields"]["date"][:10] == \
+            date_last]}
+        self.save_data_meteo(tmp_path, data_meteo_new)
+        df_meteo = read_meteo(self.spark, path_parquet, path_json)
+        df_meteo_fr_new = aggregate_meteo_to_pandas(df_meteo)
+        assert df_meteo_fr_new["date"].tolist() == [date_last]
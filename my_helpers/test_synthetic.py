@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# built-in libs
+import io
+# third party libs
+import numpy as np
+import pandas as pd
+# projects libs
+from my_helpers.synthetic import create_data_gouv
+from my_helpers.synthetic import revise_data_gouv
+from my_helpers.synthetic import to_csv_gouv
+from my_helpers.synthetic import create_records_meteo
+from my_helpers.synthetic import revise_records_meteo
+from my_helpers.synthetic import create_data_meteo
+from my_helpers.synthetic import create_df_meteo
+from my_helpers.synthetic import LIST_CL_AGE90
+from my_helpers.synthetic import NB_REC_STA_DAY
+from my_helpers.data_plots import precompute_data_pos
+from my_helpers.meteo_engine import records_to_df
+
+# definitions
+NB_DAYS = 30
+NB_DEP = 5
+NB_STA = 4
+
+# TESTS
+class TestSyntheticGouv:
+
+    def test_create_data_gouv(self, tmp_path):
+        df_gouv_fr_raw = create_data_gouv(NB_DAYS, NB_DEP)
+        assert df_gouv_fr_raw.shape[0] == NB_DAYS * NB_DEP * \
+            len(LIST_CL_AGE90)
+        assert (df_gouv_fr_raw["p"] <= df_gouv_fr_raw["t"]).all()
+        # same seed : same data
+        assert df_gouv_fr_raw.equals(create_data_gouv(NB_DAYS, NB_DEP))
+        # usable by pipeline
+        df_pos_fr, _ = precompute_data_pos(df_gouv_fr_raw, nb_pos_start=0,
+            path_df_pos_fr=str(tmp_path / "df_pos_fr.csv"),
+            path_df_test_fr=str(tmp_path / "df_test_fr.csv"))
+        assert df_pos_fr.shape[0] == NB_DAYS
+        assert df_pos_fr["daily"].sum() == df_gouv_fr_raw["p"].sum()
+
+    def test_gaps(self):
+        df_gouv_fr_raw = create_data_gouv(NB_DAYS, NB_DEP, ratio_gap=0.2,
+            list_days_gap=[0, 10])
+        assert df_gouv_fr_raw["jour"].nunique() == NB_DAYS - 2
+        assert "2020-05-23" not in df_gouv_fr_raw["jour"].values
+        assert df_gouv_fr_raw.shape[0] < 0.9 * (NB_DAYS - 2) * NB_DEP * \
+            len(LIST_CL_AGE90)
+
+    def test_revise_data_gouv(self):
+        df_gouv_fr_raw = create_data_gouv(NB_DAYS, NB_DEP, flag_clean=False)
+        df_revised = revise_data_gouv(df_gouv_fr_raw, nb_days_new=2,
+            nb_days_revised=3)
+        assert df_revised["jour"].nunique() == NB_DAYS + 2
+        # old days unchanged, last days with more tests
+        df_old = df_gouv_fr_raw.set_index(["dep", "jour", "cl_age90"])
+        df_new = df_revised.set_index(["dep", "jour", "cl_age90"]) \
+            .loc[df_old.index]
+        b_revised = df_old.index.get_level_values("jour") >= "2020-06-09"
+        assert df_new[~b_revised].equals(df_old[~b_revised])
+        assert (df_new["t"][b_revised] >= df_old["t"][b_revised]).all()
+        # all ages rows still sum of classes
+        df_all = df_revised[df_revised["cl_age90"] == 0]
+        assert df_all["t"].sum() == \
+            df_revised[df_revised["cl_age90"] != 0]["t"].sum()
+
+    def test_to_csv_gouv(self):
+        df_gouv_fr_raw = create_data_gouv(3, 2)
+        df_read = pd.read_csv(io.StringIO(to_csv_gouv(df_gouv_fr_raw)),
+            sep=";", dtype={"dep": str})
+        assert df_read.equals(df_gouv_fr_raw)
+
+class TestSyntheticMeteo:
+
+    def test_create_data_meteo(self):
+        data_meteo = create_data_meteo(NB_DAYS, NB_STA, ratio_field_gap=0.1)
+        assert len(data_meteo["records"]) == NB_DAYS * NB_STA * NB_REC_STA_DAY
+        df_rec = records_to_df(data_meteo)
+        assert df_rec["numer_sta"].nunique() == NB_STA
+        assert df_rec["t"].isna().any() and df_rec["u"].notna().any()
+        assert df_rec["t"].dropna().between(250, 320).all()
+
+    def test_gaps(self):
+        df_rec = create_records_meteo(NB_DAYS, NB_STA, ratio_gap=0.3,
+            list_days_gap=[5])
+        assert df_rec["date"].str[0:10].nunique() == NB_DAYS - 1
+        assert df_rec.shape[0] < 0.8 * NB_DAYS * NB_STA * NB_REC_STA_DAY
+        df_meteo_fr = create_df_meteo(NB_DAYS, NB_STA, list_days_gap=[5])
+        assert df_meteo_fr.shape[0] == NB_DAYS - 1
+        assert (df_meteo_fr["T_min"] < df_meteo_fr["T_max"]).all()
+
+    def test_revise_records_meteo(self):
+        df_rec = create_records_meteo(NB_DAYS, NB_STA)
+        df_revised = revise_records_meteo(df_rec, nb_days_new=1,
+            nb_days_revised=1)
+        assert df_revised["date"].str[0:10].nunique() == NB_DAYS + 1
+        nb_rec_day = NB_STA * NB_REC_STA_DAY
+        nb_rec_old = df_rec.shape[0] - nb_rec_day
+        assert df_revised.iloc[:nb_rec_old].equals(df_rec.iloc[:nb_rec_old])
+        assert not np.allclose(df_revised["t"].values[nb_rec_old:-nb_rec_day],
+            df_rec["t"].values[nb_rec_old:])
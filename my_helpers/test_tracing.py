@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# import
+
+# third party libs
+import pytest
+# projects libs
+from my_helpers.tracing import span, traced, start_trace, end_trace
+from my_helpers.tracing import set_tracing, get_traces, summarize_traces
+from my_helpers.tracing import calc_percentile, DICT_CONF
+import settings
+
+# definitions
+@traced()
+def helper():
+    with span("inner"):
+        pass
+
+@traced("callback", flag_root=True)
+def callback(flag_error=False):
+    helper()
+    if flag_error:
+        raise ValueError("fail")
+
+# TESTS
+class TestTracing:
+
+    def setup_method(self):
+        self.enabled = DICT_CONF["enabled"]
+        set_tracing(True, buffer_size=3)
+
+    def teardown_method(self):
+        set_tracing(self.enabled, buffer_size=settings.TRACING_BUFFER_SIZE)
+
+    def test_disabled(self):
+        set_tracing(False)
+        callback()
+        helper()
+        assert get_traces() == []
+
+    def test_request_trace(self):
+        # trace of request named by callback, serialization after it
+        start_trace("/_dash-update-component")
+        callback()
+        end_trace(name_tail="response")
+        trace = get_traces()[-1]
+        assert trace["name"] == "callback"
+        assert [(span_curr["name"], span_curr["depth"]) \
+            for span_curr in trace["spans"]] == [("callback", 0),
+            ("helper", 1), ("inner", 2), ("response", 0)]
+        assert sum([span_curr["duration_ms"] for span_curr in \
+            trace["spans"] if span_curr["depth"] == 0]) <= \
+            trace["duration_ms"] + 0.01
+
+    def test_root_span_ring_buffer(self):
+        # callback without request : own trace, helper alone not traced
+        helper()
+        assert get_traces() == []
+        with pytest.raises(ValueError):
+            callback(flag_error=True)
+        trace = get_traces()[-1]
+        assert trace["error"] == "ValueError"
+        assert trace["spans"][0]["error"] == "ValueError"
+        for _ in range(4):
+            callback()
+        assert len(get_traces()) == 3
+        assert get_traces()[0]["error"] is None
+
+    def test_summary(self):
+        for _ in range(5):
+            callback()
+        dict_summary = summarize_traces()
+        assert dict_summary["callback"]["count"] == 3
+        assert set(dict_summary["callback"]["spans"].keys()) == \
+            {"callback", "helper", "inner"}
+        assert dict_summary["callback"]["p50_ms"] <= \
+            dict_summary["callback"]["p99_ms"]
+
+    def test_percentile(self):
+        list_val = list(range(1, 101))
+        assert calc_percentile(list_val, 50) == 50
+        assert calc_percentile(list_val, 95) == 95
+        assert calc_percentile(list_val, 99) == 99
+        assert calc_percentile([7], 99) == 7
+        assert calc_percentile([], 50) is None
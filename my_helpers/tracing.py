@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+''' Module for latency tracing of requests (Dash callbacks)
+
+A trace is started for a request (start_trace / end_trace) or by a
+callback (span with flag_root) and gets nested spans of helpers
+(span() context manager or @traced decorator) : name, depth,
+start & duration [ms] from start of trace.
+Spans outside of a trace (ex: background threads) are not recorded.
+Last traces are kept in a ring buffer (by process) and summarized by
+trace name with percentiles p50 / p95 / p99 (debug endpoint of server).
+
+Disabled by default (settings.TRACING) : spans do nothing.
+'''
+
+# import built-in
+import time
+import threading
+import functools
+import contextlib
+from collections import deque
+
+# import project modules
+import settings
+
+# DEFINITIONS
+DICT_CONF = {"enabled": settings.TRACING}
+LIST_PERCENTILES = [50, 95, 99]
+BUFFER_TRACES = deque(maxlen=settings.TRACING_BUFFER_SIZE) # last traces
+LOCK_TRACES = threading.Lock()
+LOCAL_TRACE = threading.local() # trace of request running in thread
+
+# HELPERS FUNCTIONS
+
+def set_tracing(enabled, buffer_size=None):
+    '''
+    Enable / disable tracing (buffer_size : new ring buffer, emptied)
+    '''
+    global BUFFER_TRACES
+    DICT_CONF["enabled"] = enabled
+    if buffer_size is not None:
+        with LOCK_TRACES:
+            BUFFER_TRACES = deque(maxlen=buffer_size)
+
+def is_tracing_enabled():
+    return DICT_CONF["enabled"]
+
+def clear_traces():
+    with LOCK_TRACES:
+        BUFFER_TRACES.clear()
+
+def get_traces(nb_last=None):
+    '''
+    Copy of traces in buffer (nb_last : only last ones), oldest first
+    '''
+    with LOCK_TRACES:
+        list_traces = list(BUFFER_TRACES)
+    return list_traces if nb_last is None else list_traces[-nb_last:]
+
+def calc_percentile(list_sorted, pct):
+    '''
+    Percentile pct (nearest rank) of sorted list of values
+    '''
+    if not list_sorted:
+        return None
+    rank = max(1, -(-pct * len(list_sorted) // 100)) # ceil
+    return list_sorted[int(rank) - 1]
+
+def summarize_durations(list_duration):
+    list_sorted = sorted(list_duration)
+    dict_sum = {"count": len(list_sorted)}
+    for pct in LIST_PERCENTILES:
+        dict_sum[f"p{pct}_ms"] = calc_percentile(list_sorted, pct)
+    dict_sum["max_ms"] = list_sorted[-1]
+    return dict_sum
+
+def summarize_traces(list_traces=None):
+    '''
+    Percentiles of durations by trace name, and of its spans by span name
+    (time of span summed if called several times in a trace)
+    '''
+    if list_traces is None:
+        list_traces = get_traces()
+    dict_dur = dict() # trace name : (list durations, {span : durations})
+    for trace in list_traces:
+        list_dur, dict_dur_span = dict_dur.setdefault(trace["name"],
+            ([], dict()))
+        list_dur.append(trace["duration_ms"])
+        dict_span_trace = dict()
+        for span_curr in trace["spans"]:
+            dict_span_trace[span_curr["name"]] = \
+                dict_span_trace.get(span_curr["name"], 0) + \
+                span_curr["duration_ms"]
+        for name_span, duration in dict_span_trace.items():
+            dict_dur_span.setdefault(name_span, []).append(duration)
+    dict_summary = dict()
+    for name, (list_dur, dict_dur_span) in dict_dur.items():
+        dict_summary[name] = summarize_durations(list_dur)
+        dict_summary[name]["spans"] = {name_span: \
+            summarize_durations(list_dur_span) \
+            for name_span, list_dur_span in dict_dur_span.items()}
+    return dict_summary
+
+def elapsed_ms(time_start):
+    return round(1000 * (time.perf_counter() - time_start), 3)
+
+# TRACING
+
+def start_trace(name):
+    '''
+    Start trace name in this thread (ex: request)
+    '''
+    if not DICT_CONF["enabled"]:
+        return
+    LOCAL_TRACE.trace = {"name": name, "time": round(time.time(), 3),
+        "perf_start": time.perf_counter(), "depth": 0, "spans": [],
+        "error": None}
+
+def end_trace(name_tail=None, error=None):
+    '''
+    End trace of this thread and keep it in buffer
+    (name_tail : span added from end of last span of depth 0 to end of
+    trace, ex: serialization of callback result)
+    '''
+    trace = getattr(LOCAL_TRACE, "trace", None)
+    if trace is None:
+        return
+    LOCAL_TRACE.trace = None
+    time_start = trace.pop("perf_start")
+    trace.pop("depth")
+    trace["duration_ms"] = elapsed_ms(time_start)
+    if error is not None:
+        trace["error"] = type(error).__name__
+    list_top = [span_curr for span_curr in trace["spans"] \
+        if span_curr["depth"] == 0]
+    if (name_tail is not None) and list_top:
+        end_ms = list_top[-1]["start_ms"] + list_top[-1]["duration_ms"]
+        trace["spans"].append({"name": name_tail, "depth": 0,
+            "start_ms": end_ms,
+            "duration_ms": round(trace["duration_ms"] - end_ms, 3),
+            "error": None})
+    with LOCK_TRACES:
+        BUFFER_TRACES.append(trace)
+
+@contextlib.contextmanager
+def span(name, flag_root=False):
+    '''
+    Span name in trace of this thread (nothing done if no trace).
+    flag_root : trace started if none (ended with span),
+    else trace renamed if span at first level (ex: callback of request)
+    '''
+    if not DICT_CONF["enabled"]:
+        yield
+        return
+    trace = getattr(LOCAL_TRACE, "trace", None)
+    if trace is None:
+        if not flag_root:
+            yield
+            return
+        start_trace(name)
+        error = None
+        try:
+            with span(name):
+                yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            end_trace(error=error)
+        return
+    if flag_root and (trace["depth"] == 0):
+        trace["name"] = name
+    dict_span = {"name": name, "depth": trace["depth"],
+        "start_ms": elapsed_ms(trace["perf_start"]), "duration_ms": None,
+        "error": None}
+    trace["spans"].append(dict_span)
+    trace["depth"] += 1
+    time_start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        dict_span["error"] = type(e).__name__
+        raise
+    finally:
+        dict_span["duration_ms"] = elapsed_ms(time_start)
+        trace["depth"] -= 1
+
+def traced(name=None, flag_root=False):
+    '''
+    Decorator : function run in span name (default function name)
+    '''
+    def decorator(fun):
+        name_span = name or fun.__name__
+        @functools.wraps(fun)
+        def wrapper(*args, **kwargs):
+            if not DICT_CONF["enabled"]:
+                return fun(*args, **kwargs)
+            with span(name_span, flag_root):
+                return fun(*args, **kwargs)
+        return wrapper
+    return decorator
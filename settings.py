@@ -10,5 +10,36 @@ PREDICT = True # default = True
 MODEL_TFLITE = True # default = True 
 PATH_TO_SAVE_DATA = ntpath.dirname(__file__)
 NB_PERIOD_PLOT = 9
+MODE_FAST_START = False # app : data & figures prepared at first page load
+# figures cache
+FIG_CACHE_SIZE = 256 # max nb of figures in cache
+FIG_CACHE_PREWARM = True # pre-render all departements after update
+# geojson dep. France : use pre-parsed binary form (npz)
+GEO_FR_BIN = False
+# meteo : aggregate with Spark (instead of pandas) from this nb of records
+METEO_NB_RECORDS_SPARK = 500000
+# versions of data files saved before update : keep last N, max age
+FILE_VERSIONS_NB_KEEP = 5
+FILE_VERSIONS_MAX_AGE_DAYS = 30
+# check update : HTTP HEAD on SPF source to know if it changed
+CHECK_UPDATE_PROBE = False
+# production server (gunicorn) : nb of workers & threads by worker,
+# data & figures loaded before fork of workers (shared)
+SERVER_WORKERS = 2
+SERVER_THREADS = 4
+SERVER_PRELOAD = True
+# HTTP : compression of responses, max age [s] of static files in cache
+COMPRESS_ALGORITHM = ["br", "gzip"]
+HTTP_CACHE_MAX_AGE = 3600
+# figures : max nb of points by curve (LTTB downsampling), 0 : all points
+PLOT_NB_POINTS_MAX = 500
+# instrumentation of pipeline stages (time, CPU, RSS, rows) : JSON logs
+# in file INSTRUMENT_LOG (stdout if empty) & metrics served at /metrics
+INSTRUMENT = False
+INSTRUMENT_LOG = ""
+# latency tracing of requests (Dash callbacks) : last traces kept in
+# ring buffer, served with percentiles at /debug/traces
+TRACING = False
+TRACING_BUFFER_SIZE = 500
 # AWS
 BUCKET_NAME = 'app-covid-visu-bucket'
\ No newline at end of file
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+''' WSGI entry point of App Covid Visu (production server)
+
+Run with gunicorn (configuration in gunicorn.conf.py) :
+gunicorn -c gunicorn.conf.py wsgi:application
+
+With preload (settings.SERVER_PRELOAD), this module is imported once
+before fork of workers : data snapshot and figures cache are loaded here
+and shared by all workers (copy-on-write memory).
+No data refresh during import or preload : Dash layout validated without
+calling startup_layout (fast start), refresh started only in workers
+after fork (gunicorn post_fork hook), never in the master.
+Data refresh started by a worker is seen by all (single refresh for all
+workers, new data reloaded by each one from disk).
+'''
+
+# import built-in
+import os
+
+# import project modules
+import settings
+# validation layout : no startup_layout (data refresh) at import
+os.environ["APP_FAST_START"] = "1"
+from app import server, display_msg
+from app import get_snapshot, prewarm_fig_cache
+from app import start_refresh, check_update, PATH_DF_FEAT_FR
+
+# DEFINITIONS
+application = server
+
+def preload():
+    '''
+    Load data & figures before fork of workers (nothing if no data yet)
+    '''
+    if not os.path.isfile(PATH_DF_FEAT_FR):
+        display_msg("PRELOAD : no data, downloaded by workers")
+        return
+    display_msg("PRELOAD ...")
+    get_snapshot()
+    if settings.FIG_CACHE_PREWARM:
+        prewarm_fig_cache()
+    display_msg("PRELOAD END.")
+
+def start_refresh_worker():
+    '''
+    Start data refresh in background in worker (after fork) if no data,
+    forced update or new data available (one refresh for all workers)
+    '''
+    if (not os.path.isfile(PATH_DF_FEAT_FR)) or \
+        settings.MODE_FORCE_UPDATE or check_update():
+        start_refresh()